@@ -24,10 +24,13 @@ import click
 from mtd.commands import (
     add_tool,
     deploy_mech_command,
+    ipfs,
+    metadata,
     push_metadata,
     run,
     setup,
     stop,
+    tx,
     update_metadata,
 )
 from mtd.context import build_context
@@ -48,3 +51,6 @@ cli.add_command(run)
 cli.add_command(stop)
 cli.add_command(push_metadata)
 cli.add_command(update_metadata)
+cli.add_command(metadata)
+cli.add_command(ipfs)
+cli.add_command(tx)
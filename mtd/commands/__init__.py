@@ -22,10 +22,13 @@
 from mtd.commands.add_tool_cmd import add_tool
 from mtd.commands.context_utils import get_mtd_context
 from mtd.commands.deploy_mech_cmd import deploy_mech_command
+from mtd.commands.ipfs_cmd import ipfs
+from mtd.commands.metadata_cmd import metadata
 from mtd.commands.push_metadata_cmd import push_metadata
 from mtd.commands.run_cmd import run
 from mtd.commands.setup_cmd import setup
 from mtd.commands.stop_cmd import stop
+from mtd.commands.tx_cmd import tx
 from mtd.commands.update_metadata_cmd import update_metadata
 
 
@@ -33,9 +36,12 @@ __all__ = [
     "add_tool",
     "deploy_mech_command",
     "get_mtd_context",
+    "ipfs",
+    "metadata",
     "push_metadata",
     "run",
     "setup",
     "stop",
+    "tx",
     "update_metadata",
 ]
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""IPFS command group for working against a local node."""
+
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from mtd.commands.context_utils import get_mtd_context
+from mtd.services.ipfs import Blockstore
+from mtd.services.ipfs.server import DEFAULT_HOST, DEFAULT_PORT, serve as serve_ipfs
+
+
+IPFS_REPO_DIR = "ipfs"
+
+
+@click.group(name="ipfs")
+def ipfs() -> None:
+    """Work with a local IPFS node."""
+
+
+@ipfs.command()
+@click.option("--host", type=str, default=DEFAULT_HOST, show_default=True, help="Interface to listen on.")
+@click.option("--port", type=click.IntRange(min=0, max=65535), default=DEFAULT_PORT, show_default=True)
+@click.option(
+    "--latency",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    show_default=True,
+    help="Seconds added to every request, to simulate a remote node.",
+)
+@click.option(
+    "--jitter",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    show_default=True,
+    help="Maximum random extra delay in seconds added to every request.",
+)
+@click.option(
+    "--repo",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory storing blocks and pins. Defaults to the workspace cache.",
+)
+@click.option("--in-memory", is_flag=True, default=False, help="Keep blocks in memory only.")
+@click.pass_context
+def serve(  # pylint: disable=too-many-arguments
+    ctx: click.Context,
+    host: str,
+    port: int,
+    latency: float,
+    jitter: float,
+    repo: Optional[Path],
+    in_memory: bool,
+) -> None:
+    """Serve the IPFS HTTP API endpoints used by the CLI (add, cat, pin) locally.
+
+    Point commands at it with --ipfs-node /ip4/127.0.0.1/tcp/5001/http.
+
+    Example: mech ipfs serve --latency 0.2
+    """
+    if in_memory:
+        blockstore = Blockstore()
+        click.echo("Storing blocks in memory.")
+    else:
+        repo = repo or get_mtd_context(ctx).cache_dir / IPFS_REPO_DIR
+        blockstore = Blockstore(repo)
+        click.echo(f"Storing blocks in {repo}.")
+
+    click.echo(f"Serving IPFS API at /ip4/{host}/tcp/{port}/http. Press Ctrl+C to stop.")
+    serve_ipfs(blockstore, host=host, port=port, latency=latency, jitter=jitter)
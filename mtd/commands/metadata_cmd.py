@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Metadata command group for inspecting and developing tool metadata."""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import click
+from dotenv import dotenv_values, set_key
+
+from mtd.commands.context_utils import get_mtd_context, require_initialized
+from mtd.context import MtdContext
+from mtd.services.metadata import (
+    DEFAULT_IPFS_NODE,
+    PublishLedger,
+    ToolsCache,
+    build_metadata,
+    diff_metadata,
+    fetch_metadata,
+    publish_metadata,
+    update_metadata_onchain,
+)
+from mtd.services.metadata.diff import format_diff
+from mtd.services.metadata.fetch import CACHE_SOURCE, DEFAULT_SOURCES
+from mtd.services.metadata.generate import (
+    DEFAULT_IMPORT_MEMORY_LIMIT,
+    DEFAULT_IMPORT_TIMEOUT,
+)
+from mtd.services.metadata.ledger import OnchainUpdate
+from mtd.services.metadata.watch import DEFAULT_DEBOUNCE, MetadataUpdate, MetadataWatcher
+
+
+DIFF_ERROR_EXIT_CODE = 2
+
+
+@click.group(name="metadata")
+def metadata() -> None:
+    """Inspect and develop tool metadata."""
+
+
+@metadata.command()
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_DEBOUNCE,
+    show_default=True,
+    help="Seconds without further changes before metadata is regenerated.",
+)
+@click.option(
+    "--poll",
+    is_flag=True,
+    default=False,
+    help="Poll for changes instead of using native file system notifications.",
+)
+@click.option(
+    "--publish",
+    is_flag=True,
+    default=False,
+    help="Publish metadata to IPFS after every successful regeneration.",
+)
+@click.option(
+    "--ipfs-node",
+    type=str,
+    multiple=True,
+    default=(DEFAULT_IPFS_NODE,),
+    show_default=True,
+    help="IPFS node address used with --publish. Repeat to upload to several nodes at once; the first confirmation wins.",
+)
+@click.option(
+    "--import-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=DEFAULT_IMPORT_TIMEOUT,
+    show_default=True,
+    help="Seconds allowed for importing a tool whose tools list is computed dynamically.",
+)
+@click.option(
+    "--import-memory-limit",
+    type=click.IntRange(min=0),
+    default=DEFAULT_IMPORT_MEMORY_LIMIT,
+    show_default=True,
+    help="Memory limit in MiB for importing a tool module (0 disables the limit).",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    default=False,
+    help="Store the tool input/output schemas once under 'definitions' and reference them per tool.",
+)
+@click.pass_context
+def watch(  # pylint: disable=too-many-arguments
+    ctx: click.Context,
+    debounce: float,
+    poll: bool,
+    publish: bool,
+    ipfs_node: Tuple[str, ...],
+    import_timeout: float,
+    import_memory_limit: int,
+    compact: bool,
+) -> None:
+    """Regenerate and validate metadata whenever tool packages change.
+
+    Only the tools touched by a change are rescanned. Metadata is written
+    to the workspace metadata.json and is published only with --publish.
+
+    Example: mech metadata watch
+    """
+    context = get_mtd_context(ctx)
+    require_initialized(context)
+
+    ledger = PublishLedger(context.ledger_path) if publish else None
+    watcher = MetadataWatcher(
+        packages_dir=context.packages_dir,
+        metadata_path=context.metadata_path,
+        compact=compact,
+        import_timeout=import_timeout,
+        import_memory_limit=import_memory_limit,
+    )
+
+    def _on_update(update: MetadataUpdate) -> None:
+        click.echo(f"Rescanned {len(update.rescanned)} tool(s): {', '.join(update.rescanned)}")
+        for key, error in update.import_errors.items():
+            click.echo(f"Skipped {key}: {error}", err=True)
+        if update.error:
+            click.echo(f"Invalid metadata: {update.error}", err=True)
+            return
+
+        click.echo(f"Metadata written to {context.metadata_path} ({len(update.metadata['tools'])} tools).")
+        if not publish:
+            return
+
+        try:
+            metadata_hash = publish_metadata(metadata=update.metadata, ipfs_node=ipfs_node, ledger=ledger)
+        except (RuntimeError, ValueError) as e:
+            click.echo(f"Publish failed: {e}", err=True)
+            return
+        set_key(str(context.env_path), "METADATA_HASH", metadata_hash)
+        click.echo(f"Metadata hash: {metadata_hash}")
+
+    click.echo(f"Watching {context.packages_dir} for changes. Press Ctrl+C to stop.")
+    try:
+        watcher.watch(on_update=_on_update, debounce=debounce, poll=poll)
+    except KeyboardInterrupt:
+        click.echo("Stopped watching.")
+
+
+@metadata.command()
+@click.option(
+    "--hash",
+    "metadata_hash",
+    type=str,
+    default=None,
+    help="On-chain metadata hash (f01701220...) or CID to show. Defaults to METADATA_HASH in the workspace .env.",
+)
+@click.option(
+    "--source",
+    type=str,
+    multiple=True,
+    default=DEFAULT_SOURCES,
+    show_default=True,
+    help="IPFS API node multiaddr or gateway URL to fetch from. Repeat to query several at once.",
+)
+@click.pass_context
+def show(ctx: click.Context, metadata_hash: Optional[str], source: Tuple[str, ...]) -> None:
+    """Show published metadata, verified against its hash.
+
+    Fetched documents are cached in the workspace, so later lookups of the
+    same hash are served locally.
+
+    Example: mech metadata show --hash f01701220...
+    """
+    context = get_mtd_context(ctx)
+    document = _fetch_published(context, metadata_hash, source)
+    click.echo(json.dumps(document, indent=4))
+
+
+@metadata.command()
+@click.option(
+    "--hash",
+    "metadata_hash",
+    type=str,
+    default=None,
+    help="On-chain metadata hash (f01701220...) or CID to compare with. Defaults to METADATA_HASH in the workspace .env.",
+)
+@click.option(
+    "--source",
+    type=str,
+    multiple=True,
+    default=DEFAULT_SOURCES,
+    show_default=True,
+    help="IPFS API node multiaddr or gateway URL to fetch from. Repeat to query several at once.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Rescan every tool instead of reusing cached entries of unchanged tools.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes used to scan tool packages.",
+)
+@click.option(
+    "--import-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=DEFAULT_IMPORT_TIMEOUT,
+    show_default=True,
+    help="Seconds allowed for importing a tool whose tools list is computed dynamically.",
+)
+@click.option(
+    "--import-memory-limit",
+    type=click.IntRange(min=0),
+    default=DEFAULT_IMPORT_MEMORY_LIMIT,
+    show_default=True,
+    help="Memory limit in MiB for importing a tool module (0 disables the limit).",
+)
+@click.pass_context
+def diff(  # pylint: disable=too-many-arguments
+    ctx: click.Context,
+    metadata_hash: Optional[str],
+    source: Tuple[str, ...],
+    no_cache: bool,
+    jobs: int,
+    import_timeout: float,
+    import_memory_limit: int,
+) -> None:
+    """Compare metadata generated from packages with the published metadata.
+
+    Tools are compared by name and changes are listed field by field. Like
+    diff(1), exits with status 0 when there are no changes, 1 when there are
+    changes and 2 when the comparison could not be made, so pipelines can
+    skip publishing when there is nothing new without masking errors.
+
+    Example: mech metadata diff && echo "Nothing to publish"
+    """
+    context = get_mtd_context(ctx)
+    try:
+        require_initialized(context)
+        published = _fetch_published(context, metadata_hash, source)
+        generated = build_metadata(
+            packages_dir=context.packages_dir,
+            cache=None if no_cache else ToolsCache(context.cache_dir),
+            jobs=jobs,
+            import_timeout=import_timeout,
+            import_memory_limit=import_memory_limit,
+        )
+    except click.ClickException as e:
+        e.exit_code = DIFF_ERROR_EXIT_CODE
+        raise
+    except (OSError, ValueError) as e:
+        error = click.ClickException(str(e))
+        error.exit_code = DIFF_ERROR_EXIT_CODE
+        raise error from e
+
+    changes = diff_metadata(published, generated)
+    if not changes.has_changes:
+        click.echo("No changes.")
+        return
+
+    click.echo("\n".join(format_diff(changes)))
+    ctx.exit(1)
+
+
+@metadata.command()
+@click.option("--chain", type=str, default=None, help="Only show updates on this chain, e.g. gnosis.")
+@click.option(
+    "-n",
+    "--limit",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Number of updates to show per chain.",
+)
+@click.pass_context
+def history(ctx: click.Context, chain: Optional[str], limit: int) -> None:
+    """Show the metadata hashes set on-chain, newest first, from the workspace ledger.
+
+    The ledger records every generation, IPFS upload and on-chain update
+    made from this workspace, so no chain or IPFS queries are made.
+
+    Example: mech metadata history --chain gnosis
+    """
+    context = get_mtd_context(ctx)
+    ledger = PublishLedger(context.ledger_path)
+    chains = [chain.lower()] if chain else ledger.chains()
+    if not chains:
+        click.echo("No on-chain updates recorded.")
+        return
+
+    for name in chains:
+        live = ledger.live(name)
+        click.echo(f"{name}: live {live.metadata_hash if live else 'unknown'}")
+        for update in ledger.updates(name, limit=limit):
+            click.echo(f"  {_format_update(update)}")
+            generation = ledger.generation(update.metadata_hash)
+            if generation is not None:
+                click.echo(f"      {generation.tool_count} tool(s), {generation.size} bytes")
+
+
+@metadata.command()
+@click.option("--yes", is_flag=True, default=False, help="Do not ask for confirmation.")
+@click.pass_context
+def rollback(ctx: click.Context, yes: bool) -> None:
+    """Set the metadata hash live before the current one back on-chain.
+
+    The hash is looked up in the workspace ledger for the DEFAULT_CHAIN_ID
+    chain, written to METADATA_HASH in the workspace .env and updated
+    on-chain via Safe transaction.
+
+    Example: mech metadata rollback
+    """
+    context = get_mtd_context(ctx)
+    require_initialized(context)
+
+    chain = (dotenv_values(context.env_path).get("DEFAULT_CHAIN_ID") or "").strip().lower()
+    if not chain:
+        raise click.ClickException(f"No DEFAULT_CHAIN_ID in {context.env_path}.")
+    ledger = PublishLedger(context.ledger_path)
+    live, previous = ledger.live(chain), ledger.previous(chain)
+    if live is None or previous is None:
+        raise click.ClickException(f"No earlier metadata hash recorded on {chain}.")
+
+    click.echo(f"Live on {chain}: {live.metadata_hash}")
+    click.echo(f"Rolling back to: {previous.metadata_hash} (set {_format_time(previous.created_at)})")
+    if not yes:
+        click.confirm("Update the metadata hash on-chain?", abort=True)
+
+    set_key(str(context.env_path), "METADATA_HASH", previous.metadata_hash)
+    try:
+        success, tx_hash = update_metadata_onchain(
+            env_path=context.env_path,
+            private_key_path=context.keys_dir / "ethereum_private_key.txt",
+            ledger=ledger,
+            rpc_scores_path=context.rpc_scores_path,
+        )
+    except Exception:
+        set_key(str(context.env_path), "METADATA_HASH", live.metadata_hash)
+        raise
+    if tx_hash is None:
+        click.echo(f"On-chain metadata hash is already {previous.metadata_hash}, skipped transaction.")
+        return
+    click.echo(f"Success: {success}")
+    click.echo(f"Tx Hash: {tx_hash}")
+    if not success:
+        set_key(str(context.env_path), "METADATA_HASH", live.metadata_hash)
+        raise click.ClickException(f"Rollback transaction failed; METADATA_HASH restored to {live.metadata_hash}.")
+
+
+def _format_time(timestamp: float) -> str:
+    """Format a ledger timestamp in local time."""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _format_update(update: OnchainUpdate) -> str:
+    """Format an on-chain update on one line."""
+    status = "ok" if update.success else "failed"
+    details = "".join(
+        f", {label} {value}"
+        for label, value in (("block", update.block_number), ("gas", update.gas_used))
+        if value is not None
+    )
+    if update.gas_accuracy is not None:
+        details += f" ({update.gas_accuracy:.0%} of estimate {update.gas_estimate})"
+    source = "observed on chain" if update.observed else f"tx {update.tx_hash}"
+    return f"{_format_time(update.created_at)}  {update.metadata_hash}  {status}  {source}{details}"
+
+
+def _fetch_published(context: MtdContext, metadata_hash: Optional[str], sources: Tuple[str, ...]) -> Dict[str, Any]:
+    """Fetch the published metadata, reporting where it was read from on stderr."""
+    metadata_hash = metadata_hash or dotenv_values(context.env_path).get("METADATA_HASH")
+    if not metadata_hash:
+        raise click.ClickException(f"No METADATA_HASH in {context.env_path}. Pass --hash.")
+
+    try:
+        document, fetched = fetch_metadata(metadata_hash, cache_dir=context.cache_dir, sources=sources)
+    except (RuntimeError, ValueError) as e:
+        raise click.ClickException(str(e)) from e
+
+    if fetched.source == CACHE_SOURCE:
+        click.echo(f"Loaded {fetched.cid} from the local cache.", err=True)
+    else:
+        click.echo(f"Fetched {fetched.cid} from {fetched.source} and verified it.", err=True)
+    return document
@@ -19,14 +19,22 @@
 
 """Push-metadata command for generating and publishing metadata to IPFS."""
 
+from typing import Tuple
+
 import click
-from dotenv import set_key
+from dotenv import dotenv_values, set_key
 
 from mtd.commands.context_utils import get_mtd_context, require_initialized
 from mtd.services.metadata import (
     DEFAULT_IPFS_NODE,
-    generate_metadata,
-    publish_metadata_to_ipfs,
+    PublishLedger,
+    ToolsCache,
+    build_metadata,
+    publish_metadata,
+)
+from mtd.services.metadata.generate import (
+    DEFAULT_IMPORT_MEMORY_LIMIT,
+    DEFAULT_IMPORT_TIMEOUT,
 )
 
 
@@ -34,25 +42,98 @@ from mtd.services.metadata import (
 @click.option(
     "--ipfs-node",
     type=str,
-    default=DEFAULT_IPFS_NODE,
-    help="IPFS node address.",
+    multiple=True,
+    default=(DEFAULT_IPFS_NODE,),
+    show_default=True,
+    help="IPFS node address. Repeat to upload to several nodes at once; the first confirmation wins.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Rescan every tool instead of reusing cached entries of unchanged tools.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes used to scan tool packages.",
+)
+@click.option(
+    "--import-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=DEFAULT_IMPORT_TIMEOUT,
+    show_default=True,
+    help="Seconds allowed for importing a tool whose tools list is computed dynamically.",
+)
+@click.option(
+    "--import-memory-limit",
+    type=click.IntRange(min=0),
+    default=DEFAULT_IMPORT_MEMORY_LIMIT,
+    show_default=True,
+    help="Memory limit in MiB for importing a tool module (0 disables the limit).",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    default=False,
+    help="Store the tool input/output schemas once under 'definitions' and reference them per tool.",
+)
+@click.option(
+    "--force-upload",
+    is_flag=True,
+    default=False,
+    help="Upload metadata even if its hash matches the METADATA_HASH already in the workspace .env.",
 )
 @click.pass_context
-def push_metadata(ctx: click.Context, ipfs_node: str) -> None:
+def push_metadata(  # pylint: disable=too-many-arguments
+    ctx: click.Context,
+    ipfs_node: Tuple[str, ...],
+    no_cache: bool,
+    jobs: int,
+    import_timeout: float,
+    import_memory_limit: int,
+    compact: bool,
+    force_upload: bool,
+) -> None:
     """Generate metadata.json from packages and publish to IPFS.
 
+    The upload is skipped when the locally computed hash of the metadata
+    matches the METADATA_HASH already in the workspace .env.
+
     Example: mech push-metadata
     """
     context = get_mtd_context(ctx)
     require_initialized(context)
 
     click.echo("Generating metadata...")
-    generate_metadata(packages_dir=context.packages_dir, metadata_path=context.metadata_path)
+    cache = None if no_cache else ToolsCache(context.cache_dir)
+    metadata = build_metadata(
+        packages_dir=context.packages_dir,
+        cache=cache,
+        jobs=jobs,
+        import_timeout=import_timeout,
+        import_memory_limit=import_memory_limit,
+        compact=compact,
+    )
+    if cache is not None:
+        click.echo(
+            f"Metadata cache: {len(cache.hits)} hit(s), {len(cache.misses)} miss(es)."
+        )
 
     click.echo("Publishing metadata to IPFS...")
-    metadata_hash = publish_metadata_to_ipfs(
-        metadata_path=context.metadata_path,
+    ledger = PublishLedger(context.ledger_path)
+    current_hash = None if force_upload else dotenv_values(context.env_path).get("METADATA_HASH")
+    metadata_hash = publish_metadata(
+        metadata=metadata,
         ipfs_node=ipfs_node,
+        metadata_path=context.metadata_path,
+        current_hash=current_hash,
+        ledger=ledger,
     )
+    if metadata_hash == current_hash:
+        click.echo("Metadata unchanged, skipped upload.")
     set_key(str(context.env_path), "METADATA_HASH", metadata_hash)
     click.echo(f"Metadata hash: {metadata_hash}")
@@ -24,14 +24,16 @@ import os
 import subprocess
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterator
+from typing import Iterator, Tuple
 
 import click
+from aea.cli.utils.config import get_ipfs_node_multiaddr
 from operate.cli import OperateApp
 from operate.quickstart.run_service import run_service
 
 from mtd.commands.context_utils import get_mtd_context, require_initialized
 from mtd.context import MtdContext
+from mtd.services.packages import publish_packages
 
 
 SUPPORTED_CHAINS = ("gnosis", "base", "polygon", "optimism")
@@ -55,21 +57,47 @@ def _workspace_cwd(context: MtdContext) -> Iterator[None]:
             os.environ["OPERATE_HOME"] = previous_operate_home
 
 
-def _push_all_packages(context: MtdContext) -> None:
-    """Push local packages to IPFS so service hashes resolve during runtime."""
+def _push_all_packages(context: MtdContext, ipfs_node: Tuple[str, ...] = (), force: bool = False) -> None:
+    """Push local packages to IPFS so service hashes resolve during runtime.
+
+    Packages are pushed to the IPFS node configured for the aea CLI unless
+    `ipfs_node` is given. Packages already pushed with the same hash are
+    skipped unless `force` is set.
+    """
     if not context.packages_dir.exists():
         raise click.ClickException(
             "Dev mode requires a local packages directory in the workspace. "
             "Initialize/copy packages first or run without --dev."
         )
 
-    click.echo("Pushing local packages...")
-    subprocess.run(
-        ["autonomy", "push-all"],
-        check=True,
-        cwd=str(context.workspace_path),
+    nodes = ipfs_node or (get_ipfs_node_multiaddr(),)
+    click.echo(f"Pushing local packages to {', '.join(nodes)}...")
+    results = publish_packages(
+        packages_dir=context.packages_dir,
+        ipfs_node=nodes,
+        cache_dir=context.cache_dir,
+        force=force,
     )
 
+    for result in results:
+        status = "failed" if result.error else "unchanged" if result.skipped else "pushed"
+        click.echo(
+            f"  {status:<9} {result.package_id}  {result.cid or '-'}  "
+            f"(hash {result.hash_seconds * 1000:.0f} ms, upload {result.upload_seconds * 1000:.0f} ms)"
+        )
+        if result.stale:
+            click.echo(
+                f"  Warning: {result.package_id} does not match its hash in packages.json. "
+                "Run 'autonomy packages lock'.",
+                err=True,
+            )
+
+    failed = [result for result in results if result.error]
+    if failed:
+        raise click.ClickException(
+            "Failed to push packages:\n" + "\n".join(f"  {result.package_id}: {result.error}" for result in failed)
+        )
+
 
 def _get_latest_service_hash(context: MtdContext) -> str:
     """Get the latest service hash from autonomy packages."""
@@ -92,9 +120,11 @@ def _get_latest_service_hash(context: MtdContext) -> str:
     )
 
 
-def _run_dev_mode(config_path: Path, context: MtdContext) -> None:
+def _run_dev_mode(
+    config_path: Path, context: MtdContext, ipfs_node: Tuple[str, ...] = (), force_push: bool = False
+) -> None:
     """Dev mode: push local packages, update config hash, run via middleware."""
-    _push_all_packages(context=context)
+    _push_all_packages(context=context, ipfs_node=ipfs_node, force=force_push)
 
     new_hash = _get_latest_service_hash(context=context)
 
@@ -130,8 +160,20 @@ def _run_dev_mode(config_path: Path, context: MtdContext) -> None:
     default=False,
     help="Dev mode: push local packages, then run via host deployment.",
 )
+@click.option(
+    "--ipfs-node",
+    type=str,
+    multiple=True,
+    help="IPFS node to push packages to in dev mode. Repeat to push to several nodes. Defaults to the aea CLI registry node.",
+)
+@click.option(
+    "--force-push",
+    is_flag=True,
+    default=False,
+    help="Push every package in dev mode, even those already pushed to the same nodes with the same hash.",
+)
 @click.pass_context
-def run(ctx: click.Context, chain_config: str, dev: bool) -> None:
+def run(ctx: click.Context, chain_config: str, dev: bool, ipfs_node: Tuple[str, ...], force_push: bool) -> None:
     """Run the mech agent service.
 
     In production mode (default), runs via Docker deployment.
@@ -141,6 +183,7 @@ def run(ctx: click.Context, chain_config: str, dev: bool) -> None:
     Examples:
         mech run -c gnosis
         mech run -c gnosis --dev
+        mech run -c gnosis --dev --force-push
     """
     context = get_mtd_context(ctx)
     require_initialized(context)
@@ -150,7 +193,7 @@ def run(ctx: click.Context, chain_config: str, dev: bool) -> None:
         raise click.ClickException(f"Missing template config: {config_path}")
 
     if dev:
-        _run_dev_mode(config_path=config_path, context=context)
+        _run_dev_mode(config_path=config_path, context=context, ipfs_node=ipfs_node, force_push=force_push)
         return
 
     with _workspace_cwd(context):
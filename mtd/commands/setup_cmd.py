@@ -34,8 +34,36 @@ from mtd.workspace import initialize_workspace
     required=True,
     help="Target chain for the mech service.",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes used to scan tool packages for metadata.",
+)
+@click.option(
+    "--force-upload",
+    is_flag=True,
+    default=False,
+    help="Upload metadata even if its hash matches the METADATA_HASH already in the workspace .env.",
+)
+@click.option(
+    "--no-wait",
+    is_flag=True,
+    default=False,
+    help="Do not wait for the metadata hash update to be mined. Collect its receipt later with 'mech tx wait'.",
+)
+@click.option(
+    "--force-update",
+    is_flag=True,
+    default=False,
+    help="Submit the metadata hash update even while an earlier one is still pending.",
+)
 @click.pass_context
-def setup(ctx: click.Context, chain_config: str) -> None:
+def setup(  # pylint: disable=too-many-arguments
+    ctx: click.Context, chain_config: str, jobs: int, force_upload: bool, no_wait: bool, force_update: bool
+) -> None:
     """Setup on-chain requirements for running a mech agent.
 
     Runs the full setup flow: operate build, env configuration,
@@ -48,4 +76,11 @@ def setup(ctx: click.Context, chain_config: str) -> None:
     if not context.is_initialized():
         click.echo("Workspace not initialized. Bootstrapping workspace...")
         initialize_workspace(context=context, force=False)
-    run_setup(chain_config=chain_config, context=context)
+    run_setup(
+        chain_config=chain_config,
+        context=context,
+        jobs=jobs,
+        force_upload=force_upload,
+        wait=not no_wait,
+        force_update=force_update,
+    )
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tx command group for collecting the receipts of submitted on-chain updates."""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+import click
+from dotenv import dotenv_values
+from web3 import Web3
+from web3.types import TxReceipt
+
+from mtd.commands.context_utils import get_mtd_context, require_initialized
+from mtd.context import MtdContext
+from mtd.services.chain import get_ethereum_client, get_receipt, rpc_urls, wait_for_receipts
+from mtd.services.chain.receipts import DEFAULT_POLL_INTERVAL, MAX_POLL_INTERVAL
+from mtd.services.metadata.ledger import PendingUpdate, PublishLedger
+from mtd.services.metadata.update_onchain import record_receipt
+
+
+DEFAULT_WAIT_TIMEOUT = 600.0
+
+
+@click.group(name="tx")
+def tx() -> None:
+    """Track on-chain updates submitted with --no-wait."""
+
+
+def _pending_by_chain(ledger: PublishLedger) -> Dict[str, List[PendingUpdate]]:
+    """Group the pending updates of the ledger by chain."""
+    chains: Dict[str, List[PendingUpdate]] = {}
+    for pending in ledger.pending():
+        chains.setdefault(pending.chain, []).append(pending)
+    return chains
+
+
+def _web3_client(context: MtdContext, chain: str) -> Web3:
+    """Get the client of the RPC endpoints configured for a chain in the workspace .env."""
+    urls = rpc_urls(dotenv_values(context.env_path), chain)
+    if not urls:
+        raise click.ClickException(f"Missing {chain.upper()}_LEDGER_RPC_0 in {context.env_path}.")
+    return get_ethereum_client(urls, context.rpc_scores_path).w3
+
+
+def _report(ledger: PublishLedger, chain: str, tx_hash: str, receipt: TxReceipt) -> bool:
+    """Record a collected receipt in the ledger, print the outcome and return whether the transaction succeeded."""
+    record_receipt(ledger, tx_hash, receipt)
+    success = bool(receipt["status"])
+    click.echo(
+        f"  {'mined' if success else 'failed':<8} {chain}  {tx_hash}  "
+        f"block {receipt['blockNumber']}, gas {receipt['gasUsed']}"
+    )
+    return success
+
+
+@tx.command()
+@click.pass_context
+def status(ctx: click.Context) -> None:
+    """Check once for the receipts of the pending on-chain updates.
+
+    Mined updates are moved from pending to the workspace ledger.
+
+    Example: mech tx status
+    """
+    context = get_mtd_context(ctx)
+    require_initialized(context)
+
+    ledger = PublishLedger(context.ledger_path)
+    chains = _pending_by_chain(ledger)
+    if not chains:
+        click.echo("No pending transactions.")
+        return
+
+    for chain, updates in chains.items():
+        web3_client = _web3_client(context, chain)
+        for pending in updates:
+            receipt = get_receipt(web3_client, pending.tx_hash)
+            if receipt is not None:
+                _report(ledger, chain, pending.tx_hash, receipt)
+                continue
+            age = time.time() - pending.created_at
+            click.echo(f"  {'pending':<8} {chain}  {pending.tx_hash}  submitted {age:.0f} s ago")
+
+
+@tx.command()
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_WAIT_TIMEOUT,
+    show_default=True,
+    help="Seconds to wait for all pending transactions.",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0, min_open=True),
+    default=DEFAULT_POLL_INTERVAL,
+    show_default=True,
+    help="Seconds before the first re-poll. The interval doubles after each poll, up to "
+    f"{MAX_POLL_INTERVAL:g} seconds.",
+)
+@click.pass_context
+def wait(ctx: click.Context, timeout: float, poll_interval: float) -> None:
+    """Wait for the receipts of the pending on-chain updates.
+
+    Receipts are polled with exponential backoff. Exits with status 1 if a
+    transaction failed or is still pending after --timeout.
+
+    Example: mech tx wait --timeout 300
+    """
+    context = get_mtd_context(ctx)
+    require_initialized(context)
+
+    ledger = PublishLedger(context.ledger_path)
+    chains = _pending_by_chain(ledger)
+    if not chains:
+        click.echo("No pending transactions.")
+        return
+
+    deadline = time.monotonic() + timeout
+    results: List[bool] = []
+    for chain, pending in chains.items():
+        click.echo(f"Waiting for {len(pending)} transaction(s) on {chain}...")
+        wait_for_receipts(
+            _web3_client(context, chain),
+            [update.tx_hash for update in pending],
+            timeout=max(deadline - time.monotonic(), 0),
+            poll_interval=poll_interval,
+            on_receipt=lambda tx_hash, receipt, chain=chain: results.append(_report(ledger, chain, tx_hash, receipt)),
+        )
+
+    still_pending = ledger.pending()
+    failed = results.count(False)
+    click.echo(f"{len(results) - failed} mined, {failed} failed, {len(still_pending)} still pending.")
+    if failed or still_pending:
+        ctx.exit(1)
+
+
+@tx.command()
+@click.argument("tx_hashes", nargs=-1)
+@click.option("--chain", type=str, default=None, help="Only clear pending transactions on this chain, e.g. gnosis.")
+@click.pass_context
+def clear(ctx: click.Context, tx_hashes: Tuple[str, ...], chain: Optional[str]) -> None:
+    """Drop pending on-chain updates that will never be mined.
+
+    Without TX_HASHES, every pending update is dropped, or those on --chain.
+    No chain is queried, so only drop a transaction you know was dropped or
+    replaced; pending updates are otherwise settled automatically before
+    the next update.
+
+    Example: mech tx clear 0xabc...
+    """
+    context = get_mtd_context(ctx)
+    require_initialized(context)
+
+    ledger = PublishLedger(context.ledger_path)
+    pending = ledger.pending(chain)
+    unknown = set(tx_hashes) - {update.tx_hash for update in pending}
+    if unknown:
+        raise click.ClickException(f"Not pending: {', '.join(sorted(unknown))}")
+
+    cleared = [update for update in pending if not tx_hashes or update.tx_hash in tx_hashes]
+    if not cleared:
+        click.echo("No pending transactions.")
+        return
+
+    for update in cleared:
+        ledger.discard(update.tx_hash)
+        click.echo(f"  {'cleared':<8} {update.chain}  {update.tx_hash}")
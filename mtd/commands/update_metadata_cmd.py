@@ -22,12 +22,33 @@
 import click
 
 from mtd.commands.context_utils import get_mtd_context, require_initialized
+from mtd.services.chain.receipts import DEFAULT_TIMEOUT
+from mtd.services.metadata.ledger import PublishLedger
 from mtd.services.metadata.update_onchain import update_metadata_onchain
 
 
 @click.command(name="update-metadata")
+@click.option(
+    "--no-wait",
+    is_flag=True,
+    default=False,
+    help="Return as soon as the transaction is submitted. Collect its receipt later with 'mech tx wait'.",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_TIMEOUT,
+    show_default=True,
+    help="Seconds to wait for the transaction to be mined.",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Submit even if an earlier update is still pending. It reverts if both use the same Safe nonce.",
+)
 @click.pass_context
-def update_metadata(ctx: click.Context) -> None:
+def update_metadata(ctx: click.Context, no_wait: bool, timeout: float, force: bool) -> None:
     """Update the metadata hash on-chain via Safe transaction.
 
     Example: mech update-metadata
@@ -36,9 +57,26 @@ def update_metadata(ctx: click.Context) -> None:
     require_initialized(context)
 
     click.echo("Updating metadata hash on-chain...")
+    ledger = PublishLedger(context.ledger_path)
     success, tx_hash = update_metadata_onchain(
         env_path=context.env_path,
         private_key_path=context.keys_dir / "ethereum_private_key.txt",
+        ledger=ledger,
+        wait=not no_wait,
+        timeout=timeout,
+        rpc_scores_path=context.rpc_scores_path,
+        force=force,
     )
+    if tx_hash is None:
+        click.echo("On-chain metadata hash unchanged, skipped transaction.")
+        return
+    if no_wait:
+        click.echo(f"Submitted: {tx_hash}")
+        click.echo("Collect the receipt with: mech tx wait")
+        return
     click.echo(f"Success: {success}")
     click.echo(f"Tx Hash: {tx_hash}")
+    recorded = ledger.updates(limit=1)
+    if recorded and recorded[0].tx_hash == tx_hash and recorded[0].gas_accuracy is not None:
+        update = recorded[0]
+        click.echo(f"Gas used: {update.gas_used} ({update.gas_accuracy:.0%} of estimate {update.gas_estimate})")
@@ -24,6 +24,9 @@ from pathlib import Path
 
 
 INITIALIZED_MARKER = ".mech_initialized"
+CACHE_DIR = ".mech_cache"
+LEDGER_FILE = "ledger.db"
+RPC_SCORES_FILE = "rpc_scores.json"
 
 
 @dataclass(frozen=True)
@@ -43,6 +46,21 @@ class MtdContext:
         """Return the workspace initialization marker path."""
         return self.workspace_path / INITIALIZED_MARKER
 
+    @property
+    def cache_dir(self) -> Path:
+        """Return the workspace cache directory path."""
+        return self.workspace_path / CACHE_DIR
+
+    @property
+    def ledger_path(self) -> Path:
+        """Return the workspace publish ledger path."""
+        return self.workspace_path / LEDGER_FILE
+
+    @property
+    def rpc_scores_path(self) -> Path:
+        """Return the path of the RPC endpoint stats kept across runs."""
+        return self.cache_dir / RPC_SCORES_FILE
+
     def ensure_workspace_exists(self) -> None:
         """Ensure workspace root exists."""
         self.workspace_path.mkdir(parents=True, exist_ok=True)
@@ -30,6 +30,8 @@ from operate.services.protocol import EthSafeTxBuilder
 from operate.services.service import Service
 from operate.utils.gnosis import SafeOperation
 
+from mtd.services.chain import check_owner
+
 MECH_MARKETPLACE_JSON_URL = (
     "https://raw.githubusercontent.com/valory-xyz/mech-quickstart/"
     "refs/heads/main/contracts/MechMarketplace.json"
@@ -79,11 +81,14 @@ logger = getLogger(__name__)
 def deploy_mech(sftxb: EthSafeTxBuilder, service: Service) -> Tuple[str, str]:
     """Deploy a new Mech on-chain via the MechMarketplace contract.
 
+    The chain id, the master Safe owners and the code of the marketplace
+    and factory are checked in one JSON-RPC batch first, so a wrong RPC or
+    Safe fails before a transaction is built.
+
     Returns (mech_address, agent_id).
     """
     mech_type = service.env_variables.get("MECH_TYPE", {}).get("value", "Native")
 
-    abi = requests.get(MECH_MARKETPLACE_JSON_URL, timeout=DEFAULT_TIMEOUT).json()["abi"]
     chain = Chain.from_string(service.home_chain)
     mech_marketplace_address = service.env_variables["MECH_MARKETPLACE_ADDRESS"][
         "value"
@@ -106,9 +111,28 @@ def deploy_mech(sftxb: EthSafeTxBuilder, service: Service) -> Tuple[str, str]:
             "value", 10000000000000000
         )
     )
-    contract = sftxb.ledger_api.api.eth.contract(
-        address=Web3.to_checksum_address(mech_marketplace_address), abi=abi
+    web3_client = sftxb.ledger_api.api
+    signer = sftxb.crypto.address
+    contract_addresses = (
+        Web3.to_checksum_address(mech_marketplace_address),
+        Web3.to_checksum_address(mech_factory_address),
     )
+    codes = check_owner(
+        web3_client,
+        sftxb.safe,
+        signer,
+        chain.id,
+        reads=[
+            lambda address=address: web3_client.eth.get_code(address)
+            for address in contract_addresses
+        ],
+    )
+    for address, code in zip(contract_addresses, codes):
+        if not code:
+            raise ValueError(f"No contract deployed at {address} on {chain.value}.")
+
+    abi = requests.get(MECH_MARKETPLACE_JSON_URL, timeout=DEFAULT_TIMEOUT).json()["abi"]
+    contract = web3_client.eth.contract(address=contract_addresses[0], abi=abi)
     data = contract.encode_abi(
         "create",
         args=[
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""Chain transaction services."""
+
+from mtd.services.chain.fees import FeeCaps, gas_limit, suggest_fees
+from mtd.services.chain.pool import PooledHTTPProvider, RPCPool, rpc_urls
+from mtd.services.chain.preflight import Preflight, batch_read, check_owner, preflight
+from mtd.services.chain.receipts import get_receipt, wait_for_receipts
+from mtd.services.chain.rpc import get_ethereum_client, get_safe
+
+
+__all__ = [
+    "FeeCaps",
+    "PooledHTTPProvider",
+    "Preflight",
+    "RPCPool",
+    "batch_read",
+    "check_owner",
+    "gas_limit",
+    "get_ethereum_client",
+    "get_receipt",
+    "get_safe",
+    "preflight",
+    "rpc_urls",
+    "suggest_fees",
+    "wait_for_receipts",
+]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Gas estimation and EIP-1559 fee pricing."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from web3 import Web3
+from web3.types import FeeHistory
+
+
+FEE_HISTORY_BLOCKS = 10
+DEFAULT_REWARD_PERCENTILE = 50
+BASE_FEE_MULTIPLIER = 2
+GAS_MARGIN = 1.2
+
+
+@dataclass(frozen=True)
+class FeeCaps:
+    """Upper bounds, in wei, on the fees paid for a transaction."""
+
+    max_fee_per_gas: Optional[int] = None
+    max_priority_fee_per_gas: Optional[int] = None
+
+    @classmethod
+    def from_gwei(cls, max_fee_per_gas: Optional[str], max_priority_fee_per_gas: Optional[str]) -> "FeeCaps":
+        """Build caps from gwei amounts, leaving empty ones unbounded."""
+        return cls(
+            max_fee_per_gas=Web3.to_wei(max_fee_per_gas, "gwei") if max_fee_per_gas else None,
+            max_priority_fee_per_gas=Web3.to_wei(max_priority_fee_per_gas, "gwei") if max_priority_fee_per_gas else None,
+        )
+
+
+def _cap(value: int, cap: Optional[int]) -> int:
+    """Bound a fee by a cap, if any."""
+    return value if cap is None else min(value, cap)
+
+
+def suggest_fees(
+    web3_client: Web3,
+    caps: FeeCaps = FeeCaps(),
+    percentile: float = DEFAULT_REWARD_PERCENTILE,
+    blocks: int = FEE_HISTORY_BLOCKS,
+    history: Optional[FeeHistory] = None,
+    gas_price: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Get the fee fields of a transaction from the recent fee history of the chain.
+
+    The priority fee is the median over the last `blocks` blocks of the
+    `percentile`-th reward paid in each, and the max fee covers the base
+    fee of the next block doubling. Chains without EIP-1559 get a legacy
+    `gasPrice`. Raises ValueError if the caps are below the base fee, as
+    such a transaction would never be included.
+
+    A fee history and gas price already read, e.g. by `preflight`, are
+    used instead of querying the node.
+    """
+    if history is None:
+        history = web3_client.eth.fee_history(blocks, "latest", [percentile])
+    base_fees = history.get("baseFeePerGas") or []
+    if not any(base_fees):
+        gas_price = web3_client.eth.gas_price if gas_price is None else gas_price
+        return {"gasPrice": _cap(gas_price, caps.max_fee_per_gas)}
+
+    next_base_fee = base_fees[-1]
+    if caps.max_fee_per_gas is not None and caps.max_fee_per_gas < next_base_fee:
+        raise ValueError(
+            f"Max fee cap of {Web3.from_wei(caps.max_fee_per_gas, 'gwei')} gwei is below "
+            f"the current base fee of {Web3.from_wei(next_base_fee, 'gwei')} gwei."
+        )
+
+    rewards = sorted(reward[0] for reward in history.get("reward") or [] if reward and reward[0])
+    priority_fee = rewards[len(rewards) // 2] if rewards else web3_client.eth.max_priority_fee
+    priority_fee = _cap(priority_fee, caps.max_priority_fee_per_gas)
+    max_fee = _cap(BASE_FEE_MULTIPLIER * next_base_fee + priority_fee, caps.max_fee_per_gas)
+    return {"maxFeePerGas": max_fee, "maxPriorityFeePerGas": min(priority_fee, max_fee)}
+
+
+def gas_limit(gas_estimate: int, margin: float = GAS_MARGIN) -> int:
+    """Get the gas limit to set for an estimate, with a margin for state changes before inclusion."""
+    return int(gas_estimate * margin)
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+"""Pool of RPC endpoints ranked by their measured latency and error rate."""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import requests
+from web3 import HTTPProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+
+RPC_ENV_KEYS = 4
+SCORES_VERSION = 1
+SMOOTHING = 0.3
+DEFAULT_LATENCY = 0.5
+ERROR_PENALTY = 10.0
+ERROR_HALF_LIFE = 600.0
+NON_IDEMPOTENT_METHODS = frozenset({"eth_sendRawTransaction", "eth_sendTransaction"})
+
+
+_logger = logging.getLogger(__name__)
+
+
+def rpc_urls(env: Mapping[str, Optional[str]], chain: str) -> List[str]:
+    """Get the distinct endpoints configured for a chain as `<CHAIN>_LEDGER_RPC_0` to `_3`, in order."""
+    urls = (env.get(f"{chain.upper()}_LEDGER_RPC_{index}") for index in range(RPC_ENV_KEYS))
+    return list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+
+
+@dataclass
+class EndpointStats:
+    """Moving averages of the latency and error rate of an endpoint.
+
+    Endpoints never measured are assumed to answer in DEFAULT_LATENCY
+    seconds, so they are tried once the measured ones get slower than that.
+    """
+
+    latency: float = DEFAULT_LATENCY
+    error_rate: float = 0.0
+    updated_at: float = 0.0
+
+    @classmethod
+    def from_saved(cls, saved: Any) -> "EndpointStats":
+        """Build stats from their saved form, falling back to defaults when it is malformed."""
+        if not isinstance(saved, dict):
+            return cls()
+        values = {stat.name: saved[stat.name] for stat in fields(cls) if stat.name in saved}
+        if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values.values()):
+            return cls()
+        return cls(**{name: float(value) for name, value in values.items()})
+
+    def score(self, now: float) -> float:
+        """Get the expected cost of a request in seconds, lower is healthier.
+
+        Errors weigh ERROR_PENALTY seconds each and are forgotten with a
+        half-life of ERROR_HALF_LIFE seconds, so a failing endpoint is
+        tried again later.
+        """
+        decay = 0.5 ** (max(now - self.updated_at, 0.0) / ERROR_HALF_LIFE)
+        return self.latency + ERROR_PENALTY * self.error_rate * decay
+
+    def record(self, latency: Optional[float], now: float) -> None:
+        """Add the latency of a successful request, or None for a failed one."""
+        self.error_rate += SMOOTHING * ((latency is None) - self.error_rate)
+        if latency is not None:
+            self.latency += SMOOTHING * (latency - self.latency)
+        self.updated_at = now
+
+
+class RPCPool:
+    """Endpoints of one chain with their stats, kept in `scores_path` across processes if given.
+
+    Stats are saved when the process exits, or earlier with `save`, rather
+    than after every request.
+    """
+
+    def __init__(self, urls: Sequence[str], scores_path: Optional[Path] = None) -> None:
+        """Initialize the pool, loading the saved stats of its endpoints."""
+        if not urls:
+            raise ValueError("An RPC pool needs at least one endpoint.")
+        self.urls = list(urls)
+        self.scores_path = scores_path
+        self._lock = threading.Lock()
+        self._changed = False
+        saved = self._load()
+        self.stats = {url: EndpointStats.from_saved(saved.get(url)) for url in self.urls}
+        if scores_path is not None:
+            atexit.register(self._save_at_exit)
+
+    def _load(self) -> Dict[str, Dict[str, float]]:
+        """Load the saved stats, discarding unreadable or outdated files."""
+        if self.scores_path is None:
+            return {}
+        try:
+            data = json.loads(self.scores_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != SCORES_VERSION:
+            return {}
+        endpoints = data.get("endpoints")
+        return endpoints if isinstance(endpoints, dict) else {}
+
+    def save(self) -> None:
+        """Save the stats if they changed, keeping those of endpoints outside the pool."""
+        if self.scores_path is None or not self._changed:
+            return
+        with self._lock:
+            self._changed = False
+            endpoints = {**self._load(), **{url: asdict(stats) for url, stats in self.stats.items()}}
+            self.scores_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.scores_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            temp_path.write_text(json.dumps({"version": SCORES_VERSION, "endpoints": endpoints}), encoding="utf-8")
+            temp_path.replace(self.scores_path)
+
+    def _save_at_exit(self) -> None:
+        """Save the stats on exit, where a failure is not worth more than a log line."""
+        try:
+            self.save()
+        except OSError as e:
+            _logger.debug("Could not save RPC scores to %s: %s", self.scores_path, e)
+
+    def ranked(self) -> List[str]:
+        """Get the endpoints, healthiest first and in configured order on ties."""
+        now = time.time()
+        with self._lock:
+            scores = {url: stats.score(now) for url, stats in self.stats.items()}
+        return sorted(self.urls, key=scores.__getitem__)
+
+    def record(self, url: str, latency: Optional[float]) -> None:
+        """Record the latency of a successful request to an endpoint, or None for a failed one."""
+        with self._lock:
+            self.stats[url].record(latency, time.time())
+            self._changed = True
+
+
+class PooledHTTPProvider(HTTPProvider):
+    """HTTP provider sending each request to the healthiest endpoint of a pool.
+
+    A request whose endpoint fails to answer is retried on the next
+    endpoint, unless it sends a transaction. Each endpoint is tried once,
+    so a slow or failing one costs at most one attempt.
+    """
+
+    def __init__(self, pool: RPCPool, **kwargs: Any) -> None:
+        """Initialize the provider, taking the HTTPProvider options but the endpoint."""
+        super().__init__(pool.urls[0], exception_retry_configuration=None, **kwargs)
+        self.pool = pool
+
+    def __str__(self) -> str:
+        """Describe the provider."""
+        return f"RPC pool {', '.join(self.pool.urls)}"
+
+    def _post(self, request_data: bytes, retry: bool) -> bytes:
+        """Post a request to the healthiest endpoint, then to the others while it fails and `retry` is set."""
+        last_error: Optional[requests.RequestException] = None
+        for endpoint_uri in self.pool.ranked():
+            start = time.monotonic()
+            try:
+                response = self._request_session_manager.make_post_request(
+                    endpoint_uri, request_data, **self.get_request_kwargs()
+                )
+            except requests.RequestException as e:
+                self.pool.record(endpoint_uri, None)
+                if not retry:
+                    raise
+                self.logger.debug("Request to %s failed, trying the next endpoint: %s", endpoint_uri, e)
+                last_error = e
+                continue
+            self.pool.record(endpoint_uri, time.monotonic() - start)
+            return response
+        raise last_error  # type: ignore[misc]
+
+    def _make_request(self, method: RPCEndpoint, request_data: bytes) -> bytes:
+        """Post a single request."""
+        return self._post(request_data, retry=method not in NON_IDEMPOTENT_METHODS)
+
+    def make_batch_request(
+        self, batch_requests: List[Tuple[RPCEndpoint, Any]]
+    ) -> Union[List[RPCResponse], RPCResponse]:
+        """Post a batch request, retried elsewhere unless it sends a transaction."""
+        request_data = self.encode_batch_rpc_request(batch_requests)
+        retry = not any(method in NON_IDEMPOTENT_METHODS for method, _ in batch_requests)
+        response = self.decode_rpc_response(self._post(request_data, retry))
+        if not isinstance(response, list) or any(item.get("id") is None for item in response):
+            return response
+        # Nodes may answer a batch in any order, callers expect the order of the requests.
+        return sorted(response, key=lambda item: item["id"])
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+"""Chain and Safe reads made before sending a Safe transaction, in one JSON-RPC batch."""
+
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import aiohttp
+import requests
+from safe_eth.eth.contracts import get_safe_contract  # pylint:disable=import-error
+from web3 import Web3
+from web3.contract.contract import ContractFunction
+from web3.exceptions import BadResponseFormat, Web3RPCError
+from web3.types import FeeHistory
+
+from mtd.services.chain.fees import DEFAULT_REWARD_PERCENTILE, FEE_HISTORY_BLOCKS
+
+
+Read = Callable[[], Any]
+
+# Raised by nodes or proxies that reject batch requests with an HTTP error,
+# or answer them with something other than one result per request.
+BATCH_ERRORS = (
+    Web3RPCError,
+    BadResponseFormat,
+    requests.RequestException,
+    aiohttp.ClientError,
+    AttributeError,
+    KeyError,
+    TypeError,
+    ValueError,
+)
+
+
+@dataclass(frozen=True)
+class Preflight:  # pylint: disable=too-many-instance-attributes
+    """State of the chain, the sender and its Safe, read at once before sending a Safe transaction.
+
+    `reads` holds the results of the extra reads passed to `preflight`, in
+    order, and `block_number` the latest block covered by the fee history.
+    """
+
+    chain_id: int
+    sender_nonce: int
+    gas_price: int
+    fee_history: FeeHistory
+    safe_version: str
+    safe_nonce: int
+    owners: Tuple[str, ...]
+    threshold: int
+    reads: Tuple[Any, ...] = ()
+    block_number: Optional[int] = None
+
+    def check(self, chain_id: int, signer: str) -> None:
+        """Check that the RPC serves the expected chain and that the signer alone can execute Safe transactions.
+
+        Raises ValueError otherwise, before any gas is spent.
+        """
+        _check_owner(self.chain_id, self.owners, chain_id, signer)
+        if self.threshold != 1:
+            raise ValueError(f"Safe threshold is {self.threshold}, only single-signer Safes are supported.")
+
+
+def _check_owner(served_chain_id: int, owners: Sequence[str], chain_id: int, signer: str) -> None:
+    """Raise ValueError if the RPC serves another chain or the signer does not own the Safe."""
+    if served_chain_id != chain_id:
+        raise ValueError(f"RPC serves chain id {served_chain_id}, expected {chain_id}.")
+    if signer.lower() not in {owner.lower() for owner in owners}:
+        raise ValueError(f"{signer} is not an owner of the Safe.")
+
+
+def _result(value: Any) -> Any:
+    """Get the value of a read, calling it if it is a contract function."""
+    return value.call() if isinstance(value, ContractFunction) else value
+
+
+def batch_read(web3_client: Web3, reads: Sequence[Read]) -> List[Any]:
+    """Run reads as a single JSON-RPC batch request and return their results in order.
+
+    Each read is a callable making one web3 request, e.g.
+    `lambda: web3_client.eth.chain_id`, or returning a contract function
+    to `call`. Nodes rejecting batch requests, with an RPC or HTTP error
+    or a malformed response, are read one request at a time instead.
+    """
+    try:
+        with web3_client.batch_requests() as batch:
+            for read in reads:
+                batch.add(read())
+            results = batch.execute()
+        if not isinstance(results, list) or len(results) != len(reads):
+            raise BadResponseFormat(f"Expected {len(reads)} batch results, got {results!r}.")
+        return results
+    except BATCH_ERRORS:
+        return [_result(read()) for read in reads]
+
+
+def preflight(  # pylint: disable=too-many-arguments
+    web3_client: Web3,
+    safe_address: str,
+    sender: str,
+    reads: Sequence[Read] = (),
+    blocks: int = FEE_HISTORY_BLOCKS,
+    percentile: float = DEFAULT_REWARD_PERCENTILE,
+) -> Preflight:
+    """Read the chain id, fees, sender nonce and Safe version, nonce, owners and threshold in one round-trip.
+
+    The fee history covers the last `blocks` blocks at the reward
+    `percentile` used by `suggest_fees`. Extra `reads`, such as a contract
+    getter, are added to the same batch.
+    """
+    safe = get_safe_contract(web3_client, Web3.to_checksum_address(safe_address))
+    sender = Web3.to_checksum_address(sender)
+    results = batch_read(
+        web3_client,
+        [
+            lambda: web3_client.eth.chain_id,
+            lambda: web3_client.eth.get_transaction_count(sender, "pending"),
+            lambda: web3_client.eth.gas_price,
+            lambda: web3_client.eth.fee_history(blocks, "latest", [percentile]),
+            safe.functions.VERSION,
+            safe.functions.nonce,
+            safe.functions.getOwners,
+            safe.functions.getThreshold,
+            *reads,
+        ],
+    )
+    chain_id, sender_nonce, gas_price, fee_history, safe_version, safe_nonce, owners, threshold, *extra = results
+    return Preflight(
+        chain_id=chain_id,
+        sender_nonce=sender_nonce,
+        gas_price=gas_price,
+        fee_history=fee_history,
+        safe_version=safe_version,
+        safe_nonce=safe_nonce,
+        owners=tuple(owners),
+        threshold=threshold,
+        reads=tuple(extra),
+        block_number=fee_history["oldestBlock"] + len(fee_history["gasUsedRatio"]) - 1,
+    )
+
+
+def check_owner(
+    web3_client: Web3,
+    safe_address: str,
+    signer: str,
+    chain_id: int,
+    reads: Sequence[Read] = (),
+) -> Tuple[Any, ...]:
+    """Check in one round-trip that the RPC serves `chain_id` and that the signer owns the Safe.
+
+    For callers whose transaction is built and sent by another library,
+    so fees, nonces and the Safe threshold are left to it. Returns the
+    results of the extra `reads`, in order. Raises ValueError otherwise.
+    """
+    safe = get_safe_contract(web3_client, Web3.to_checksum_address(safe_address))
+    served_chain_id, owners, *extra = batch_read(
+        web3_client, [lambda: web3_client.eth.chain_id, safe.functions.getOwners, *reads]
+    )
+    _check_owner(served_chain_id, owners, chain_id, signer)
+    return tuple(extra)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Transaction receipt polling with exponential backoff."""
+
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+from web3.types import TxReceipt
+
+
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_POLL_INTERVAL = 1.0
+MAX_POLL_INTERVAL = 30.0
+BACKOFF_FACTOR = 2.0
+
+
+def get_receipt(web3_client: Web3, tx_hash: str) -> Optional[TxReceipt]:
+    """Get the receipt of a transaction, or None if it is not mined yet."""
+    try:
+        return web3_client.eth.get_transaction_receipt(tx_hash)  # type: ignore[arg-type]
+    except TransactionNotFound:
+        return None
+
+
+def wait_for_receipts(  # pylint: disable=too-many-arguments
+    web3_client: Web3,
+    tx_hashes: Sequence[str],
+    timeout: float = DEFAULT_TIMEOUT,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    max_poll_interval: float = MAX_POLL_INTERVAL,
+    on_receipt: Optional[Callable[[str, TxReceipt], None]] = None,
+) -> Dict[str, TxReceipt]:
+    """Poll the receipts of transactions until all are mined or `timeout` seconds have passed.
+
+    The interval between polls starts at `poll_interval` and doubles up
+    to `max_poll_interval`. With a zero timeout, each receipt is polled
+    once. Returns the receipts found, by transaction hash, calling
+    `on_receipt` as each one arrives.
+    """
+    deadline = time.monotonic() + timeout
+    pending = list(tx_hashes)
+    receipts: Dict[str, TxReceipt] = {}
+    delay = poll_interval
+    while True:
+        for tx_hash in list(pending):
+            receipt = get_receipt(web3_client, tx_hash)
+            if receipt is None:
+                continue
+            pending.remove(tx_hash)
+            receipts[tx_hash] = receipt
+            if on_receipt is not None:
+                on_receipt(tx_hash, receipt)
+
+        remaining = deadline - time.monotonic()
+        if not pending or remaining <= 0:
+            return receipts
+        time.sleep(min(delay, remaining))
+        delay = min(delay * BACKOFF_FACTOR, max_poll_interval)
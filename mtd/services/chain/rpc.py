@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+"""Shared RPC clients, one per set of endpoints and process."""
+
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from safe_eth.eth import EthereumClient  # pylint:disable=import-error
+from safe_eth.safe import Safe  # pylint:disable=import-error
+
+from mtd.services.chain.pool import PooledHTTPProvider, RPCPool
+
+
+_clients: Dict[Tuple[Tuple[str, ...], Optional[Path]], EthereumClient] = {}
+_safes: Dict[Tuple[EthereumClient, str], Safe] = {}
+_clients_lock = threading.Lock()
+
+
+def _pooled_client(rpc_urls: Sequence[str], scores_path: Optional[Path]) -> EthereumClient:
+    """Create a client routing every request through a pool of endpoints."""
+    client = EthereumClient(rpc_urls[0])
+    pool = RPCPool(rpc_urls, scores_path)
+    for w3, timeout in ((client.w3, client.timeout), (client.slow_w3, client.slow_timeout)):
+        w3.provider = PooledHTTPProvider(
+            pool,
+            cache_allowed_requests=client.use_request_caching,
+            request_kwargs={"timeout": timeout},
+            session=client.http_session,
+        )
+    return client
+
+
+def get_ethereum_client(
+    rpc_urls: Union[str, Sequence[str]], scores_path: Optional[Path] = None
+) -> EthereumClient:
+    """Get the client of one or more RPC endpoints, creating it on first use.
+
+    The client's `w3` and the Safe calls made through it share one
+    keep-alive `requests` session, and constant results such as
+    `eth_chainId` are cached. Later calls in the same process, from any
+    command, reuse both the connections and the cache.
+
+    With several endpoints, each request goes to the healthiest one and
+    reads are retried on the others if it fails (see `PooledHTTPProvider`).
+    Endpoint stats are kept in `scores_path`, if given, across runs.
+    """
+    urls = (rpc_urls,) if isinstance(rpc_urls, str) else tuple(rpc_urls)
+    key = (urls, scores_path if len(urls) > 1 else None)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = EthereumClient(urls[0]) if len(urls) == 1 else _pooled_client(urls, scores_path)
+        return client
+
+
+def get_safe(safe_address: str, ethereum_client: EthereumClient, version: Optional[str] = None) -> Safe:
+    """Get the Safe at an address through a client, creating it on first use.
+
+    The Safe version, read on creation unless given, is fetched once per process.
+    """
+    key = (ethereum_client, safe_address)
+    with _clients_lock:
+        safe = _safes.get(key)
+        if safe is None:
+            safe = _safes[key] = Safe(  # pylint:disable=abstract-class-instantiated
+                safe_address, ethereum_client, version
+            )
+        return safe
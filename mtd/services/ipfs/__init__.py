@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""Local IPFS services."""
+
+from mtd.services.ipfs.dag import file_cid
+from mtd.services.ipfs.server import Blockstore, LocalIPFSServer, build_app
+
+
+__all__ = [
+    "Blockstore",
+    "LocalIPFSServer",
+    "build_app",
+    "file_cid",
+]
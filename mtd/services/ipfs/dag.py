@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""UnixFS DAG building, matching `ipfs add` with its default options.
+
+Files are split into 256 KiB chunks stored as dag-pb UnixFS leaves and
+linked in a balanced tree of at most 174 links per node; CIDs are version 0
+(base58 sha256 multihashes).
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from aea.helpers.ipfs.pb import merkledag_pb2, unixfs_pb2
+from multibase import multibase
+
+
+CHUNK_SIZE = 262144
+MAX_LINKS = 174
+SHA256_MULTIHASH_PREFIX = b"\x12\x20"
+PB_DATA_FIELD = 1
+PB_LINKS_FIELD = 2
+LENGTH_DELIMITED = 2
+BASE58BTC = "base58btc"
+BASE58BTC_PREFIX = "z"
+
+PutBlock = Callable[[str, bytes], None]
+GetBlock = Callable[[str], Optional[bytes]]
+
+
+@dataclass(frozen=True)
+class DagNode:
+    """A node added to the DAG: its CID, cumulative size and file size."""
+
+    cid: str
+    size: int
+    filesize: int = 0
+
+
+def _to_cid(multihash: bytes) -> str:
+    """Encode a multihash as a CIDv0."""
+    return multibase.encode(BASE58BTC, multihash).decode()[len(BASE58BTC_PREFIX) :]
+
+
+def _to_multihash(cid: str) -> bytes:
+    """Decode a CIDv0 to its multihash."""
+    return multibase.decode(BASE58BTC_PREFIX + cid)
+
+
+def _varint(value: int) -> bytes:
+    """Encode an unsigned protobuf varint."""
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _field(number: int, payload: bytes) -> bytes:
+    """Encode a length-delimited protobuf field."""
+    return _varint(number << 3 | LENGTH_DELIMITED) + _varint(len(payload)) + payload
+
+
+def _encode_node(links: List[Tuple[str, str, int]], data: bytes) -> bytes:
+    """Encode a dag-pb node, links first as the dag-pb spec requires."""
+    encoded = bytearray()
+    for cid, name, size in links:
+        link = merkledag_pb2.PBLink()  # pylint: disable=no-member
+        link.Hash = _to_multihash(cid)
+        link.Name = name
+        link.Tsize = size
+        encoded += _field(PB_LINKS_FIELD, link.SerializeToString(deterministic=True))
+    encoded += _field(PB_DATA_FIELD, data)
+    return bytes(encoded)
+
+
+def _block_cid(block: bytes) -> str:
+    """Get the CIDv0 of a block."""
+    return _to_cid(SHA256_MULTIHASH_PREFIX + hashlib.sha256(block).digest())
+
+
+def _unixfs(data_type: int, data: bytes = b"", filesize: Optional[int] = None, blocksizes: Tuple[int, ...] = ()) -> bytes:
+    """Encode UnixFS node data."""
+    unixfs = unixfs_pb2.Data()  # pylint: disable=no-member
+    unixfs.Type = data_type
+    if data:
+        unixfs.Data = data
+    if filesize is not None:
+        unixfs.filesize = filesize
+    unixfs.blocksizes.extend(blocksizes)
+    return unixfs.SerializeToString(deterministic=True)
+
+
+def _put_node(links: List[Tuple[str, str, int]], data: bytes, put: Optional[PutBlock]) -> Tuple[str, int]:
+    """Encode a node, store it if a blockstore is given and return its CID and block size."""
+    block = _encode_node(links, data)
+    cid = _block_cid(block)
+    if put is not None:
+        put(cid, block)
+    return cid, len(block)
+
+
+def add_file(payload: bytes, put: Optional[PutBlock] = None) -> DagNode:
+    """Build the DAG of a file, storing its blocks with `put` if given."""
+    level = []
+    for offset in range(0, max(len(payload), 1), CHUNK_SIZE):
+        chunk = payload[offset : offset + CHUNK_SIZE]
+        cid, size = _put_node([], _unixfs(unixfs_pb2.Data.File, chunk, len(chunk)), put)
+        level.append(DagNode(cid=cid, size=size, filesize=len(chunk)))
+
+    while len(level) > 1:
+        parents = []
+        for start in range(0, len(level), MAX_LINKS):
+            children = level[start : start + MAX_LINKS]
+            filesize = sum(child.filesize for child in children)
+            data = _unixfs(
+                unixfs_pb2.Data.File,
+                filesize=filesize,
+                blocksizes=tuple(child.filesize for child in children),
+            )
+            cid, size = _put_node([(child.cid, "", child.size) for child in children], data, put)
+            parents.append(DagNode(cid=cid, size=size + sum(child.size for child in children), filesize=filesize))
+        level = parents
+    return level[0]
+
+
+def add_directory(entries: Dict[str, DagNode], put: Optional[PutBlock] = None) -> DagNode:
+    """Build a directory node linking named entries, storing it with `put` if given."""
+    links = [(entries[name].cid, name, entries[name].size) for name in sorted(entries)]
+    cid, size = _put_node(links, _unixfs(unixfs_pb2.Data.Directory), put)
+    return DagNode(cid=cid, size=size + sum(entry.size for entry in entries.values()))
+
+
+def file_cid(payload: bytes) -> str:
+    """Compute the CID `ipfs add` gives to bytes with its default options."""
+    return add_file(payload).cid
+
+
+def _load(cid: str, get: GetBlock) -> Tuple[merkledag_pb2.PBNode, unixfs_pb2.Data]:  # pylint: disable=no-member
+    """Load and decode a dag-pb UnixFS node."""
+    block = get(cid)
+    if block is None:
+        raise KeyError(f"block {cid} not found")
+    node = merkledag_pb2.PBNode.FromString(block)  # pylint: disable=no-member
+    return node, unixfs_pb2.Data.FromString(node.Data)  # pylint: disable=no-member
+
+
+def resolve(path: str, get: GetBlock) -> str:
+    """Resolve a `<cid>[/<name>...]` path to the CID it points to."""
+    cid, *names = [part for part in path.split("/") if part and part != "ipfs"]
+    for name in names:
+        node, unixfs = _load(cid, get)
+        if unixfs.Type != unixfs_pb2.Data.Directory:  # pylint: disable=no-member
+            raise KeyError(f"{cid} is not a directory")
+        for link in node.Links:
+            if link.Name == name:
+                cid = _to_cid(link.Hash)
+                break
+        else:
+            raise KeyError(f"no link named {name!r} under {cid}")
+    return cid
+
+
+def read_file(cid: str, get: GetBlock) -> bytes:
+    """Read the content of a file DAG."""
+    node, unixfs = _load(cid, get)
+    if unixfs.Type not in (unixfs_pb2.Data.File, unixfs_pb2.Data.Raw):  # pylint: disable=no-member
+        raise ValueError(f"{cid} is a directory, not a file")
+    return unixfs.Data + b"".join(read_file(_to_cid(link.Hash), get) for link in node.Links)
+
+
+def walk(cid: str, get: GetBlock) -> List[str]:
+    """List the CIDs of every block reachable from a root."""
+    node, _ = _load(cid, get)
+    reachable = [cid]
+    for link in node.Links:
+        reachable.extend(walk(_to_cid(link.Hash), get))
+    return reachable
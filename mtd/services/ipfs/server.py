@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Local stand-in for the subset of the IPFS HTTP API used by the CLI."""
+
+import asyncio
+import json
+import os
+import random
+import threading
+from pathlib import Path, PurePosixPath
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from aiohttp import web
+
+from mtd.services.ipfs.dag import DagNode, add_directory, add_file, read_file, resolve, walk
+
+
+API_BASE = "/api/v0"
+DIRECTORY_CONTENT_TYPE = "application/x-directory"
+BLOCKS_DIR = "blocks"
+PINS_FILE = "pins.json"
+VERSION = "0.0.0-mech-local"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5001
+TRUE_VALUES = ("true", "1", "")
+MAX_REQUEST_SIZE = 1 << 34
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+class Blockstore:
+    """Content-addressed block storage with recursive pins.
+
+    Blocks are kept under `path` when given, or in memory otherwise.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        """Initialize the blockstore."""
+        self.path = path
+        self._blocks: Dict[str, bytes] = {}
+        self.pins: Set[str] = set()
+        if path is not None:
+            (path / BLOCKS_DIR).mkdir(parents=True, exist_ok=True)
+            pins_path = path / PINS_FILE
+            if pins_path.exists():
+                self.pins = set(json.loads(pins_path.read_text(encoding="utf-8")))
+
+    def put(self, cid: str, block: bytes) -> None:
+        """Store a block under its CID."""
+        if self.path is None:
+            self._blocks[cid] = block
+            return
+
+        block_path = self.path / BLOCKS_DIR / cid
+        if not block_path.exists():
+            temp_path = block_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            temp_path.write_bytes(block)
+            temp_path.replace(block_path)
+
+    def get(self, cid: str) -> Optional[bytes]:
+        """Get a block by CID."""
+        if self.path is None:
+            return self._blocks.get(cid)
+        try:
+            return (self.path / BLOCKS_DIR / cid).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def pin(self, cid: str) -> None:
+        """Pin a root recursively, checking that every block under it is present."""
+        walk(cid, self.get)
+        self.pins.add(cid)
+        self._save_pins()
+
+    def unpin(self, cid: str) -> None:
+        """Remove a recursive pin."""
+        if cid not in self.pins:
+            raise KeyError(f"{cid} is not pinned")
+        self.pins.discard(cid)
+        self._save_pins()
+
+    def _save_pins(self) -> None:
+        """Persist the pins of an on-disk blockstore."""
+        if self.path is not None:
+            (self.path / PINS_FILE).write_text(json.dumps(sorted(self.pins)), encoding="utf-8")
+
+
+def _error(message: str) -> web.Response:
+    """Build an error response in the format of the IPFS HTTP API."""
+    return web.json_response({"Message": message, "Code": 0, "Type": "error"}, status=500)
+
+
+def _flag(request: web.Request, name: str, default: bool) -> bool:
+    """Read a boolean query parameter."""
+    value = request.query.get(name)
+    return default if value is None else value.lower() in TRUE_VALUES
+
+
+def _entry(name: str, node: DagNode) -> Dict[str, str]:
+    """Describe an added file or directory."""
+    return {"Name": name, "Hash": node.cid, "Size": str(node.size)}
+
+
+def _build_tree(
+    files: List[Tuple[str, DagNode]], directories: Set[str], put: Optional[Any]
+) -> Tuple[List[Dict[str, str]], Dict[str, DagNode]]:
+    """Build the directory nodes of an add request.
+
+    Returns the added entries, files first and then directories deepest
+    first, and the top-level entries by name.
+    """
+    nodes: Dict[str, DagNode] = dict(files)
+    for name, _ in files:
+        directories.update(str(parent) for parent in PurePosixPath(name).parents if str(parent) != ".")
+
+    entries = [_entry(name, node) for name, node in files]
+    for directory in sorted(directories, key=lambda path: (-len(PurePosixPath(path).parts), path)):
+        children = {
+            PurePosixPath(name).name: node
+            for name, node in nodes.items()
+            if str(PurePosixPath(name).parent) == directory
+        }
+        nodes[directory] = add_directory(children, put)
+        entries.append(_entry(directory, nodes[directory]))
+
+    top_level = {name: node for name, node in nodes.items() if str(PurePosixPath(name).parent) == "."}
+    return entries, top_level
+
+
+def build_app(blockstore: Blockstore, latency: float = 0.0, jitter: float = 0.0) -> web.Application:
+    """Build the application serving `add`, `cat` and `pin` over a blockstore.
+
+    Every request is delayed by `latency` seconds plus a random extra of up
+    to `jitter` seconds. Content is also served read-only at `/ipfs/<path>`,
+    as a gateway would.
+    """
+
+    @web.middleware
+    async def _delay(request: web.Request, handler: Handler) -> web.StreamResponse:
+        if latency or jitter:
+            await asyncio.sleep(latency + random.uniform(0, jitter))  # nosec
+        return await handler(request)
+
+    async def _add(request: web.Request) -> web.StreamResponse:
+        if request.query.get("cid-version", "0") != "0":
+            return _error("only CIDv0 is supported by the local node")
+        put = None if _flag(request, "only-hash", False) else blockstore.put
+
+        files: List[Tuple[str, DagNode]] = []
+        directories: Set[str] = set()
+        reader = await request.multipart()
+        while True:
+            part = await reader.next()
+            if part is None:
+                break
+            name = unquote(part.filename or "").strip("/")  # type: ignore[union-attr]
+            if part.headers.get("Content-Type") == DIRECTORY_CONTENT_TYPE:
+                directories.add(name)
+                continue
+            payload = bytes(await part.read())  # type: ignore[union-attr]
+            node = await asyncio.to_thread(add_file, payload, put)
+            files.append((name or node.cid, node))
+
+        entries, top_level = _build_tree(files, directories, put)
+        roots = [node.cid for node in top_level.values()]
+        if _flag(request, "wrap-with-directory", False):
+            wrapper = add_directory(top_level, put)
+            entries.append(_entry("", wrapper))
+            roots = [wrapper.cid]
+
+        if put is not None and _flag(request, "pin", True):
+            for cid in roots:
+                blockstore.pin(cid)
+
+        body = "".join(json.dumps(entry) + "\n" for entry in entries)
+        return web.Response(text=body, content_type="application/json")
+
+    async def _cat(request: web.Request) -> web.StreamResponse:
+        try:
+            cid = resolve(request.query.get("arg") or request.match_info.get("path", ""), blockstore.get)
+            content = await asyncio.to_thread(read_file, cid, blockstore.get)
+        except (KeyError, ValueError) as e:
+            return _error(str(e))
+        return web.Response(body=content, content_type="application/octet-stream")
+
+    async def _pin_add(request: web.Request) -> web.StreamResponse:
+        try:
+            cid = resolve(request.query.get("arg", ""), blockstore.get)
+            blockstore.pin(cid)
+        except (KeyError, ValueError) as e:
+            return _error(str(e))
+        return web.json_response({"Pins": [cid]})
+
+    async def _pin_rm(request: web.Request) -> web.StreamResponse:
+        try:
+            cid = resolve(request.query.get("arg", ""), blockstore.get)
+            blockstore.unpin(cid)
+        except (KeyError, ValueError) as e:
+            return _error(str(e))
+        return web.json_response({"Pins": [cid]})
+
+    async def _pin_ls(request: web.Request) -> web.StreamResponse:
+        arg = request.query.get("arg")
+        if arg is not None and arg not in blockstore.pins:
+            return _error(f"path '{arg}' is not pinned")
+        pins = [arg] if arg is not None else sorted(blockstore.pins)
+        return web.json_response({"Keys": {cid: {"Type": "recursive"} for cid in pins}})
+
+    async def _version(_: web.Request) -> web.StreamResponse:
+        return web.json_response({"Version": VERSION, "Commit": "", "Repo": "", "System": "", "Golang": ""})
+
+    async def _id(_: web.Request) -> web.StreamResponse:
+        return web.json_response({"ID": "mech-local", "Addresses": [], "AgentVersion": VERSION, "PublicKey": ""})
+
+    app = web.Application(middlewares=[_delay], client_max_size=MAX_REQUEST_SIZE)
+    app.router.add_post(f"{API_BASE}/add", _add)
+    app.router.add_post(f"{API_BASE}/cat", _cat)
+    app.router.add_post(f"{API_BASE}/pin/add", _pin_add)
+    app.router.add_post(f"{API_BASE}/pin/rm", _pin_rm)
+    app.router.add_post(f"{API_BASE}/pin/ls", _pin_ls)
+    app.router.add_post(f"{API_BASE}/version", _version)
+    app.router.add_post(f"{API_BASE}/id", _id)
+    app.router.add_get("/ipfs/{path:.+}", _cat)
+    return app
+
+
+class LocalIPFSServer:
+    """Run the local IPFS stand-in on a background thread.
+
+    Usable as a context manager; `addr` is the multiaddr to pass to IPFS
+    clients and `url` the base URL of its gateway. Requests are not logged.
+    """
+
+    def __init__(
+        self,
+        blockstore: Optional[Blockstore] = None,
+        host: str = DEFAULT_HOST,
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+    ) -> None:
+        """Initialize the server."""
+        self.blockstore = blockstore or Blockstore()
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="local-ipfs", daemon=True)
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def addr(self) -> str:
+        """Get the multiaddr of the API."""
+        return f"/ip4/{self.host}/tcp/{self.port}/http"
+
+    @property
+    def url(self) -> str:
+        """Get the base URL of the server."""
+        return f"http://{self.host}:{self.port}"
+
+    async def _start(self) -> None:
+        app = build_app(self.blockstore, latency=self.latency, jitter=self.jitter)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+
+    def start(self) -> "LocalIPFSServer":
+        """Start serving and return once the server accepts connections."""
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+            self._runner = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "LocalIPFSServer":
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *_: Any) -> None:
+        """Stop the server."""
+        self.stop()
+
+
+def serve(  # pylint: disable=too-many-arguments
+    blockstore: Blockstore,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    print_fn: Optional[Callable[..., None]] = None,
+) -> None:
+    """Serve the local IPFS stand-in until interrupted."""
+    web.run_app(build_app(blockstore, latency=latency, jitter=jitter), host=host, port=port, print=print_fn)
@@ -1,14 +1,44 @@
 # -*- coding: utf-8 -*-
 """Metadata services."""
 
-from mtd.services.metadata.generate import generate_metadata
-from mtd.services.metadata.publish import DEFAULT_IPFS_NODE, publish_metadata_to_ipfs
+from mtd.services.metadata.cache import ToolsCache
+from mtd.services.metadata.diff import diff_metadata
+from mtd.services.metadata.fetch import fetch_metadata, fetch_metadata_async
+from mtd.services.metadata.generate import build_metadata, generate_metadata
+from mtd.services.metadata.ipfs import AsyncIPFSPublisher
+from mtd.services.metadata.ledger import PublishLedger
+from mtd.services.metadata.publish import (
+    DEFAULT_IPFS_NODE,
+    compute_metadata_hash,
+    publish_many_async,
+    publish_metadata,
+    publish_metadata_async,
+    publish_metadata_file_async,
+    publish_metadata_to_ipfs,
+    publish_sharded_metadata,
+)
 from mtd.services.metadata.update_onchain import update_metadata_onchain
+from mtd.services.metadata.validate import MetadataValidationError, validate_metadata
 
 
 __all__ = [
+    "AsyncIPFSPublisher",
     "DEFAULT_IPFS_NODE",
+    "MetadataValidationError",
+    "PublishLedger",
+    "ToolsCache",
+    "build_metadata",
+    "compute_metadata_hash",
+    "diff_metadata",
+    "fetch_metadata",
+    "fetch_metadata_async",
     "generate_metadata",
+    "publish_many_async",
+    "publish_metadata",
+    "publish_metadata_async",
+    "publish_metadata_file_async",
     "publish_metadata_to_ipfs",
+    "publish_sharded_metadata",
     "update_metadata_onchain",
+    "validate_metadata",
 ]
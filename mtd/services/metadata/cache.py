@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Fingerprint-keyed cache of extracted tool entries."""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+
+COMPONENT_YAML = "component.yaml"
+TOOLS_CACHE_FILE = "metadata_tools.json"
+TOOLS_CACHE_VERSION = 1
+
+
+class ToolsCache:
+    """On-disk cache of tool entries keyed by the component fingerprint.
+
+    An entry is reused as long as the tool's `component.yaml`, and therefore
+    its `fingerprint` map of file hashes, is byte-identical to the one the
+    entry was extracted from. Components without a fingerprint are never
+    cached, since edits to their modules could not be detected.
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        """Initialize the cache backed by a file in the given directory."""
+        self.path = cache_dir / TOOLS_CACHE_FILE
+        self.hits: List[str] = []
+        self.misses: List[str] = []
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self._seen: Dict[str, Dict[str, Any]] = {}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Load cached entries, discarding unreadable or outdated caches."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+        if not isinstance(data, dict) or data.get("version") != TOOLS_CACHE_VERSION:
+            return {}
+        entries = data.get("entries")
+        return entries if isinstance(entries, dict) else {}
+
+    @staticmethod
+    def _digest(tool_folder: Path) -> Optional[str]:
+        """Get the digest of a tool's component.yaml."""
+        try:
+            return hashlib.sha256((tool_folder / COMPONENT_YAML).read_bytes()).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def get(self, key: str, tool_folder: Path) -> Optional[Dict[str, Any]]:
+        """Get the cached entry of a tool, or None if it has to be rescanned."""
+        digest = self._digest(tool_folder)
+        cached = self._entries.get(key)
+        if digest is not None and cached is not None and cached.get("digest") == digest:
+            self.hits.append(key)
+            self._seen[key] = cached
+            return dict(cached["entry"])
+
+        self.misses.append(key)
+        return None
+
+    def put(self, key: str, tool_folder: Path, entry: Dict[str, Any]) -> None:
+        """Store the freshly extracted entry of a tool."""
+        digest = self._digest(tool_folder)
+        if digest is None:
+            return
+
+        component = yaml.safe_load((tool_folder / COMPONENT_YAML).read_text(encoding="utf-8"))
+        if not isinstance(component, dict) or not component.get("fingerprint"):
+            return
+
+        self._seen[key] = {"digest": digest, "entry": entry}
+
+    def save(self) -> None:
+        """Persist the entries seen in this run, dropping removed tools."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"version": TOOLS_CACHE_VERSION, "entries": self._seen}),
+            encoding="utf-8",
+        )
+        tmp_path.replace(self.path)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Structural diff of metadata documents, keyed by tool."""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from mtd.services.metadata.publish import expand_definitions
+from mtd.services.metadata.validate import DEFINITIONS_KEY, ROOT_PATH, join_path
+
+
+TOOLS_KEY = "tools"
+TOOL_METADATA_KEY = "toolMetadata"
+MAX_VALUE_LENGTH = 80
+
+
+class _Missing:  # pylint: disable=too-few-public-methods
+    """Marker for a key absent from one side of a diff."""
+
+    def __repr__(self) -> str:
+        """Represent the marker."""
+        return "MISSING"
+
+
+MISSING: Any = _Missing()
+
+
+@dataclass
+class FieldChange:
+    """A value that differs between two documents, MISSING on the side it is absent from."""
+
+    path: str
+    old: Any
+    new: Any
+
+    def __str__(self) -> str:
+        """Format the change."""
+        if self.old is MISSING:
+            return f"+ {self.path}: {_format_value(self.new)}"
+        if self.new is MISSING:
+            return f"- {self.path}: {_format_value(self.old)}"
+        return f"~ {self.path}: {_format_value(self.old)} -> {_format_value(self.new)}"
+
+
+@dataclass
+class MetadataDiff:
+    """Changes from one metadata document to another.
+
+    Tools are matched by name. Changes to the other top-level fields are
+    listed in `fields`.
+    """
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: Dict[str, List[FieldChange]] = field(default_factory=dict)
+    fields: List[FieldChange] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        """Check whether the documents differ."""
+        return bool(self.added or self.removed or self.changed or self.fields)
+
+
+def _format_value(value: Any) -> str:
+    """Format a value on one line, truncating long ones."""
+    text = json.dumps(value, sort_keys=True)
+    return text if len(text) <= MAX_VALUE_LENGTH else text[: MAX_VALUE_LENGTH - 3] + "..."
+
+
+def _diff_values(old: Any, new: Any, path: str, changes: List[FieldChange]) -> None:
+    """Collect the changes between two values, recursing into objects that differ."""
+    if old == new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in [*old, *(key for key in new if key not in old)]:
+            _diff_values(old.get(key, MISSING), new.get(key, MISSING), join_path(path, key), changes)
+        return
+    changes.append(FieldChange(path=path, old=old, new=new))
+
+
+def _tool_entries(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the tool metadata entries of a document."""
+    tools_metadata = metadata.get(TOOL_METADATA_KEY)
+    return tools_metadata if isinstance(tools_metadata, dict) else {}
+
+
+def _tool_names(metadata: Dict[str, Any]) -> Dict[str, None]:
+    """Get the tool names of a document in order, from its tools list and tool metadata."""
+    tools = metadata.get(TOOLS_KEY)
+    names = dict.fromkeys(tool for tool in tools if isinstance(tool, str)) if isinstance(tools, list) else {}
+    names.update(dict.fromkeys(_tool_entries(metadata)))
+    return names
+
+
+def diff_metadata(old: Dict[str, Any], new: Dict[str, Any]) -> MetadataDiff:
+    """Compare two metadata documents tool by tool.
+
+    Compact documents are compared with their schema definitions inlined,
+    so only changes that affect a tool are reported. Tools whose entries
+    are equal are skipped with a single comparison.
+    """
+    old, _ = expand_definitions(old)
+    new, _ = expand_definitions(new)
+    result = MetadataDiff()
+
+    old_tools, new_tools = _tool_names(old), _tool_names(new)
+    result.added = [tool for tool in new_tools if tool not in old_tools]
+    result.removed = [tool for tool in old_tools if tool not in new_tools]
+
+    old_entries, new_entries = _tool_entries(old), _tool_entries(new)
+    tools_path = join_path(ROOT_PATH, TOOL_METADATA_KEY)
+    for tool in new_tools:
+        if tool not in old_tools:
+            continue
+        old_entry, new_entry = old_entries.get(tool, MISSING), new_entries.get(tool, MISSING)
+        if old_entry != new_entry:
+            result.changed[tool] = []
+            _diff_values(old_entry, new_entry, join_path(tools_path, tool), result.changed[tool])
+
+    skipped = (TOOLS_KEY, TOOL_METADATA_KEY, DEFINITIONS_KEY)
+    _diff_values(
+        {key: value for key, value in old.items() if key not in skipped},
+        {key: value for key, value in new.items() if key not in skipped},
+        ROOT_PATH,
+        result.fields,
+    )
+    return result
+
+
+def format_diff(diff: MetadataDiff) -> List[str]:
+    """Format a diff as lines, added tools first, then removed and changed ones."""
+    lines = [f"+ tool {tool}" for tool in diff.added]
+    lines.extend(f"- tool {tool}" for tool in diff.removed)
+    for tool, changes in diff.changed.items():
+        lines.append(f"~ tool {tool}")
+        lines.extend(f"    {change}" for change in changes)
+    lines.extend(str(change) for change in diff.fields)
+    lines.append(
+        f"{len(diff.added)} tool(s) added, {len(diff.removed)} removed, {len(diff.changed)} changed, "
+        f"{len(diff.fields)} other field(s) changed."
+    )
+    return lines
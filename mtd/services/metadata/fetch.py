@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Metadata fetch service, verifying content and caching it in a local blockstore."""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Set, Tuple
+
+import aiohttp
+from aea.helpers.cid import to_v0
+from aea_cli_ipfs.ipfs_utils import DEFAULT_IPFS_URI_BASE, addr_to_url
+
+from mtd.services.ipfs import Blockstore
+from mtd.services.ipfs.dag import add_file, read_file
+from mtd.services.metadata.ipfs import DEFAULT_TIMEOUT
+from mtd.services.metadata.publish import DEFAULT_IPFS_NODE, LINK_KEY
+
+
+CAT_ENDPOINT = "cat"
+CIDV0_PREFIX = "Qm"
+IPFS_CACHE_DIR = "ipfs"
+DEFAULT_GATEWAY = "https://gateway.autonolas.tech"
+DEFAULT_SOURCES = (DEFAULT_IPFS_NODE, DEFAULT_GATEWAY)
+CACHE_SOURCE = "cache"
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FetchedMetadata:
+    """A verified metadata document and where it was read from."""
+
+    cid: str
+    content: bytes
+    source: str
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Decode the document."""
+        return json.loads(self.content)
+
+
+def to_cid(metadata_hash: str) -> str:
+    """Get the CIDv0 of an on-chain metadata hash (`f01701220...`) or of any CID."""
+    return metadata_hash if metadata_hash.startswith(CIDV0_PREFIX) else to_v0(metadata_hash)
+
+
+def _source_url(source: str, cid: str) -> str:
+    """Get the URL serving a CID from an API node multiaddr or a gateway URL."""
+    if source.startswith("/"):
+        return f"{addr_to_url(source)}/{DEFAULT_IPFS_URI_BASE}/{CAT_ENDPOINT}?arg={cid}"
+    return f"{source.rstrip('/')}/ipfs/{cid}"
+
+
+def _store(blockstore: Blockstore, cid: str, content: bytes) -> None:
+    """Verify content against its CID and store its blocks.
+
+    Raises ValueError if the content does not hash to the CID.
+    """
+    blocks: Dict[str, bytes] = {}
+    node = add_file(content, blocks.__setitem__)
+    if node.cid != cid:
+        raise ValueError(f"content hashes to {node.cid}")
+    for block_cid, block in blocks.items():
+        blockstore.put(block_cid, block)
+
+
+async def _fetch(session: aiohttp.ClientSession, source: str, cid: str, blockstore: Blockstore) -> bytes:
+    """Fetch a CID from one source, verify it and cache it."""
+    url = _source_url(source, cid)
+    method = "POST" if source.startswith("/") else "GET"
+    async with session.request(method, url) as response:
+        response.raise_for_status()
+        content = await response.read()
+    await asyncio.to_thread(_store, blockstore, cid, content)
+    return content
+
+
+async def fetch_cid_async(
+    cid: str,
+    blockstore: Blockstore,
+    sources: Sequence[str] = DEFAULT_SOURCES,
+    session: Optional[aiohttp.ClientSession] = None,
+) -> FetchedMetadata:
+    """Get the content of a CID from a blockstore, or else from the first source returning it verified.
+
+    Sources are IPFS API node multiaddrs or gateway URLs and are queried at
+    once. Verified content is added to the blockstore. Raises RuntimeError
+    if no source returns the content.
+    """
+    cid = to_cid(cid)
+    try:
+        content = await asyncio.to_thread(read_file, cid, blockstore.get)
+        return FetchedMetadata(cid=cid, content=content, source=CACHE_SOURCE)
+    except KeyError:
+        pass
+
+    if session is None:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)) as own_session:
+            return await fetch_cid_async(cid, blockstore, sources, own_session)
+
+    tasks = {asyncio.ensure_future(_fetch(session, source, cid, blockstore)): source for source in sources}
+    errors: Dict[str, str] = {}
+    pending: Set["asyncio.Future[bytes]"] = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return FetchedMetadata(cid=cid, content=task.result(), source=tasks[task])
+                errors[tasks[task]] = str(task.exception()) or type(task.exception()).__name__
+                _logger.debug("Fetching %s from %s failed: %s", cid, tasks[task], errors[tasks[task]])
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    raise RuntimeError(f"Could not fetch {cid}: " + "; ".join(f"{source}: {error}" for source, error in errors.items()))
+
+
+async def resolve_shards_async(
+    metadata: Dict[str, Any],
+    blockstore: Blockstore,
+    sources: Sequence[str] = DEFAULT_SOURCES,
+) -> Dict[str, Any]:
+    """Inline the tool metadata shards linked from a sharded root manifest."""
+    tools_metadata = metadata.get("toolMetadata")
+    if not isinstance(tools_metadata, dict):
+        return metadata
+
+    links = {
+        tool: entry[LINK_KEY]
+        for tool, entry in tools_metadata.items()
+        if isinstance(entry, dict) and set(entry) == {LINK_KEY}
+    }
+    if not links:
+        return metadata
+
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)) as session:
+        shards = await asyncio.gather(
+            *(fetch_cid_async(cid, blockstore, sources, session) for cid in links.values())
+        )
+    resolved = {tool: shard.metadata for tool, shard in zip(links, shards)}
+    return {**metadata, "toolMetadata": {tool: resolved.get(tool, entry) for tool, entry in tools_metadata.items()}}
+
+
+async def fetch_metadata_async(
+    metadata_hash: str,
+    cache_dir: Path,
+    sources: Sequence[str] = DEFAULT_SOURCES,
+    resolve_shards: bool = True,
+) -> Tuple[Dict[str, Any], FetchedMetadata]:
+    """Fetch a published metadata document by on-chain hash or CID.
+
+    Verified objects are cached in a blockstore under `cache_dir`, so later
+    lookups of the same hash do not touch the network. Returns the document,
+    with the shards of a sharded manifest inlined when `resolve_shards` is
+    set, and the fetched root object.
+    """
+    blockstore = Blockstore(cache_dir / IPFS_CACHE_DIR)
+    fetched = await fetch_cid_async(metadata_hash, blockstore, sources)
+    try:
+        metadata = fetched.metadata
+    except ValueError as e:
+        raise RuntimeError(f"{fetched.cid} is not a JSON document: {e}") from e
+    if resolve_shards:
+        metadata = await resolve_shards_async(metadata, blockstore, sources)
+    return metadata, fetched
+
+
+def fetch_metadata(
+    metadata_hash: str,
+    cache_dir: Path,
+    sources: Sequence[str] = DEFAULT_SOURCES,
+    resolve_shards: bool = True,
+) -> Tuple[Dict[str, Any], FetchedMetadata]:
+    """Fetch a published metadata document by on-chain hash or CID."""
+    return asyncio.run(fetch_metadata_async(metadata_hash, cache_dir, sources, resolve_shards))
@@ -19,19 +19,45 @@
 
 """Metadata generation service."""
 
+import ast
 import importlib.util
 import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing.connection import Connection
 from pathlib import Path
 from types import ModuleType
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
+from mtd.services.metadata.cache import COMPONENT_YAML, ToolsCache
+from mtd.services.metadata.validate import (
+    DEFINITIONS_KEY,
+    REF_KEY,
+    REF_PREFIX,
+    MetadataValidationError,
+    validate_metadata,
+)
+
+
+try:
+    import resource
+except ImportError:  # pragma: nocover
+    resource = None  # type: ignore[assignment]
+
 
 CUSTOMS = "customs"
+CUSTOM_PACKAGE_TYPE = "custom"
+PACKAGES_JSON = "packages.json"
 INIT_PY = "__init__.py"
-COMPONENT_YAML = "component.yaml"
 TOOLS_IDENTIFIERS = frozenset(["ALLOWED_TOOLS", "AVAILABLE_TOOLS"])
+IMPORT_ERROR = "import_error"
+DEFAULT_IMPORT_TIMEOUT = 60.0
+DEFAULT_IMPORT_MEMORY_LIMIT = 4096
+MIB = 1024 * 1024
 METADATA_TEMPLATE: Dict[str, Any] = {
     "name": "Autonolas Mech III",
     "description": "The mech executes AI tasks requested on-chain and delivers the results to the requester.",
@@ -70,6 +96,9 @@ OUTPUT_SCHEMA = {
 }
 
 
+_logger = logging.getLogger(__name__)
+
+
 def _import_module_from_path(module_name: str, file_path: Path) -> ModuleType:
     """Import a module from path."""
     spec = importlib.util.spec_from_file_location(module_name, str(file_path))
@@ -81,76 +110,406 @@ def _import_module_from_path(module_name: str, file_path: Path) -> ModuleType:
     return module
 
 
-def _build_tools_data(packages_dir: Path) -> List[Dict[str, Any]]:
+def _touches_tools(node: ast.AST) -> bool:
+    """Check whether a node binds, deletes or may mutate a tools identifier."""
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            if child.id in TOOLS_IDENTIFIERS and not isinstance(child.ctx, ast.Load):
+                return True
+        elif isinstance(child, (ast.Attribute, ast.Subscript)):
+            # Method calls such as `.append()` and item assignments change the list in place.
+            mutates = isinstance(child, ast.Attribute) or not isinstance(child.ctx, ast.Load)
+            if mutates and isinstance(child.value, ast.Name) and child.value.id in TOOLS_IDENTIFIERS:
+                return True
+    return False
+
+
+def _find_tools_value(tree: ast.Module) -> Tuple[bool, Optional[ast.expr]]:
+    """Find the value last assigned to a tools identifier at module level.
+
+    Returns a `(resolved, value)` pair. `resolved` is False when a tools
+    identifier is also assigned under a condition, augmented, imported or
+    changed in place, so its value is only known once the module runs.
+    """
+    value: Optional[ast.expr] = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign):
+            targets = [node.target] if node.value is not None else []
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            if any((alias.asname or alias.name) in TOOLS_IDENTIFIERS for alias in node.names):
+                return (False, None)
+            continue
+        elif _touches_tools(node):
+            return (False, None)
+        else:
+            continue
+
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id in TOOLS_IDENTIFIERS:
+                value = node.value
+            elif _touches_tools(target):
+                return (False, None)
+    return (True, value)
+
+
+def _read_tools_statically(file_path: Path) -> Tuple[bool, Optional[List[Any]]]:
+    """Read the tools list of a module without executing it.
+
+    Returns a `(resolved, tools)` pair. `resolved` is False when the module
+    computes its tools list dynamically and has to be imported instead.
+    """
+    try:
+        tree = ast.parse(file_path.read_text(encoding="utf-8"), filename=str(file_path))
+    except SyntaxError:
+        return (False, None)
+
+    resolved, value = _find_tools_value(tree)
+    if value is None:
+        return (resolved, None)
+
+    try:
+        tools = ast.literal_eval(value)
+    except (TypeError, ValueError):
+        return (False, None)
+
+    return (True, tools if isinstance(tools, list) else None)
+
+
+def _import_tools(file_path: Path) -> Optional[List[Any]]:
+    """Read the tools list of a module by importing it."""
+    module = _import_module_from_path(file_path.name, file_path)
+    for identifier in TOOLS_IDENTIFIERS:
+        tools = getattr(module, identifier, None)
+        if isinstance(tools, list):
+            return tools
+    return None
+
+
+def _import_tools_worker(connection: Connection, file_path: Path, memory_limit: int) -> None:
+    """Import a module in a worker process and send its tools list over a pipe."""
+    try:
+        if memory_limit > 0 and resource is not None:
+            limit = memory_limit * MIB
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        connection.send((True, _import_tools(file_path)))
+    except BaseException as e:  # pylint: disable=broad-except
+        connection.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        connection.close()
+
+
+def _import_tools_isolated(
+    file_path: Path,
+    timeout: float = DEFAULT_IMPORT_TIMEOUT,
+    memory_limit: int = DEFAULT_IMPORT_MEMORY_LIMIT,
+) -> Optional[List[Any]]:
+    """Read the tools list of a module by importing it in a limited subprocess.
+
+    The module runs with a wall-clock `timeout` in seconds and an address
+    space limit of `memory_limit` MiB (0 disables the limit). Only the tools
+    list is sent back to the calling process.
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_import_tools_worker, args=(sender, file_path, memory_limit)
+    )
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            raise RuntimeError(f"Importing {file_path} timed out after {timeout}s")
+        success, payload = receiver.recv()
+    except EOFError as e:
+        raise RuntimeError(f"Importing {file_path} exited without a result") from e
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
+
+    if not success:
+        raise RuntimeError(f"Importing {file_path} failed: {payload}")
+    return payload
+
+
+def _tool_module_paths(tool_folder: Path, component: Dict[str, Any]) -> List[Path]:
+    """Get the modules that may declare the tools list of a tool package."""
+    entry_point = component.get("entry_point")
+    if isinstance(entry_point, str) and (tool_folder / entry_point).is_file():
+        return [tool_folder / entry_point]
+
+    return sorted(
+        file_path
+        for file_path in tool_folder.iterdir()
+        if file_path.is_file() and file_path.suffix == ".py" and file_path.name != INIT_PY
+    )
+
+
+def _discover_allowed_tools(
+    tool_folder: Path,
+    component: Dict[str, Any],
+    import_timeout: float = DEFAULT_IMPORT_TIMEOUT,
+    import_memory_limit: int = DEFAULT_IMPORT_MEMORY_LIMIT,
+) -> Optional[List[Any]]:
+    """Discover the tools list of a tool package, importing only if unavoidable."""
+    allowed_tools: Optional[List[Any]] = None
+    for file_path in _tool_module_paths(tool_folder, component):
+        resolved, tools = _read_tools_statically(file_path)
+        if not resolved:
+            tools = _import_tools_isolated(
+                file_path, timeout=import_timeout, memory_limit=import_memory_limit
+            )
+        if tools is not None:
+            allowed_tools = tools
+    return allowed_tools
+
+
+def scan_tool_folder(
+    tool_folder: Path,
+    import_timeout: float = DEFAULT_IMPORT_TIMEOUT,
+    import_memory_limit: int = DEFAULT_IMPORT_MEMORY_LIMIT,
+) -> Dict[str, Any]:
+    """Build the tool entry of a single tool package.
+
+    A tool whose module fails or times out on import gets an `import_error`
+    instead of its tools list.
+    """
+    tool_entry: Dict[str, Any] = {}
+    component: Dict[str, Any] = {}
+
+    component_path = tool_folder / COMPONENT_YAML
+    if component_path.is_file():
+        component = yaml.safe_load(component_path.read_text(encoding="utf-8")) or {}
+        tool_entry["author"] = component.get("author")
+        tool_entry["tool_name"] = component.get("name")
+        tool_entry["description"] = component.get("description")
+
+    try:
+        allowed_tools = _discover_allowed_tools(
+            tool_folder,
+            component,
+            import_timeout=import_timeout,
+            import_memory_limit=import_memory_limit,
+        )
+    except RuntimeError as e:
+        tool_entry[IMPORT_ERROR] = str(e)
+        return tool_entry
+
+    if allowed_tools is not None:
+        tool_entry["allowed_tools"] = allowed_tools
+
+    return tool_entry
+
+
+def _scan_tool_folders(
+    tool_folders: List[Path],
+    jobs: int = 1,
+    import_timeout: float = DEFAULT_IMPORT_TIMEOUT,
+    import_memory_limit: int = DEFAULT_IMPORT_MEMORY_LIMIT,
+) -> List[Dict[str, Any]]:
+    """Scan tool packages, in worker processes when more than one job is requested.
+
+    Results are returned in the order of `tool_folders` regardless of which
+    worker finishes first.
+    """
+    scan = partial(
+        scan_tool_folder,
+        import_timeout=import_timeout,
+        import_memory_limit=import_memory_limit,
+    )
+    if jobs <= 1 or len(tool_folders) <= 1:
+        return [scan(tool_folder) for tool_folder in tool_folders]
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tool_folders))) as executor:
+        return list(executor.map(scan, tool_folders))
+
+
+def _walk_tool_folders(packages_dir: Path) -> List[Path]:
+    """Find every tool package folder on disk, whether listed in packages.json or not."""
+    return sorted(path for path in packages_dir.glob(f"*/{CUSTOMS}/*") if path.is_dir())
+
+
+def _indexed_tool_folders(packages_dir: Path) -> Optional[List[Path]]:
+    """Get the tool folders of the custom components listed in packages.json.
+
+    Returns None when there is no readable packages.json to rely on. Tool
+    folders on disk that it does not list are left out with a warning, as
+    they are not locked yet.
+    """
+    try:
+        index = json.loads((packages_dir / PACKAGES_JSON).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not isinstance(index, dict):
+        return None
+
+    tool_folders = set()
+    for section in index.values():
+        if not isinstance(section, dict):
+            continue
+        for public_id in section:
+            parts = public_id.split("/")
+            if len(parts) == 4 and parts[0] == CUSTOM_PACKAGE_TYPE:
+                tool_folders.add(packages_dir / parts[1] / CUSTOMS / parts[2])
+
+    for tool_folder in _walk_tool_folders(packages_dir):
+        if tool_folder not in tool_folders:
+            _logger.warning(
+                "Skipping tool %s: not listed in %s. Run 'autonomy packages lock' to include it.",
+                tool_folder.relative_to(packages_dir).as_posix(),
+                PACKAGES_JSON,
+            )
+
+    return sorted(tool_folder for tool_folder in tool_folders if tool_folder.is_dir())
+
+
+def find_tool_folders(packages_dir: Path) -> List[Path]:
+    """Find tool package folders, preferring the packages.json index over a directory walk."""
+    tool_folders = _indexed_tool_folders(packages_dir)
+    if tool_folders is not None:
+        return tool_folders
+
+    return _walk_tool_folders(packages_dir)
+
+
+def _build_tools_data(
+    packages_dir: Path,
+    cache: Optional[ToolsCache] = None,
+    jobs: int = 1,
+    import_timeout: float = DEFAULT_IMPORT_TIMEOUT,
+    import_memory_limit: int = DEFAULT_IMPORT_MEMORY_LIMIT,
+) -> List[Dict[str, Any]]:
     """Build tool entries by scanning packages customs folders."""
-    tools_data: List[Dict[str, Any]] = []
+    tool_folders = find_tool_folders(packages_dir)
+    keys = [tool_folder.relative_to(packages_dir).as_posix() for tool_folder in tool_folders]
 
-    customs_folders = [
-        path for path in packages_dir.rglob("*") if path.is_dir() and path.name == CUSTOMS
+    tool_entries: List[Optional[Dict[str, Any]]] = [
+        cache.get(key, tool_folder) if cache is not None else None
+        for key, tool_folder in zip(keys, tool_folders)
     ]
-    for customs_folder in customs_folders:
-        for tool_folder in [item for item in customs_folder.iterdir() if item.is_dir()]:
-            tool_entry: Dict[str, Any] = {}
-            for file_path in tool_folder.iterdir():
-                if not file_path.is_file():
-                    continue
-
-                if file_path.name == INIT_PY:
-                    continue
-
-                if file_path.name == COMPONENT_YAML:
-                    component = yaml.safe_load(file_path.read_text(encoding="utf-8"))
-                    tool_entry["author"] = component.get("author")
-                    tool_entry["tool_name"] = component.get("name")
-                    tool_entry["description"] = component.get("description")
-                    continue
-
-                if file_path.suffix != ".py":
-                    continue
-
-                module = _import_module_from_path(file_path.name, file_path)
-                for identifier in TOOLS_IDENTIFIERS:
-                    tools = getattr(module, identifier, None)
-                    if isinstance(tools, list):
-                        tool_entry["allowed_tools"] = tools
-                        break
-
-            if tool_entry:
-                tools_data.append(tool_entry)
-
-    return tools_data
-
-
-def _build_metadata(tools_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Build metadata document from tools data."""
-    result: Dict[str, Any] = {
-        **METADATA_TEMPLATE,
-        "tools": [],
-        "toolMetadata": {},
-    }
+    pending = [index for index, tool_entry in enumerate(tool_entries) if tool_entry is None]
+    scanned = _scan_tool_folders(
+        [tool_folders[index] for index in pending],
+        jobs=jobs,
+        import_timeout=import_timeout,
+        import_memory_limit=import_memory_limit,
+    )
+    for index, tool_entry in zip(pending, scanned):
+        tool_entries[index] = tool_entry
+        if IMPORT_ERROR in tool_entry:
+            _logger.warning("Skipping tool %s: %s", keys[index], tool_entry[IMPORT_ERROR])
+        elif cache is not None:
+            cache.put(keys[index], tool_folders[index], tool_entry)
+
+    return [tool_entry for tool_entry in tool_entries if tool_entry]
+
+
+def assemble_metadata(tools_data: List[Dict[str, Any]], compact: bool = False) -> Dict[str, Any]:
+    """Build metadata document from tools data.
+
+    Tools keep the order in which they are first seen, while a tool listed
+    by several packages takes the metadata of the last one. A compact
+    document stores the input and output schemas once under `definitions`
+    and has every tool reference them instead of embedding copies.
+    """
+    input_schema: Dict[str, Any] = INPUT_SCHEMA
+    output_schema: Dict[str, Any] = OUTPUT_SCHEMA
+    if compact:
+        input_schema = {REF_KEY: f"{REF_PREFIX}input"}
+        output_schema = {REF_KEY: f"{REF_PREFIX}output"}
 
+    tool_metadata: Dict[str, Dict[str, Any]] = {}
     for entry in tools_data:
         for tool in entry.get("allowed_tools", []):
-            if tool not in result["tools"]:
-                result["tools"].append(tool)
-            result["toolMetadata"][tool] = {
+            tool_metadata[tool] = {
                 "name": entry.get("tool_name", ""),
                 "description": entry.get("description", ""),
-                "input": INPUT_SCHEMA,
-                "output": OUTPUT_SCHEMA,
+                "input": input_schema,
+                "output": output_schema,
             }
 
-    return result
+    metadata = {
+        **METADATA_TEMPLATE,
+        "tools": list(tool_metadata),
+        "toolMetadata": tool_metadata,
+    }
+    if compact:
+        metadata[DEFINITIONS_KEY] = {"input": INPUT_SCHEMA, "output": OUTPUT_SCHEMA}
+    return metadata
+
+
+def write_metadata(metadata: Dict[str, Any], metadata_path: Path) -> None:
+    """Write a metadata document to path, encoding it incrementally."""
+    with metadata_path.open("w", encoding="utf-8") as file:
+        file.writelines(json.JSONEncoder(indent=4).iterencode(metadata))
 
 
-def generate_metadata(packages_dir: Path, metadata_path: Path) -> Path:
-    """Generate metadata from package customs and write to path."""
+def build_metadata(
+    packages_dir: Path,
+    cache: Optional[ToolsCache] = None,
+    jobs: int = 1,
+    import_timeout: float = DEFAULT_IMPORT_TIMEOUT,
+    import_memory_limit: int = DEFAULT_IMPORT_MEMORY_LIMIT,
+    compact: bool = False,
+) -> Dict[str, Any]:
+    """Build the metadata document of package customs in memory.
+
+    When a cache is given, only tools whose component fingerprint changed
+    since the previous run are rescanned. With `jobs` greater than one, tool
+    packages are scanned in a pool of that many worker processes. Tool
+    modules that must be imported run in a subprocess limited to
+    `import_timeout` seconds and `import_memory_limit` MiB; tools that fail
+    to import are logged and left out of the metadata. With `compact`, tools
+    reference shared schema definitions instead of embedding them.
+    """
     if not packages_dir.exists():
         raise FileNotFoundError(
             f"Packages directory not found: {packages_dir}. Use 'mech add-tool' first or run in --dev mode."
         )
 
-    tools_data = _build_tools_data(packages_dir=packages_dir)
-    metadata = _build_metadata(tools_data=tools_data)
-    metadata_path.write_text(json.dumps(metadata, indent=4), encoding="utf-8")
+    tools_data = _build_tools_data(
+        packages_dir=packages_dir,
+        cache=cache,
+        jobs=jobs,
+        import_timeout=import_timeout,
+        import_memory_limit=import_memory_limit,
+    )
+    if cache is not None:
+        cache.save()
+    return assemble_metadata(tools_data=tools_data, compact=compact)
+
+
+def generate_metadata(
+    packages_dir: Path,
+    metadata_path: Path,
+    cache: Optional[ToolsCache] = None,
+    jobs: int = 1,
+    import_timeout: float = DEFAULT_IMPORT_TIMEOUT,
+    import_memory_limit: int = DEFAULT_IMPORT_MEMORY_LIMIT,
+    compact: bool = False,
+    validate: bool = True,
+) -> Path:
+    """Generate metadata from package customs and write to path.
+
+    See `build_metadata` for the meaning of the scan options. With
+    `validate`, the document is checked before anything is written and a
+    `MetadataValidationError` listing every violation is raised if invalid.
+    """
+    metadata = build_metadata(
+        packages_dir=packages_dir,
+        cache=cache,
+        jobs=jobs,
+        import_timeout=import_timeout,
+        import_memory_limit=import_memory_limit,
+        compact=compact,
+    )
+    if validate:
+        issues = validate_metadata(metadata)
+        if issues:
+            raise MetadataValidationError(issues)
+    write_metadata(metadata=metadata, metadata_path=metadata_path)
     return metadata_path
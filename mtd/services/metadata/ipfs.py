@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""IPFS upload service for publishing to several nodes at once."""
+
+import asyncio
+import atexit
+import json
+import logging
+import random
+import threading
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Dict, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar, Union
+
+import aiohttp
+from aea.helpers.cid import to_v1
+from aea_cli_ipfs.ipfs_utils import DEFAULT_IPFS_URI_BASE, addr_to_url
+
+from mtd.services.ipfs.dag import file_cid
+
+
+ADD_ENDPOINT = "add"
+RESPONSE_KEY = "Hash"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 8.0
+DEFAULT_TIMEOUT = 60.0
+EXIT_TIMEOUT = 5.0
+CIDV1_MULTIBASE = "b"
+FILE_CONTENT_TYPE = "application/octet-stream"
+DIRECTORY_CONTENT_TYPE = "application/x-directory"
+
+T = TypeVar("T")
+FormFactory = Callable[[], aiohttp.FormData]
+
+_logger = logging.getLogger(__name__)
+
+
+def compute_cid(payload: bytes) -> str:
+    """Compute the CID `ipfs add` gives to bytes with the default chunker and codec."""
+    return file_cid(payload)
+
+
+def as_v1(cid: str) -> str:
+    """Get the CIDv1 form of a CID."""
+    return cid if cid.startswith(CIDV1_MULTIBASE) else to_v1(cid)
+
+
+def _same_cid(cid: str, expected_cid: str) -> bool:
+    """Check whether a CID returned by a node is the expected one, whatever its version."""
+    try:
+        return as_v1(cid) == as_v1(expected_cid)
+    except ValueError:
+        return False
+
+
+def as_nodes(ipfs_node: Union[str, Sequence[str]]) -> Tuple[str, ...]:
+    """Normalize one or several IPFS node addresses to a tuple."""
+    return (ipfs_node,) if isinstance(ipfs_node, str) else tuple(ipfs_node)
+
+
+class AsyncIPFSPublisher:
+    """Upload content to several IPFS nodes at once over one aiohttp session.
+
+    `add_bytes` returns as soon as one node confirms the expected CID, while
+    the other nodes keep uploading (and so pinning) in the background,
+    retrying failed requests with jittered exponential backoff. At most
+    `concurrency` uploads run against each node at a time. Background
+    uploads are awaited by `wait` and `aclose`, which cancel those still
+    running after their `timeout`.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        nodes: Sequence[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        timeout: float = DEFAULT_TIMEOUT,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> None:
+        """Initialize the publisher."""
+        if not nodes:
+            raise ValueError("At least one IPFS node is required.")
+
+        self.nodes = tuple(nodes)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._session = session
+        self._owns_session = session is None
+        self._urls = {node: f"{addr_to_url(node)}/{DEFAULT_IPFS_URI_BASE}/{ADD_ENDPOINT}" for node in self.nodes}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._pending: Set["asyncio.Task[str]"] = set()
+
+    async def __aenter__(self) -> "AsyncIPFSPublisher":
+        """Enter the publisher context."""
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        """Wait for background uploads and close the session."""
+        await self.aclose()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the session, creating it in the running loop on first use."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    def _delay(self, attempt: int) -> float:
+        """Get the jittered delay before retrying a failed attempt."""
+        delay = min(MAX_BACKOFF, self.backoff * 2**attempt)
+        return delay / 2 + random.uniform(0, delay / 2)  # nosec
+
+    async def _post(self, node: str, form: FormFactory, params: Dict[str, str]) -> str:
+        """Add a multipart form to a node and return the last CID it reports."""
+        async with self._get_session().post(self._urls[node], params=params, data=form()) as response:
+            response.raise_for_status()
+            body = await response.text()
+        return json.loads(body.strip().splitlines()[-1])[RESPONSE_KEY]
+
+    async def _upload(
+        self, node: str, form: FormFactory, params: Dict[str, str], expected_cid: Optional[str]
+    ) -> str:
+        """Upload a form to a node, retrying failed requests."""
+        semaphore = self._semaphores.setdefault(node, asyncio.Semaphore(self.concurrency))
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    cid = await self._post(node, form, params)
+                    break
+                except Exception as e:  # pylint: disable=broad-except
+                    if attempt == self.retries:
+                        _logger.warning("Upload to %s failed: %s", node, e)
+                        raise
+                    await asyncio.sleep(self._delay(attempt))
+
+        if expected_cid is not None and not _same_cid(cid, expected_cid):
+            _logger.warning("Upload to %s returned %s, expected %s", node, cid, expected_cid)
+            raise RuntimeError(f"unexpected CID {cid}, expected {expected_cid}")
+        return cid
+
+    async def add_bytes(self, payload: bytes, expected_cid: Optional[str] = None) -> str:
+        """Upload bytes to every node and return the CID confirmed by the first one.
+
+        Raises RuntimeError if no node confirms the upload.
+        """
+
+        def _form() -> aiohttp.FormData:
+            form = aiohttp.FormData()
+            form.add_field("file", payload, filename="file", content_type=FILE_CONTENT_TYPE)
+            return form
+
+        return await self._add(_form, {"pin": "true"}, expected_cid)
+
+    async def add_directory(
+        self, entries: Sequence[Tuple[str, Optional[bytes]]], expected_cid: Optional[str] = None
+    ) -> str:
+        """Upload a directory tree to every node and return the wrapper CID confirmed by the first one.
+
+        `entries` are `(path, content)` pairs in depth-first order, starting
+        with the top-level directory, with None content for directories. The
+        tree is wrapped as `ipfs add -w` does. Raises RuntimeError if no node
+        confirms the upload.
+        """
+
+        def _form() -> aiohttp.FormData:
+            form = aiohttp.FormData()
+            for path, content in entries:
+                if content is None:
+                    form.add_field("file", b"", filename=path, content_type=DIRECTORY_CONTENT_TYPE)
+                else:
+                    form.add_field("file", content, filename=path, content_type=FILE_CONTENT_TYPE)
+            return form
+
+        return await self._add(_form, {"pin": "true", "wrap-with-directory": "true"}, expected_cid)
+
+    async def _add(self, form: FormFactory, params: Dict[str, str], expected_cid: Optional[str]) -> str:
+        """Upload a form to every node and return the CID confirmed by the first one."""
+        tasks = {
+            asyncio.ensure_future(self._upload(node, form, params, expected_cid)): node for node in self.nodes
+        }
+        for task in tasks:
+            self._pending.add(task)
+            task.add_done_callback(self._settle)
+
+        errors: Dict[str, str] = {}
+        pending: Set["asyncio.Future[str]"] = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                errors[tasks[task]] = str(task.exception())
+
+        raise RuntimeError("; ".join(f"{node}: {error}" for node, error in errors.items()))
+
+    async def add_many(self, items: Iterable[Union[bytes, Path]]) -> List[str]:
+        """Upload many byte payloads or files and return their CIDs in order.
+
+        At most `concurrency` items are read and uploaded at a time. Files
+        are added as they are, without a wrapping directory.
+        """
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def _add(item: Union[bytes, Path]) -> str:
+            async with limit:
+                payload = item if isinstance(item, bytes) else await asyncio.to_thread(Path(item).read_bytes)
+                expected_cid = await asyncio.to_thread(compute_cid, payload)
+                return await self.add_bytes(payload, expected_cid=expected_cid)
+
+        return list(await asyncio.gather(*(_add(item) for item in items)))
+
+    def _settle(self, task: "asyncio.Task[str]") -> None:
+        """Forget a finished upload, retrieving its error, already logged by `_upload`."""
+        self._pending.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    async def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait until the uploads still running in the background are done.
+
+        Uploads still running after `timeout` seconds are cancelled.
+        """
+        if not self._pending:
+            return
+        _, running = await asyncio.wait(set(self._pending), timeout=timeout)
+        if running:
+            _logger.warning("Cancelling %d background uploads still running after %ss", len(running), timeout)
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def aclose(self, timeout: Optional[float] = None) -> None:
+        """Wait for background uploads, up to `timeout`, and close the session if it is owned."""
+        await self.wait(timeout)
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class IPFSPublisher:
+    """Blocking interface to an `AsyncIPFSPublisher`.
+
+    The async publisher runs in an event loop on a background thread, so
+    uploads to slower nodes carry on between calls and the HTTP session is
+    reused. Publishers still open at interpreter exit are closed, waiting
+    at most `EXIT_TIMEOUT` seconds for their background uploads.
+    """
+
+    def __init__(
+        self,
+        nodes: Sequence[str],
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """Initialize the publisher."""
+        self._publisher = AsyncIPFSPublisher(nodes, retries=retries, backoff=backoff, timeout=timeout)
+        self.nodes = self._publisher.nodes
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="ipfs-publisher", daemon=True)
+        self._thread.start()
+
+    def _run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine in the publisher loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def add_bytes(self, payload: bytes, expected_cid: Optional[str] = None) -> str:
+        """Upload bytes to every node and return the CID confirmed by the first one."""
+        return self._run(self._publisher.add_bytes(payload, expected_cid=expected_cid))
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until the uploads still running in the background are done, cancelling them after `timeout`."""
+        self._run(self._publisher.wait(timeout))
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Wait for background uploads, up to `timeout`, close the session and stop the loop."""
+        if self._loop.is_closed():
+            return
+        self._run(self._publisher.aclose(timeout))
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+_publishers: Dict[Tuple[str, ...], IPFSPublisher] = {}
+
+
+def get_publisher(ipfs_node: Union[str, Sequence[str]]) -> IPFSPublisher:
+    """Get the publisher of one or several IPFS nodes, reusing its sessions across calls."""
+    nodes = as_nodes(ipfs_node)
+    publisher = _publishers.get(nodes)
+    if publisher is None:
+        publisher = _publishers[nodes] = IPFSPublisher(nodes)
+    return publisher
+
+
+@atexit.register
+def _close_publishers() -> None:
+    """Close the shared publishers, cancelling background uploads still running after `EXIT_TIMEOUT`."""
+    while _publishers:
+        _, publisher = _publishers.popitem()
+        publisher.close(timeout=EXIT_TIMEOUT)
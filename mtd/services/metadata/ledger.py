@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""SQLite ledger of generated, published and on-chain metadata hashes."""
+
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    metadata_hash TEXT NOT NULL,
+    tool_count INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS publishes (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    metadata_hash TEXT NOT NULL,
+    cid TEXT NOT NULL,
+    nodes TEXT NOT NULL,
+    latency REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS updates (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    chain TEXT NOT NULL,
+    metadata_hash TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    gas_used INTEGER,
+    block_number INTEGER,
+    gas_estimate INTEGER,
+    effective_gas_price INTEGER
+);
+CREATE TABLE IF NOT EXISTS pending (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    chain TEXT NOT NULL,
+    metadata_hash TEXT NOT NULL,
+    tx_hash TEXT NOT NULL UNIQUE,
+    gas_estimate INTEGER,
+    nonce INTEGER,
+    block_number INTEGER
+);
+CREATE INDEX IF NOT EXISTS generations_by_hash ON generations (metadata_hash, id);
+CREATE INDEX IF NOT EXISTS publishes_by_hash ON publishes (metadata_hash, id);
+CREATE INDEX IF NOT EXISTS updates_by_chain ON updates (chain, success, id);
+"""
+ADDED_COLUMNS = {
+    "updates": ("gas_estimate INTEGER", "effective_gas_price INTEGER"),
+    "pending": ("nonce INTEGER", "block_number INTEGER"),
+}
+PENDING_COLUMNS = "created_at, chain, metadata_hash, tx_hash, gas_estimate, nonce, block_number"
+OBSERVED_TX_HASH = ""
+UPDATE_COLUMNS = (
+    "created_at, chain, metadata_hash, tx_hash, success, gas_used, block_number, gas_estimate, effective_gas_price"
+)
+
+
+@dataclass(frozen=True)
+class Generation:
+    """A metadata document generated from the packages."""
+
+    created_at: float
+    metadata_hash: str
+    tool_count: int
+    size: int
+
+
+@dataclass(frozen=True)
+class Publish:
+    """A metadata document uploaded to IPFS."""
+
+    created_at: float
+    metadata_hash: str
+    cid: str
+    nodes: Tuple[str, ...]
+    latency: float
+
+
+@dataclass(frozen=True)
+class OnchainUpdate:
+    """A `changeHash` transaction setting the metadata hash of the service on a chain."""
+
+    created_at: float
+    chain: str
+    metadata_hash: str
+    tx_hash: str
+    success: bool
+    gas_used: Optional[int]
+    block_number: Optional[int]
+    gas_estimate: Optional[int] = None
+    effective_gas_price: Optional[int] = None
+
+    @property
+    def observed(self) -> bool:
+        """Whether the hash was found on chain rather than set by a recorded transaction."""
+        return self.tx_hash == OBSERVED_TX_HASH
+
+    @property
+    def gas_accuracy(self) -> Optional[float]:
+        """Get the gas used as a fraction of the estimate, if both are known."""
+        if not self.gas_used or not self.gas_estimate:
+            return None
+        return self.gas_used / self.gas_estimate
+
+
+@dataclass(frozen=True)
+class PendingUpdate:
+    """A submitted on-chain update whose receipt has not been collected yet.
+
+    `nonce` is the sender nonce of the transaction and `block_number` the
+    latest block when it was submitted, if known.
+    """
+
+    created_at: float
+    chain: str
+    metadata_hash: str
+    tx_hash: str
+    gas_estimate: Optional[int]
+    nonce: Optional[int] = None
+    block_number: Optional[int] = None
+
+
+def _update(row: Sequence[Any]) -> OnchainUpdate:
+    """Build an on-chain update from a row of UPDATE_COLUMNS."""
+    created_at, chain, metadata_hash, tx_hash, success, *receipt = row
+    return OnchainUpdate(created_at, chain, metadata_hash, tx_hash, bool(success), *receipt)
+
+
+class PublishLedger:
+    """Append-only record of metadata generations, IPFS uploads and on-chain updates.
+
+    Lookups are answered from the local database alone, without querying
+    the chain or IPFS. Chains are keyed by lowercase name, e.g. `gnosis`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the ledger stored at `path`, creating it if missing."""
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+            for table, columns in ADDED_COLUMNS.items():
+                existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+                for column in columns:
+                    if column.split()[0] not in existing:
+                        connection.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+
+    def _connect(self) -> "closing[sqlite3.Connection]":
+        """Open a connection to the ledger."""
+        return closing(sqlite3.connect(self.path, timeout=30))
+
+    def _insert(self, table: str, values: Sequence[Any]) -> None:
+        """Append a row, stamped with the current time, to a table."""
+        with self._connect() as connection, connection:
+            columns = ", ".join("?" * (len(values) + 1))
+            connection.execute(f"INSERT INTO {table} VALUES (NULL, {columns})", (time.time(), *values))  # nosec
+
+    def _select(self, query: str, params: Sequence[Any]) -> Iterator[Sequence[Any]]:
+        """Run a query and return its rows."""
+        with self._connect() as connection:
+            return iter(connection.execute(query, params).fetchall())
+
+    def record_generation(self, metadata_hash: str, tool_count: int, size: int) -> None:
+        """Record a generated metadata document."""
+        self._insert("generations", (metadata_hash, tool_count, size))
+
+    def record_publish(self, metadata_hash: str, cid: str, nodes: Sequence[str], latency: float) -> None:
+        """Record an upload of a metadata document to IPFS."""
+        self._insert("publishes", (metadata_hash, cid, ",".join(nodes), latency))
+
+    def record_update(  # pylint: disable=too-many-arguments
+        self,
+        chain: str,
+        metadata_hash: str,
+        tx_hash: str,
+        success: bool,
+        gas_used: Optional[int] = None,
+        block_number: Optional[int] = None,
+        gas_estimate: Optional[int] = None,
+        effective_gas_price: Optional[int] = None,
+    ) -> None:
+        """Record an on-chain metadata hash update."""
+        self._insert(
+            "updates",
+            (
+                chain.lower(),
+                metadata_hash,
+                tx_hash,
+                int(success),
+                gas_used,
+                block_number,
+                gas_estimate,
+                effective_gas_price,
+            ),
+        )
+
+    def record_pending(  # pylint: disable=too-many-arguments
+        self,
+        chain: str,
+        metadata_hash: str,
+        tx_hash: str,
+        gas_estimate: Optional[int] = None,
+        nonce: Optional[int] = None,
+        block_number: Optional[int] = None,
+    ) -> None:
+        """Record a submitted on-chain update, to be confirmed once its receipt is collected."""
+        self._insert("pending", (chain.lower(), metadata_hash, tx_hash, gas_estimate, nonce, block_number))
+
+    def pending(self, chain: Optional[str] = None) -> List[PendingUpdate]:
+        """Get the submitted updates without a receipt, oldest first, optionally only those on a chain."""
+        where, params = ("WHERE chain = ?", (chain.lower(),)) if chain else ("", ())
+        rows = self._select(
+            f"SELECT {PENDING_COLUMNS} FROM pending {where} ORDER BY id",  # nosec
+            params,
+        )
+        return [PendingUpdate(*row) for row in rows]
+
+    def discard(self, tx_hash: str) -> bool:
+        """Forget a pending update that will never be mined, returning whether it was pending."""
+        with self._connect() as connection, connection:
+            return connection.execute("DELETE FROM pending WHERE tx_hash = ?", (tx_hash,)).rowcount > 0
+
+    def confirm(  # pylint: disable=too-many-arguments
+        self,
+        tx_hash: str,
+        success: bool,
+        gas_used: Optional[int] = None,
+        block_number: Optional[int] = None,
+        effective_gas_price: Optional[int] = None,
+    ) -> Optional[OnchainUpdate]:
+        """Move a pending update to the recorded updates with its receipt.
+
+        Returns the recorded update, or None if no update with this hash is pending.
+        """
+        with self._connect() as connection, connection:
+            row = connection.execute(
+                "SELECT chain, metadata_hash, gas_estimate FROM pending WHERE tx_hash = ?", (tx_hash,)
+            ).fetchone()
+            if row is None:
+                return None
+            chain, metadata_hash, gas_estimate = row
+            update = OnchainUpdate(
+                time.time(),
+                chain,
+                metadata_hash,
+                tx_hash,
+                success,
+                gas_used,
+                block_number,
+                gas_estimate,
+                effective_gas_price,
+            )
+            connection.execute(
+                f"INSERT INTO updates (id, {UPDATE_COLUMNS}) VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?)",  # nosec
+                astuple(update),
+            )
+            connection.execute("DELETE FROM pending WHERE tx_hash = ?", (tx_hash,))
+        return update
+
+    def live(self, chain: str) -> Optional[OnchainUpdate]:
+        """Get the last successful update on a chain, which set the live metadata hash."""
+        rows = self._select(
+            f"SELECT {UPDATE_COLUMNS} FROM updates WHERE chain = ? AND success = 1 ORDER BY id DESC LIMIT 1",  # nosec
+            (chain.lower(),),
+        )
+        return next(map(_update, rows), None)
+
+    def previous(self, chain: str) -> Optional[OnchainUpdate]:
+        """Get the last successful update on a chain that set a hash other than the live one.
+
+        This is the hash to roll back to.
+        """
+        live = self.live(chain)
+        if live is None:
+            return None
+        rows = self._select(
+            f"SELECT {UPDATE_COLUMNS} FROM updates "  # nosec
+            "WHERE chain = ? AND success = 1 AND metadata_hash != ? ORDER BY id DESC LIMIT 1",
+            (chain.lower(), live.metadata_hash),
+        )
+        return next(map(_update, rows), None)
+
+    def updates(self, chain: Optional[str] = None, limit: int = 20) -> List[OnchainUpdate]:
+        """Get the latest on-chain updates, newest first, optionally only those on a chain."""
+        where, params = ("WHERE chain = ?", (chain.lower(),)) if chain else ("", ())
+        rows = self._select(
+            f"SELECT {UPDATE_COLUMNS} FROM updates {where} ORDER BY id DESC LIMIT ?",  # nosec
+            (*params, limit),
+        )
+        return [_update(row) for row in rows]
+
+    def chains(self) -> List[str]:
+        """Get the chains with at least one recorded update."""
+        return [row[0] for row in self._select("SELECT DISTINCT chain FROM updates ORDER BY chain", ())]
+
+    def generation(self, metadata_hash: str) -> Optional[Generation]:
+        """Get the last recorded generation of a metadata hash."""
+        rows = self._select(
+            "SELECT created_at, metadata_hash, tool_count, size FROM generations "
+            "WHERE metadata_hash = ? ORDER BY id DESC LIMIT 1",
+            (metadata_hash,),
+        )
+        return next((Generation(*row) for row in rows), None)
+
+    def publishes(self, metadata_hash: str) -> List[Publish]:
+        """Get the recorded uploads of a metadata hash, newest first."""
+        rows = self._select(
+            "SELECT created_at, metadata_hash, cid, nodes, latency FROM publishes "
+            "WHERE metadata_hash = ? ORDER BY id DESC",
+            (metadata_hash,),
+        )
+        return [
+            Publish(created_at, metadata_hash, cid, tuple(nodes.split(",")), latency)
+            for created_at, metadata_hash, cid, nodes, latency in rows
+        ]
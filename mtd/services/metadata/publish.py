@@ -19,209 +19,347 @@
 
 """Metadata publish service."""
 
+import asyncio
+import hashlib
 import json
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
-from aea.helpers.cid import to_v1
-from aea_cli_ipfs.ipfs_utils import IPFSTool
 from multibase import multibase
 from multicodec import multicodec
 
+from mtd.services.metadata.generate import write_metadata
+from mtd.services.metadata.ipfs import (
+    DEFAULT_CONCURRENCY,
+    AsyncIPFSPublisher,
+    as_nodes,
+    as_v1,
+    compute_cid,
+    get_publisher,
+)
+from mtd.services.metadata.ledger import PublishLedger
+from mtd.services.metadata.validate import (
+    DEFINITIONS_KEY,
+    REF_KEY,
+    REF_PREFIX,
+    MetadataValidationError,
+    format_issues,
+    validate_metadata,
+)
+
 
 PREFIX = "f01701220"
 IPFS_PREFIX_LENGTH = 6
-RESPONSE_KEY = "Hash"
 DEFAULT_IPFS_NODE = "/dns/registry.autonolas.tech/tcp/443/https"
+SHARDS_INDEX_FILE = "metadata_shards.json"
+LINK_KEY = "/"
+
+
+def expand_definitions(metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """Inline the shared schema definitions referenced by a compact metadata document."""
+    if DEFINITIONS_KEY not in metadata:
+        return (metadata, "")
+
+    definitions = metadata[DEFINITIONS_KEY]
+    if not isinstance(definitions, dict):
+        actual = type(definitions).__name__
+        return (
+            metadata,
+            f"Invalid type for key in metadata json. Expected 'dict', but got {actual!r}",
+        )
+
+    tools_metadata = metadata.get("toolMetadata")
+    if not isinstance(tools_metadata, dict):
+        return (metadata, "")
+
+    expanded_tools: Dict[str, Any] = {}
+    for tool, data in tools_metadata.items():
+        expanded_tools[tool] = data
+        if not isinstance(data, dict):
+            continue
+
+        for key in ("input", "output"):
+            value = data.get(key)
+            if not isinstance(value, dict) or REF_KEY not in value:
+                continue
+
+            ref = value[REF_KEY]
+            name = ref[len(REF_PREFIX) :] if isinstance(ref, str) and ref.startswith(REF_PREFIX) else None
+            if name not in definitions:
+                return (metadata, f"Unresolved reference for {tool} -> {key}: {ref!r}")
+            expanded_tools[tool] = {**expanded_tools[tool], key: definitions[name]}
 
-metadata_schema = {
-    "name": str,
-    "description": str,
-    "inputFormat": str,
-    "outputFormat": str,
-    "image": str,
-    "tools": List,
-    "toolMetadata": Dict,
-}
-
-tool_schema = {
-    "name": str,
-    "description": str,
-    "input": Dict,
-    "output": Dict,
-}
-tool_input_schema = {
-    "type": str,
-    "description": str,
-}
-tool_output_schema = {"type": str, "description": str, "schema": Dict}
-
-output_schema_schema = {
-    "properties": Dict,
-    "required": List,
-    "type": str,
-}
-
-properties_schema = {
-    "requestId": Dict,
-    "result": Dict,
-    "prompt": Dict,
-}
-
-properties_data_schema = {
-    "type": str,
-    "description": str,
-}
-
-
-def _validate_metadata_file(file_path: Path) -> Tuple[bool, str]:  # pylint: disable=too-many-return-statements,too-many-statements
-    status = False
+    return ({**metadata, "toolMetadata": expanded_tools}, "")
+
+
+def _validate_metadata_file(file_path: Path) -> Tuple[bool, str]:
     try:
         metadata: Dict = json.loads(file_path.read_text(encoding="utf-8"))
     except FileNotFoundError:
-        return (status, f"Error: Metadata file not found at {file_path}")
+        return (False, f"Error: Metadata file not found at {file_path}")
     except json.JSONDecodeError:
-        return (status, "Error: Metadata file contains invalid JSON.")
-
-    for key, expected_type in metadata_schema.items():
-        if key not in metadata:
-            return (status, f"Missing key in metadata json: {key!r}")
-
-        if not isinstance(metadata[key], expected_type):
-            expected = expected_type.__name__
-            actual = type(metadata[key]).__name__
-            return (
-                status,
-                f"Invalid type for key in metadata json. Expected {expected!r}, but got {actual!r}",
-            )
-
-    tools = metadata["tools"]
-    tools_metadata = metadata["toolMetadata"]
-    if len(tools) != len(tools_metadata):
-        return (
-            status,
-            "Number of tools does not match number of keys in 'toolMetadata'. "
-            f"Expected {len(tools)} but got {len(tools_metadata)}.",
-        )
+        return (False, "Error: Metadata file contains invalid JSON.")
+
+    return _validate_metadata(metadata)
 
-    for tool in tools:
-        if tool not in tools_metadata:
-            return (status, f"Missing toolsMetadata for tool: {tool!r}")
-
-        for key, expected_type in tool_schema.items():
-            data = tools_metadata[tool]
-            if key not in data:
-                return (status, f"Missing key in toolsMetadata: {key!r}")
-
-            if not isinstance(data[key], expected_type):
-                expected = expected_type.__name__
-                actual = type(data[key]).__name__
-                return (
-                    status,
-                    f"Invalid type for key in toolsMetadata. Expected {expected!r}, but got {actual!r}.",
-                )
-
-            if key == "input":
-                for i_key, i_expected_type in tool_input_schema.items():
-                    input_data = data[key]
-                    if i_key not in input_data:
-                        return (status, f"Missing key for {tool} -> input: {i_key!r}")
-                    if not isinstance(input_data[i_key], i_expected_type):
-                        i_expected = i_expected_type.__name__
-                        i_actual = type(input_data[i_key]).__name__
-                        return (
-                            status,
-                            f"Invalid type for {i_key!r} in {tool} -> input. Expected {i_expected!r}, but got {i_actual!r}.",
-                        )
-
-            elif key == "output":
-                for o_key, o_expected_type in tool_output_schema.items():
-                    output_data = data[key]
-                    if o_key not in output_data:
-                        return (status, f"Missing key for {tool} -> output: {o_key!r}")
-                    if not isinstance(output_data[o_key], o_expected_type):
-                        o_expected = o_expected_type.__name__
-                        o_actual = type(output_data[o_key]).__name__
-                        return (
-                            status,
-                            f"Invalid type for {o_key!r} in {tool} -> output. Expected {o_expected!r}, but got {o_actual!r}.",
-                        )
-
-                    if o_key == "schema":
-                        output_schema_data = output_data[o_key]
-                        for s_key, s_expected_type in output_schema_schema.items():
-                            if s_key not in output_schema_data:
-                                return (
-                                    status,
-                                    f"Missing key for {tool} -> output -> schema: {s_key!r}",
-                                )
-                            if not isinstance(output_schema_data[s_key], s_expected_type):
-                                s_expected = s_expected_type.__name__
-                                s_actual = type(output_schema_data[s_key]).__name__
-                                return (
-                                    status,
-                                    f"Invalid type for {s_key!r} in {tool} -> output -> schema. Expected {s_expected!r}, but got {s_actual!r}.",
-                                )
-
-                        if "required" in output_schema_data:
-                            properties_data = output_schema_data.get("properties", {})
-                            required = output_schema_data.get("required", [])
-                            if len(properties_data) != len(required):
-                                return (
-                                    status,
-                                    "Number of properties data does not match number of keys in 'required'. "
-                                    f"Expected {len(required)} but got {len(properties_data)}.",
-                                )
-
-                            for p_key, p_expected_type in properties_schema.items():
-                                if p_key not in properties_data:
-                                    return (
-                                        status,
-                                        f"Missing key for {tool} -> output -> schema -> properties: {p_key!r}",
-                                    )
-                                if not isinstance(properties_data[p_key], p_expected_type):
-                                    p_expected = p_expected_type.__name__
-                                    p_actual = type(properties_data[p_key]).__name__
-                                    return (
-                                        status,
-                                        f"Invalid type for {p_key!r} in {tool} -> output -> schema -> properties. Expected {p_expected!r}, but got {p_actual!r}.",
-                                    )
-
-                                for pd_key, pd_expected_type in properties_data_schema.items():
-                                    property_data = properties_data[p_key]
-                                    if pd_key not in property_data:
-                                        return (
-                                            status,
-                                            f"Missing key in properties -> {p_key}: {pd_key!r}",
-                                        )
-                                    if not isinstance(property_data[pd_key], pd_expected_type):
-                                        expected = pd_expected_type.__name__
-                                        actual = type(property_data[pd_key]).__name__
-                                        return (
-                                            status,
-                                            f"Invalid type for key in properties. Expected {expected!r}, but got {actual!r}",
-                                        )
 
+def _validate_metadata(metadata: Dict) -> Tuple[bool, str]:
+    issues = validate_metadata(metadata)
+    if issues:
+        return (False, format_issues(issues))
     return (True, "")
 
 
-def publish_metadata_to_ipfs(metadata_path: Path, ipfs_node: str = DEFAULT_IPFS_NODE) -> str:
-    """Publish metadata file to IPFS and return on-chain metadata hash."""
+@dataclass
+class ShardedPublishResult:
+    """Outcome of a sharded metadata publish."""
+
+    metadata_hash: str
+    root_cid: str
+    uploaded: List[str] = field(default_factory=list)
+    reused: List[str] = field(default_factory=list)
+
+
+def _to_onchain_hash(cid: str) -> str:
+    """Convert an IPFS CID to the on-chain metadata hash format."""
+    cid_bytes = multibase.decode(as_v1(cid))
+    multihash_bytes = multicodec.remove_prefix(cid_bytes)
+    hex_multihash = multihash_bytes.hex()
+    return PREFIX + hex_multihash[IPFS_PREFIX_LENGTH:]
+
+
+def _load_shards_index(index_path: Path, ipfs_node: str) -> Dict[str, str]:
+    """Load the shard digest to CID mapping recorded for an IPFS node."""
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    shards = index.get(ipfs_node) if isinstance(index, dict) else None
+    return shards if isinstance(shards, dict) else {}
+
+
+def _save_shards_index(index_path: Path, ipfs_node: str, shards: Dict[str, str]) -> None:
+    """Record the shard digest to CID mapping for an IPFS node."""
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        index = {}
+    if not isinstance(index, dict):
+        index = {}
+
+    index[ipfs_node] = shards
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    index_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+
+
+def _add_bytes(
+    payload: bytes, ipfs_node: Union[str, Sequence[str]], expected_cid: Optional[str] = None
+) -> str:
+    """Upload bytes to the given IPFS nodes and return the first confirmed CID."""
+    try:
+        return get_publisher(ipfs_node).add_bytes(payload, expected_cid=expected_cid or compute_cid(payload))
+    except Exception as e:  # pylint: disable=broad-except
+        raise RuntimeError(f"Error pushing metadata to ipfs: {e}") from e
+
+
+async def _add_bytes_async(
+    payload: bytes,
+    ipfs_node: Union[str, Sequence[str]],
+    publisher: Optional[AsyncIPFSPublisher],
+) -> str:
+    """Upload bytes with the given publisher, or a new one for the given IPFS nodes."""
+    expected_cid = await asyncio.to_thread(compute_cid, payload)
+    try:
+        if publisher is not None:
+            return await publisher.add_bytes(payload, expected_cid=expected_cid)
+        async with AsyncIPFSPublisher(as_nodes(ipfs_node)) as own_publisher:
+            return await own_publisher.add_bytes(payload, expected_cid=expected_cid)
+    except Exception as e:  # pylint: disable=broad-except
+        raise RuntimeError(f"Error pushing metadata to ipfs: {e}") from e
+
+
+async def publish_metadata_file_async(
+    metadata_path: Path,
+    ipfs_node: Union[str, Sequence[str]] = DEFAULT_IPFS_NODE,
+    publisher: Optional[AsyncIPFSPublisher] = None,
+) -> str:
+    """Publish metadata file to IPFS and return on-chain metadata hash.
+
+    Uploads go through `publisher` when given, so several publishes can
+    share its session; otherwise a publisher for `ipfs_node` is used.
+    """
     status, error_msg = _validate_metadata_file(metadata_path)
     if not status:
         raise ValueError(error_msg)
 
+    payload = await asyncio.to_thread(metadata_path.read_bytes)
+    return _to_onchain_hash(await _add_bytes_async(payload, ipfs_node, publisher))
+
+
+def publish_metadata_to_ipfs(
+    metadata_path: Path, ipfs_node: Union[str, Sequence[str]] = DEFAULT_IPFS_NODE
+) -> str:
+    """Publish metadata file to IPFS and return on-chain metadata hash."""
+    return asyncio.run(publish_metadata_file_async(metadata_path=metadata_path, ipfs_node=ipfs_node))
+
+
+async def publish_many_async(
+    items: Sequence[Union[bytes, Path]],
+    ipfs_node: Union[str, Sequence[str]] = DEFAULT_IPFS_NODE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> List[str]:
+    """Add many byte payloads or files to IPFS, `concurrency` at a time, and return their CIDs in order."""
+    async with AsyncIPFSPublisher(as_nodes(ipfs_node), concurrency=concurrency) as publisher:
+        try:
+            return await publisher.add_many(items)
+        except Exception as e:  # pylint: disable=broad-except
+            raise RuntimeError(f"Error pushing to ipfs: {e}") from e
+
+
+def encode_metadata(metadata: Dict[str, Any]) -> bytes:
+    """Encode a metadata document the way `write_metadata` writes it to metadata.json."""
+    return json.dumps(metadata, indent=4).encode("utf-8")
+
+
+def _hash_payload(payload: bytes) -> str:
+    """Compute the on-chain hash of bytes added to IPFS with the default chunker and codec."""
+    return _to_onchain_hash(compute_cid(payload))
+
+
+def compute_metadata_hash(metadata: Dict[str, Any]) -> str:
+    """Compute the on-chain hash publishing a metadata document would produce, without uploading it."""
+    return _hash_payload(encode_metadata(metadata))
+
+
+def _encode_for_publish(metadata: Dict[str, Any], metadata_path: Optional[Path]) -> bytes:
+    """Validate and encode a metadata document, writing it to `metadata_path` if given.
+
+    A written document is streamed to the file and read back, so the payload
+    is exactly what is on disk.
+    """
+    issues = validate_metadata(metadata)
+    if issues:
+        raise MetadataValidationError(issues)
+
+    if metadata_path is None:
+        return encode_metadata(metadata)
+
+    write_metadata(metadata=metadata, metadata_path=metadata_path)
+    return metadata_path.read_bytes()
+
+
+def publish_metadata(
+    metadata: Dict[str, Any],
+    ipfs_node: Union[str, Sequence[str]] = DEFAULT_IPFS_NODE,
+    metadata_path: Optional[Path] = None,
+    current_hash: Optional[str] = None,
+    ledger: Optional[PublishLedger] = None,
+) -> str:
+    """Publish an in-memory metadata document to IPFS and return on-chain metadata hash.
+
+    The document is validated as-is and uploaded from memory to every node
+    in `ipfs_node`, returning as soon as one of them confirms it. When
+    `metadata_path` is given, the same bytes are also written there. When
+    the hash computed locally equals `current_hash`, the content is already
+    published and the upload is skipped. The generation and the upload are
+    recorded in `ledger` if given.
+    """
+    payload = _encode_for_publish(metadata, metadata_path)
+    cid = compute_cid(payload)
+    metadata_hash = _to_onchain_hash(cid)
+    if ledger is not None:
+        ledger.record_generation(metadata_hash, len(metadata["tools"]), len(payload))
+    if metadata_hash == current_hash:
+        return current_hash
+
+    start = time.perf_counter()
+    cid = _add_bytes(payload, ipfs_node, expected_cid=cid)
+    if ledger is not None:
+        ledger.record_publish(metadata_hash, cid, as_nodes(ipfs_node), time.perf_counter() - start)
+    return metadata_hash
+
+
+async def publish_metadata_async(
+    metadata: Dict[str, Any],
+    ipfs_node: Union[str, Sequence[str]] = DEFAULT_IPFS_NODE,
+    metadata_path: Optional[Path] = None,
+    current_hash: Optional[str] = None,
+    publisher: Optional[AsyncIPFSPublisher] = None,
+) -> str:
+    """Async variant of `publish_metadata`, optionally uploading through a shared `publisher`."""
+    payload = _encode_for_publish(metadata, metadata_path)
+    if current_hash and await asyncio.to_thread(_hash_payload, payload) == current_hash:
+        return current_hash
+
+    return _to_onchain_hash(await _add_bytes_async(payload, ipfs_node, publisher))
+
+
+def publish_sharded_metadata(
+    metadata: Dict[str, Any],
+    cache_dir: Path,
+    ipfs_node: Union[str, Sequence[str]] = DEFAULT_IPFS_NODE,
+    metadata_path: Optional[Path] = None,
+    ledger: Optional[PublishLedger] = None,
+) -> ShardedPublishResult:
+    """Publish metadata as one IPFS object per tool plus a root manifest.
+
+    The root manifest is the metadata document with each `toolMetadata`
+    entry replaced by a `{"/": <cid>}` link to that tool's shard. Shards
+    already uploaded to the same `ipfs_node` with identical content, as recorded in
+    `cache_dir`, are linked without being uploaded again. The returned hash
+    is the on-chain form of the root manifest CID. The manifest does not
+    follow the metadata schema, so the hash is only for consumers resolving
+    the links and must not be set on-chain. When `metadata_path` is
+    given, the full document is also written there. The root manifest and
+    its upload, covering the shards, are recorded in `ledger` if given.
+    """
+    issues = validate_metadata(metadata)
+    if issues:
+        raise MetadataValidationError(issues)
+
+    if metadata_path is not None:
+        write_metadata(metadata=metadata, metadata_path=metadata_path)
+
+    start = time.perf_counter()
+
+    metadata, _ = expand_definitions(metadata)
+    index_path = cache_dir / SHARDS_INDEX_FILE
+    index_key = ",".join(as_nodes(ipfs_node))
+    known_shards = _load_shards_index(index_path, index_key)
+
+    result = ShardedPublishResult(metadata_hash="", root_cid="")
+    shards: Dict[str, str] = {}
+    links: Dict[str, Dict[str, str]] = {}
     try:
-        response = IPFSTool(addr=ipfs_node).client.add(
-            str(metadata_path), pin=True, recursive=True, wrap_with_directory=False
-        )
-    except Exception as e:  # pylint: disable=broad-except
-        raise RuntimeError(f"Error pushing metadata to ipfs: {e}") from e
+        for tool, tool_metadata in metadata["toolMetadata"].items():
+            shard = encode_metadata(tool_metadata)
+            digest = hashlib.sha256(shard).hexdigest()
+            cid = known_shards.get(digest)
+            if cid is None:
+                cid = _add_bytes(shard, ipfs_node)
+                result.uploaded.append(tool)
+            else:
+                result.reused.append(tool)
+            shards[digest] = cid
+            links[tool] = {LINK_KEY: cid}
 
-    if RESPONSE_KEY not in response:
-        raise RuntimeError(f"Key {RESPONSE_KEY!r} not found in ipfs response")
+        root = {
+            key: value
+            for key, value in metadata.items()
+            if key not in ("toolMetadata", DEFINITIONS_KEY)
+        }
+        root["toolMetadata"] = links
+        root_payload = encode_metadata(root)
+        result.root_cid = _add_bytes(root_payload, ipfs_node)
+    finally:
+        _save_shards_index(index_path, index_key, {**known_shards, **shards})
 
-    cid_bytes = multibase.decode(to_v1(response[RESPONSE_KEY]))
-    multihash_bytes = multicodec.remove_prefix(cid_bytes)
-    hex_multihash = multihash_bytes.hex()
-    return PREFIX + hex_multihash[IPFS_PREFIX_LENGTH:]
+    result.metadata_hash = _to_onchain_hash(result.root_cid)
+    if ledger is not None:
+        ledger.record_generation(result.metadata_hash, len(metadata["tools"]), len(root_payload))
+        ledger.record_publish(
+            result.metadata_hash, result.root_cid, as_nodes(ipfs_node), time.perf_counter() - start
+        )
+    return result
@@ -22,30 +22,54 @@
 import json
 import os
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import dotenv
+from eth_account import Account
 from multibase import multibase
 from multicodec import multicodec
 from safe_eth.eth import EthereumClient  # pylint:disable=import-error
-from safe_eth.safe import Safe  # pylint:disable=import-error
 from web3 import Web3
 from web3.constants import ADDRESS_ZERO
 from web3.contract import Contract
 from web3.types import TxReceipt
 
+from mtd.services.chain import (
+    FeeCaps,
+    Preflight,
+    gas_limit,
+    get_ethereum_client,
+    get_receipt,
+    get_safe,
+    preflight,
+    rpc_urls,
+    suggest_fees,
+    wait_for_receipts,
+)
+from mtd.services.chain.preflight import Read
+from mtd.services.chain.receipts import DEFAULT_TIMEOUT
+from mtd.services.metadata.ledger import OBSERVED_TX_HASH, OnchainUpdate, PendingUpdate, PublishLedger
 
-def _load_env(env_path: Path) -> Dict[str, str]:
-    """Load and validate required runtime env values."""
+
+FEE_CAP_KEYS = ("MAX_FEE_PER_GAS_GWEI", "MAX_PRIORITY_FEE_PER_GAS_GWEI")
+PENDING_EXPIRY_BLOCKS = 50
+
+
+def _load_env(env_path: Path) -> Dict[str, Any]:
+    """Load and validate required runtime env values.
+
+    `CHAIN_RPCS` lists every endpoint configured for the chain, from
+    `<CHAIN>_LEDGER_RPC_0` to `<CHAIN>_LEDGER_RPC_3`.
+    """
     dotenv.load_dotenv(dotenv_path=str(env_path), override=True)
 
     default_chain = (os.environ.get("DEFAULT_CHAIN_ID") or "").strip().upper()
     if not default_chain:
         raise ValueError("Missing DEFAULT_CHAIN_ID in environment.")
 
-    chain_rpc = os.environ.get(f"{default_chain}_LEDGER_RPC_0", "")
+    chain_rpcs = rpc_urls(os.environ, default_chain)
     chain_id = os.environ.get(f"{default_chain}_LEDGER_CHAIN_ID", "")
-    if not chain_rpc:
+    if not chain_rpcs:
         raise ValueError(
             f"Missing RPC for chain {default_chain}: {default_chain}_LEDGER_RPC_0"
         )
@@ -55,7 +79,8 @@ def _load_env(env_path: Path) -> Dict[str, str]:
         )
 
     required = {
-        "CHAIN_RPC": chain_rpc,
+        "CHAIN": default_chain.lower(),
+        "CHAIN_RPC": chain_rpcs[0],
         "CHAIN_ID": chain_id,
         "COMPLEMENTARY_SERVICE_METADATA_ADDRESS": os.environ.get(
             "COMPLEMENTARY_SERVICE_METADATA_ADDRESS", ""
@@ -69,7 +94,8 @@ def _load_env(env_path: Path) -> Dict[str, str]:
         if not value:
             raise ValueError(f"Missing {required_key} in environment.")
 
-    return required
+    fee_caps = {key: os.environ.get(f"{default_chain}_{key}", "") for key in FEE_CAP_KEYS}
+    return {**required, **fee_caps, "CHAIN_RPCS": chain_rpcs}
 
 
 def _load_contract(web3_client: Web3, abi_dir: Path, contract_address: str, abi_file: str) -> Contract:
@@ -90,51 +116,153 @@ def _fetch_metadata_hash(metadata_hash: str) -> bytes:
     return bytes.fromhex(metadata_str)
 
 
-def _send_safe_tx(
+def _send_safe_tx(  # pylint: disable=too-many-arguments
     web3_client: Web3,
     ethereum_client: EthereumClient,
     tx_data: str,
     to_address: str,
     safe_address: str,
     signer_pkey: str,
-    gas: int,
+    chain_id: int,
+    fee_caps: FeeCaps = FeeCaps(),
     value: int = 0,
-) -> Optional[TxReceipt]:
-    """Send a Safe transaction."""
-    safe = Safe(safe_address, ethereum_client)  # pylint:disable=abstract-class-instantiated
+    state: Optional[Preflight] = None,
+) -> Tuple[str, int]:
+    """Send a Safe transaction with estimated gas and fees from the recent fee history.
+
+    The nonces, fees and Safe state are taken from `state`, or read in one
+    batch if not given, so only the gas estimate and the transaction itself
+    cost a round-trip each. Returns as soon as the transaction is
+    submitted, with its hash and the `eth_estimateGas` estimate of
+    `execTransaction`.
+    """
+    sender = Account.from_key(signer_pkey)
+    if state is None:
+        state = preflight(web3_client, safe_address, sender.address)
+    state.check(chain_id, sender.address)
+
+    safe = get_safe(safe_address, ethereum_client, version=state.safe_version)
+    # A zero safe_tx_gas forwards all gas and makes execTransaction revert if
+    # the inner call fails, so failures surface in the estimate, before sending.
     safe_tx = safe.build_multisig_tx(
         to=to_address,
         value=value,
         data=bytes.fromhex(tx_data[2:]),
         operation=0,
-        safe_tx_gas=gas,
+        safe_tx_gas=0,
         base_gas=0,
         gas_price=0,
         gas_token=ADDRESS_ZERO,
         refund_receiver=ADDRESS_ZERO,
+        safe_nonce=state.safe_nonce,
     )
     safe_tx.sign(signer_pkey)
     try:
-        tx_hash, _ = safe_tx.execute(signer_pkey)
-        return web3_client.eth.wait_for_transaction_receipt(tx_hash)
+        gas_estimate = safe_tx.w3_tx.estimate_gas({"from": sender.address})
+        transaction = safe_tx.w3_tx.build_transaction(
+            {
+                "from": sender.address,
+                "chainId": chain_id,
+                "nonce": state.sender_nonce,
+                "gas": gas_limit(gas_estimate),
+                **suggest_fees(web3_client, fee_caps, history=state.fee_history, gas_price=state.gas_price),
+            }
+        )
+        tx_hash = ethereum_client.send_unsigned_transaction(transaction, private_key=sender.key, retry=True)
+        return Web3.to_hex(tx_hash), gas_estimate
     except Exception as e:  # pylint: disable=broad-except
         raise RuntimeError(f"Exception while sending a safe transaction: {e}") from e
 
 
-def update_metadata_onchain(
+def record_receipt(ledger: PublishLedger, tx_hash: str, receipt: TxReceipt) -> Optional[OnchainUpdate]:
+    """Confirm a pending update in the ledger with its receipt."""
+    return ledger.confirm(
+        tx_hash,
+        success=bool(receipt["status"]),
+        gas_used=receipt["gasUsed"],
+        block_number=receipt["blockNumber"],
+        effective_gas_price=receipt.get("effectiveGasPrice"),
+    )
+
+
+def reconcile_pending(
+    ledger: PublishLedger,
+    web3_client: Web3,
+    pending: List[PendingUpdate],
+    mined_nonce: int,
+    block_number: Optional[int],
+) -> List[PendingUpdate]:
+    """Settle pending updates against the chain and return those still pending.
+
+    Updates with a receipt are confirmed. Updates that will never be mined
+    are discarded: those whose sender nonce was used by another transaction,
+    which replaced or outran them, and those still without a receipt
+    PENDING_EXPIRY_BLOCKS blocks after they were submitted.
+    """
+    still_pending = []
+    for update in pending:
+        receipt = get_receipt(web3_client, update.tx_hash)
+        if receipt is not None:
+            record_receipt(ledger, update.tx_hash, receipt)
+        elif update.nonce is not None and mined_nonce > update.nonce:
+            ledger.discard(update.tx_hash)
+        elif (
+            update.block_number is not None
+            and block_number is not None
+            and block_number - update.block_number >= PENDING_EXPIRY_BLOCKS
+        ):
+            ledger.discard(update.tx_hash)
+        else:
+            still_pending.append(update)
+    return still_pending
+
+
+def update_metadata_onchain(  # pylint: disable=too-many-arguments
     env_path: Path,
     private_key_path: Path,
     abi_dir: Optional[Path] = None,
-) -> Tuple[bool, str]:
-    """Update metadata hash on-chain and return (success, tx_hash)."""
+    ledger: Optional[PublishLedger] = None,
+    wait: bool = True,
+    timeout: float = DEFAULT_TIMEOUT,
+    rpc_scores_path: Optional[Path] = None,
+    force: bool = False,
+) -> Tuple[bool, Optional[str]]:
+    """Update metadata hash on-chain and return (success, tx_hash).
+
+    The hash stored on-chain for the service is read first, in the same
+    JSON-RPC batch as the nonces, fees and Safe state. If it already
+    matches, no transaction is sent and tx_hash is None; if `ledger` does
+    not have it as the live hash, for example because it was set from another
+    machine, it is recorded as an update without a transaction. Gas is estimated
+    and fees are priced from the chain's recent fee history, bounded by the
+    optional `<CHAIN>_MAX_FEE_PER_GAS_GWEI` and
+    `<CHAIN>_MAX_PRIORITY_FEE_PER_GAS_GWEI` env values.
+
+    The receipt is polled with exponential backoff for up to `timeout`
+    seconds. Without `wait`, this returns as soon as the transaction is
+    submitted, with success only meaning it was accepted by the node. The
+    transaction is recorded in `ledger` if given: as pending once submitted,
+    then with its gas used against the estimate and its block once mined.
+
+    Requests go to the healthiest of the chain's configured RPC endpoints,
+    with reads retried on the others, and endpoint stats are kept in
+    `rpc_scores_path` if given.
+
+    A transaction still pending in `ledger` on the chain holds the current
+    Safe nonce, so a new one would revert once it is mined. Pending updates
+    are first settled with `reconcile_pending`, within the same batch of
+    reads; if one is still pending, RuntimeError is raised instead of
+    sending, unless `force` is set.
+    """
     runtime = _load_env(env_path=env_path)
+    pending = ledger.pending(runtime["CHAIN"]) if ledger is not None else []
 
     signer_pkey = private_key_path.read_text(encoding="utf-8").strip()
     if not signer_pkey:
         raise ValueError("Private key file is empty.")
 
-    web3_client = Web3(Web3.HTTPProvider(runtime["CHAIN_RPC"]))
-    ethereum_client = EthereumClient(runtime["CHAIN_RPC"])
+    ethereum_client = get_ethereum_client(runtime["CHAIN_RPCS"], rpc_scores_path)
+    web3_client = ethereum_client.w3
 
     abi_root = abi_dir or (Path(__file__).resolve().parents[3] / "utils" / "abis")
     contract = _load_contract(
@@ -144,36 +272,56 @@ def update_metadata_onchain(
         abi_file="ComplementaryServiceMetadata",
     )
 
+    service_id = int(runtime["ON_CHAIN_SERVICE_ID"])
     metadata_bytes = _fetch_metadata_hash(runtime["METADATA_HASH"])
     safe_address = web3_client.to_checksum_address(runtime["SAFE_CONTRACT_ADDRESS"])
+    sender = Account.from_key(signer_pkey).address
+    reads: List[Read] = [lambda: contract.functions.mapServiceHashes(service_id)]
+    if pending:
+        reads.append(lambda: web3_client.eth.get_transaction_count(sender, "latest"))
+    state = preflight(web3_client, safe_address, sender, reads=reads)
+    if pending and ledger is not None:
+        pending = reconcile_pending(ledger, web3_client, pending, state.reads[1], state.block_number)
+    if pending and not force:
+        raise RuntimeError(
+            f"Transaction {pending[0].tx_hash} is still pending on {runtime['CHAIN']}. "
+            "Collect its receipt with 'mech tx wait', or drop it with 'mech tx clear', "
+            "before submitting another update."
+        )
 
-    safe = Safe(safe_address, ethereum_client)  # pylint:disable=abstract-class-instantiated
-    safe_nonce = safe.retrieve_nonce()
-
-    function = contract.functions.changeHash(
-        int(runtime["ON_CHAIN_SERVICE_ID"]), metadata_bytes
-    )
-    transaction = function.build_transaction(
-        {
-            "chainId": int(runtime["CHAIN_ID"]),
-            "gas": 100000,
-            "gasPrice": web3_client.to_wei("3", "gwei"),
-            "nonce": safe_nonce,
-        }
-    )
+    if state.reads[0] == metadata_bytes:
+        if ledger is not None:
+            live = ledger.live(runtime["CHAIN"])
+            if live is None or live.metadata_hash != runtime["METADATA_HASH"]:
+                ledger.record_update(runtime["CHAIN"], runtime["METADATA_HASH"], OBSERVED_TX_HASH, success=True)
+        return (True, None)
 
-    tx_receipt = _send_safe_tx(
+    tx_hash, gas_estimate = _send_safe_tx(
         web3_client=web3_client,
         ethereum_client=ethereum_client,
-        tx_data=transaction["data"],
+        tx_data=contract.encode_abi("changeHash", args=[service_id, metadata_bytes]),
         to_address=runtime["COMPLEMENTARY_SERVICE_METADATA_ADDRESS"],
         safe_address=safe_address,
         signer_pkey=signer_pkey,
-        gas=100000,
+        chain_id=int(runtime["CHAIN_ID"]),
+        fee_caps=FeeCaps.from_gwei(runtime.get("MAX_FEE_PER_GAS_GWEI"), runtime.get("MAX_PRIORITY_FEE_PER_GAS_GWEI")),
+        state=state,
     )
-    if tx_receipt is None:
-        raise RuntimeError(
-            "Safe transaction execution failed; no transaction receipt returned."
+    if ledger is not None:
+        ledger.record_pending(
+            runtime["CHAIN"],
+            runtime["METADATA_HASH"],
+            tx_hash,
+            gas_estimate,
+            nonce=state.sender_nonce,
+            block_number=state.block_number,
         )
+    if not wait:
+        return (True, tx_hash)
 
-    return (bool(tx_receipt.status), tx_receipt.transactionHash.hex())
+    tx_receipt = wait_for_receipts(web3_client, [tx_hash], timeout=timeout).get(tx_hash)
+    if tx_receipt is None:
+        raise RuntimeError(f"Transaction {tx_hash} was not mined within {timeout:g} s.")
+    if ledger is not None:
+        record_receipt(ledger, tx_hash, tx_receipt)
+    return (bool(tx_receipt["status"]), tx_hash)
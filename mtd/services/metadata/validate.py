@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Metadata validation service."""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+DEFINITIONS_KEY = "definitions"
+REF_KEY = "$ref"
+REF_PREFIX = f"#/{DEFINITIONS_KEY}/"
+ROOT_PATH = "$"
+
+metadata_schema = {
+    "name": str,
+    "description": str,
+    "inputFormat": str,
+    "outputFormat": str,
+    "image": str,
+    "tools": list,
+    "toolMetadata": dict,
+}
+
+tool_schema = {
+    "name": str,
+    "description": str,
+    "input": dict,
+    "output": dict,
+}
+tool_input_schema = {
+    "type": str,
+    "description": str,
+}
+tool_output_schema = {"type": str, "description": str, "schema": dict}
+
+output_schema_schema = {
+    "properties": dict,
+    "required": list,
+    "type": str,
+}
+
+properties_schema = {
+    "requestId": dict,
+    "result": dict,
+    "prompt": dict,
+}
+
+properties_data_schema = {
+    "type": str,
+    "description": str,
+}
+
+
+@dataclass(frozen=True)
+class ValidationIssue:
+    """A single metadata violation and the JSON path it was found at."""
+
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        """Format the issue as `<path>: <message>`."""
+        return f"{self.path}: {self.message}"
+
+
+class MetadataValidationError(ValueError):
+    """Raised when a metadata document does not match the metadata schema."""
+
+    def __init__(self, issues: List[ValidationIssue]) -> None:
+        """Initialize the error."""
+        super().__init__(format_issues(issues))
+        self.issues = issues
+
+
+class _References:
+    """Resolve `$ref` links against the definitions of a document.
+
+    Each definition is checked once, however many tools reference it.
+    """
+
+    def __init__(self, definitions: Any) -> None:
+        """Initialize the references."""
+        self.definitions = definitions if isinstance(definitions, dict) else {}
+        self._checked: Set[Tuple[str, int]] = set()
+
+    def check(self, ref: Any, path: str, check: "Check", issues: List[ValidationIssue]) -> None:
+        """Check the definition a reference points to, reporting unresolved references."""
+        name = ref[len(REF_PREFIX) :] if isinstance(ref, str) and ref.startswith(REF_PREFIX) else None
+        if name not in self.definitions:
+            issues.append(ValidationIssue(join_path(path, REF_KEY), f"unresolved reference {ref!r}"))
+            return
+
+        key = (name, id(check))
+        if key not in self._checked:
+            self._checked.add(key)
+            check(self.definitions[name], join_path(join_path(ROOT_PATH, DEFINITIONS_KEY), name), issues, self)
+
+
+Check = Callable[[Any, str, List[ValidationIssue], _References], None]
+
+
+def join_path(path: str, key: Any) -> str:
+    """Append an object key or a list index to a JSON path."""
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    if isinstance(key, str) and key.isidentifier():
+        return f"{path}.{key}"
+    return f"{path}[{json.dumps(key)}]"
+
+
+def _type_issue(path: str, expected: str, value: Any) -> ValidationIssue:
+    """Describe a value of the wrong type."""
+    return ValidationIssue(path, f"expected {expected!r}, got {type(value).__name__!r}")
+
+
+def _compile_object(
+    fields: Dict[str, type],
+    children: Optional[Dict[str, Check]] = None,
+    after: Optional[Check] = None,
+) -> Check:
+    """Compile a check for an object with required, typed fields.
+
+    `children` check the value of a field once its type is correct and
+    `after` checks the object as a whole once its fields were checked.
+    """
+    children = children or {}
+    compiled = tuple(
+        (key, expected, expected.__name__, children.get(key)) for key, expected in fields.items()
+    )
+
+    def check(value: Any, path: str, issues: List[ValidationIssue], refs: _References) -> None:
+        if not isinstance(value, dict):
+            issues.append(_type_issue(path, "dict", value))
+            return
+
+        for key, expected, expected_name, child in compiled:
+            if key not in value:
+                issues.append(ValidationIssue(path, f"missing required key {key!r}"))
+                continue
+
+            item = value[key]
+            if not isinstance(item, expected):
+                issues.append(_type_issue(join_path(path, key), expected_name, item))
+            elif child is not None:
+                child(item, join_path(path, key), issues, refs)
+
+        if after is not None:
+            after(value, path, issues, refs)
+
+    return check
+
+
+def _compile_values(values: Check) -> Check:
+    """Compile a check applied to every value of an object."""
+
+    def check(value: Dict[str, Any], path: str, issues: List[ValidationIssue], refs: _References) -> None:
+        for key, item in value.items():
+            values(item, join_path(path, key), issues, refs)
+
+    return check
+
+
+def _compile_referable(target: Check) -> Check:
+    """Compile a check that follows a `$ref` link before applying `target`."""
+
+    def check(value: Dict[str, Any], path: str, issues: List[ValidationIssue], refs: _References) -> None:
+        if REF_KEY in value:
+            refs.check(value[REF_KEY], path, target, issues)
+        else:
+            target(value, path, issues, refs)
+
+    return check
+
+
+def _check_required(schema: Dict[str, Any], path: str, issues: List[ValidationIssue], _: _References) -> None:
+    """Check that an output schema requires as many keys as it has properties."""
+    properties = schema.get("properties")
+    required = schema.get("required")
+    if isinstance(properties, dict) and isinstance(required, list) and len(properties) != len(required):
+        issues.append(
+            ValidationIssue(
+                join_path(path, "required"),
+                f"expected {len(properties)} entries to match 'properties', got {len(required)}",
+            )
+        )
+
+
+def _check_tools(metadata: Dict[str, Any], path: str, issues: List[ValidationIssue], _: _References) -> None:
+    """Check that `tools` and `toolMetadata` list the same tools."""
+    tools = metadata.get("tools")
+    tools_metadata = metadata.get("toolMetadata")
+    if not isinstance(tools, list) or not isinstance(tools_metadata, dict):
+        return
+
+    tools_path = join_path(path, "tools")
+    tools_metadata_path = join_path(path, "toolMetadata")
+    listed: Set[str] = set()
+    for index, tool in enumerate(tools):
+        if not isinstance(tool, str):
+            issues.append(_type_issue(join_path(tools_path, index), "str", tool))
+        elif tool in listed:
+            issues.append(ValidationIssue(join_path(tools_path, index), f"duplicate tool {tool!r}"))
+        else:
+            listed.add(tool)
+            if tool not in tools_metadata:
+                issues.append(ValidationIssue(tools_metadata_path, f"missing entry for tool {tool!r}"))
+
+    for tool in tools_metadata:
+        if tool not in listed:
+            issues.append(ValidationIssue(join_path(tools_metadata_path, tool), "tool is not listed in 'tools'"))
+
+
+def _compile_metadata_check() -> Check:
+    """Compile the check of a whole metadata document."""
+    property_data = _compile_object(properties_data_schema)
+    output_schema = _compile_object(
+        output_schema_schema,
+        children={
+            "properties": _compile_object(
+                properties_schema, children={key: property_data for key in properties_schema}
+            )
+        },
+        after=_check_required,
+    )
+    tool = _compile_object(
+        tool_schema,
+        children={
+            "input": _compile_referable(_compile_object(tool_input_schema)),
+            "output": _compile_referable(
+                _compile_object(tool_output_schema, children={"schema": output_schema})
+            ),
+        },
+    )
+    return _compile_object(
+        metadata_schema,
+        children={"toolMetadata": _compile_values(tool)},
+        after=_check_tools,
+    )
+
+
+_METADATA_CHECK = _compile_metadata_check()
+
+
+def validate_metadata(metadata: Any) -> List[ValidationIssue]:
+    """Check a metadata document in a single pass and return every violation found.
+
+    Compact documents are checked without being expanded: every shared
+    definition is checked once and each `$ref` only has to resolve.
+    """
+    issues: List[ValidationIssue] = []
+    definitions = metadata.get(DEFINITIONS_KEY) if isinstance(metadata, dict) else None
+    if definitions is not None and not isinstance(definitions, dict):
+        issues.append(_type_issue(join_path(ROOT_PATH, DEFINITIONS_KEY), "dict", definitions))
+
+    _METADATA_CHECK(metadata, ROOT_PATH, issues, _References(definitions))
+    return issues
+
+
+def format_issues(issues: List[ValidationIssue]) -> str:
+    """Format validation issues as a single message, one issue per line."""
+    lines = [f"Invalid metadata ({len(issues)} problem(s) found):"]
+    lines.extend(f"  {issue}" for issue in issues)
+    return "\n".join(lines)
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Metadata watch service."""
+
+import queue
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
+from watchdog.observers.polling import PollingObserver
+
+from mtd.services.metadata.generate import (
+    CUSTOMS,
+    DEFAULT_IMPORT_MEMORY_LIMIT,
+    DEFAULT_IMPORT_TIMEOUT,
+    IMPORT_ERROR,
+    assemble_metadata,
+    find_tool_folders,
+    scan_tool_folder,
+    write_metadata,
+)
+from mtd.services.metadata.validate import format_issues, validate_metadata
+
+
+DEFAULT_DEBOUNCE = 0.5
+STOP_CHECK_INTERVAL = 0.5
+IGNORED_PARTS = frozenset(["__pycache__"])
+IGNORED_SUFFIXES = frozenset([".pyc", ".swp", ".tmp"])
+
+
+@dataclass
+class MetadataUpdate:
+    """Outcome of regenerating metadata after a change."""
+
+    rescanned: List[str]
+    metadata: Dict[str, Any]
+    error: str = ""
+    import_errors: Dict[str, str] = field(default_factory=dict)
+
+
+class _ChangeCollector(FileSystemEventHandler):
+    """Queue the paths touched by file system events."""
+
+    def __init__(self, changes: "queue.Queue[str]") -> None:
+        """Initialize the collector."""
+        self._changes = changes
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        """Queue the paths of a relevant event."""
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            if not path:
+                continue
+            path = path.decode() if isinstance(path, bytes) else path
+            parts = Path(path).parts
+            if IGNORED_PARTS.intersection(parts) or Path(path).suffix in IGNORED_SUFFIXES:
+                continue
+            self._changes.put(path)
+
+
+class MetadataWatcher:
+    """Keep a metadata document in sync with the tool packages on disk.
+
+    Tool entries are kept in memory, so a change only rescans the tool
+    packages it touched before the document is rebuilt, validated and, if
+    valid, written to `metadata_path`.
+    """
+
+    def __init__(
+        self,
+        packages_dir: Path,
+        metadata_path: Path,
+        compact: bool = False,
+        import_timeout: float = DEFAULT_IMPORT_TIMEOUT,
+        import_memory_limit: int = DEFAULT_IMPORT_MEMORY_LIMIT,
+    ) -> None:
+        """Initialize the watcher."""
+        self.packages_dir = packages_dir.resolve()
+        self.metadata_path = metadata_path
+        self.compact = compact
+        self.import_timeout = import_timeout
+        self.import_memory_limit = import_memory_limit
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._watched: Set[Path] = set()
+
+    def tool_key(self, path: str) -> Optional[str]:
+        """Get the key of the tool package a path belongs to, if any."""
+        try:
+            parts = Path(path).relative_to(self.packages_dir).parts
+        except ValueError:
+            return None
+        if len(parts) >= 3 and parts[1] == CUSTOMS:
+            return "/".join(parts[:3])
+        return None
+
+    def refresh(self, changed_paths: Optional[Iterable[str]] = None) -> MetadataUpdate:
+        """Rescan the tools affected by the changed paths and rebuild the metadata.
+
+        Without changed paths every tool is rescanned. Tools that appeared
+        since the last refresh are always scanned and tools that disappeared
+        are dropped. Tools are looked up the same way `push-metadata` does,
+        so the watcher publishes exactly what a push would; a tool is picked
+        up once it is locked in packages.json.
+        """
+        tool_folders = {
+            tool_folder.relative_to(self.packages_dir).as_posix(): tool_folder
+            for tool_folder in find_tool_folders(self.packages_dir)
+        }
+        if changed_paths is None:
+            keys = set(tool_folders)
+        else:
+            keys = {key for key in map(self.tool_key, changed_paths) if key is not None}
+            keys |= set(tool_folders) - set(self._entries)
+
+        for key in set(self._entries) - set(tool_folders):
+            del self._entries[key]
+
+        rescanned = sorted(key for key in keys if key in tool_folders)
+        for key in rescanned:
+            self._entries[key] = scan_tool_folder(
+                tool_folders[key],
+                import_timeout=self.import_timeout,
+                import_memory_limit=self.import_memory_limit,
+            )
+
+        metadata = assemble_metadata(
+            [self._entries[key] for key in tool_folders], compact=self.compact
+        )
+        issues = validate_metadata(metadata)
+        error = format_issues(issues) if issues else ""
+        if not issues:
+            write_metadata(metadata=metadata, metadata_path=self.metadata_path)
+
+        return MetadataUpdate(
+            rescanned=rescanned,
+            metadata=metadata,
+            error=error,
+            import_errors={
+                key: self._entries[key][IMPORT_ERROR]
+                for key in rescanned
+                if IMPORT_ERROR in self._entries[key]
+            },
+        )
+
+    def _schedule(self, observer: BaseObserver, handler: FileSystemEventHandler) -> None:
+        """Watch the packages directory and every customs folder not watched yet."""
+        if self.packages_dir not in self._watched:
+            observer.schedule(handler, str(self.packages_dir), recursive=False)
+            self._watched.add(self.packages_dir)
+
+        for customs_folder in sorted(self.packages_dir.glob(f"*/{CUSTOMS}")):
+            if customs_folder.is_dir() and customs_folder not in self._watched:
+                observer.schedule(handler, str(customs_folder), recursive=True)
+                self._watched.add(customs_folder)
+
+    def _start_observer(self, handler: FileSystemEventHandler, poll: bool) -> BaseObserver:
+        """Start a native observer, falling back to polling when it is unavailable."""
+        if not poll:
+            observer = Observer()
+            try:
+                self._schedule(observer, handler)
+                observer.start()
+                return observer
+            except OSError:
+                self._watched.clear()
+
+        observer = PollingObserver()
+        self._schedule(observer, handler)
+        observer.start()
+        return observer
+
+    def watch(
+        self,
+        on_update: Callable[[MetadataUpdate], None],
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll: bool = False,
+        stop: Optional[threading.Event] = None,
+    ) -> None:
+        """Regenerate metadata on every burst of package changes until stopped.
+
+        Changes are collected until no new one arrives for `debounce`
+        seconds, then the affected tools are rescanned in a single refresh.
+        """
+        stop = stop or threading.Event()
+        changes: "queue.Queue[str]" = queue.Queue()
+        handler = _ChangeCollector(changes)
+        observer = self._start_observer(handler, poll=poll)
+        try:
+            on_update(self.refresh())
+            while not stop.is_set():
+                try:
+                    changed = {changes.get(timeout=STOP_CHECK_INTERVAL)}
+                except queue.Empty:
+                    continue
+
+                while True:
+                    try:
+                        changed.add(changes.get(timeout=debounce))
+                    except queue.Empty:
+                        break
+
+                on_update(self.refresh(changed))
+                self._schedule(observer, handler)
+        finally:
+            observer.stop()
+            observer.join()
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""Package services."""
+
+from mtd.services.packages.publish import (
+    PackagePublishResult,
+    load_dev_packages,
+    publish_packages,
+    publish_packages_async,
+)
+
+
+__all__ = [
+    "PackagePublishResult",
+    "load_dev_packages",
+    "publish_packages",
+    "publish_packages_async",
+]
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""In-process publisher for the packages of a workspace."""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from mtd.services.ipfs.dag import DagNode, add_directory, add_file
+from mtd.services.metadata.ipfs import DEFAULT_CONCURRENCY, AsyncIPFSPublisher, as_nodes, as_v1
+
+
+PACKAGES_FILE = "packages.json"
+DEV_PACKAGES_KEY = "dev"
+PUSHED_INDEX_FILE = "pushed_packages.json"
+IGNORED_DIRS = ("__pycache__",)
+IGNORED_SUFFIXES = (".pyc",)
+DEFAULT_JOBS = 4
+
+
+@dataclass
+class PackageContent:
+    """The files of a package in upload order and the CID they hash to."""
+
+    entries: List[Tuple[str, Optional[bytes]]] = field(default_factory=list)
+    cid: str = ""
+
+
+@dataclass
+class PackagePublishResult:  # pylint: disable=too-many-instance-attributes
+    """Outcome of publishing one package."""
+
+    package_id: str
+    path: Path
+    expected_cid: str
+    cid: str = ""
+    hash_seconds: float = 0.0
+    upload_seconds: float = 0.0
+    skipped: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Check whether the package was published or found already published."""
+        return self.error is None
+
+    @property
+    def stale(self) -> bool:
+        """Check whether the package content no longer matches its hash in packages.json."""
+        return bool(self.cid) and self.cid != self.expected_cid
+
+
+def load_dev_packages(packages_dir: Path) -> Dict[str, str]:
+    """Load the package ids and hashes of the development packages in packages.json."""
+    packages = json.loads((packages_dir / PACKAGES_FILE).read_text(encoding="utf-8"))
+    return packages.get(DEV_PACKAGES_KEY, packages)
+
+
+def package_path(packages_dir: Path, package_id: str) -> Path:
+    """Get the directory of a `type/author/name/version` package."""
+    package_type, author, name, _ = package_id.split("/")
+    return packages_dir / author / f"{package_type}s" / name
+
+
+def read_package(path: Path) -> PackageContent:
+    """Read a package directory and compute the CID `autonomy push` gives it.
+
+    Python caches are left out, as the package hasher does.
+    """
+    content = PackageContent()
+
+    def _add(directory: Path, relative: str) -> DagNode:
+        content.entries.append((relative, None))
+        nodes: Dict[str, DagNode] = {}
+        for child in sorted(directory.iterdir(), key=lambda child: child.name):
+            child_relative = f"{relative}/{child.name}"
+            if child.is_dir():
+                if child.name not in IGNORED_DIRS:
+                    nodes[child.name] = _add(child, child_relative)
+            elif child.suffix not in IGNORED_SUFFIXES:
+                data = child.read_bytes()
+                content.entries.append((child_relative, data))
+                nodes[child.name] = add_file(data)
+        return add_directory(nodes)
+
+    content.cid = as_v1(add_directory({path.name: _add(path, path.name)}).cid)
+    return content
+
+
+def _load_pushed(index_path: Path, nodes_key: str) -> Dict[str, str]:
+    """Load the package id to CID mapping recorded for a set of IPFS nodes."""
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    pushed = index.get(nodes_key) if isinstance(index, dict) else None
+    return pushed if isinstance(pushed, dict) else {}
+
+
+def _save_pushed(index_path: Path, nodes_key: str, pushed: Dict[str, str]) -> None:
+    """Record the package id to CID mapping for a set of IPFS nodes."""
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        index = {}
+    if not isinstance(index, dict):
+        index = {}
+
+    index[nodes_key] = pushed
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    index_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+
+
+async def publish_packages_async(
+    packages_dir: Path,
+    ipfs_node: Union[str, Sequence[str]],
+    cache_dir: Optional[Path] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    jobs: int = DEFAULT_JOBS,
+    force: bool = False,
+) -> List[PackagePublishResult]:
+    """Publish the development packages of packages.json and return one result per package.
+
+    Packages are read and hashed in a pool of `jobs` threads and uploaded as
+    soon as they are hashed, at most `concurrency` at a time per node, over
+    one HTTP session. When `cache_dir` is given, packages already published
+    to the same nodes with the same CID are skipped, unless `force` is set,
+    for example when a node lost its pins. Packages missing from
+    `packages_dir` are left out, as `autonomy push-all` does.
+    """
+    nodes = as_nodes(ipfs_node)
+    nodes_key = ",".join(nodes)
+    index_path = None if cache_dir is None else cache_dir / PUSHED_INDEX_FILE
+    pushed = {} if index_path is None else _load_pushed(index_path, nodes_key)
+    results = [
+        PackagePublishResult(package_id=package_id, path=package_path(packages_dir, package_id), expected_cid=cid)
+        for package_id, cid in load_dev_packages(packages_dir).items()
+    ]
+    results = [result for result in results if result.path.is_dir()]
+    loop = asyncio.get_running_loop()
+
+    async def _publish(result: PackagePublishResult, executor: ThreadPoolExecutor) -> None:
+        try:
+            start = time.perf_counter()
+            content = await loop.run_in_executor(executor, read_package, result.path)
+            result.cid = content.cid
+            result.hash_seconds = time.perf_counter() - start
+            if not force and pushed.get(result.package_id) == content.cid:
+                result.skipped = True
+                return
+
+            start = time.perf_counter()
+            await publisher.add_directory(content.entries, expected_cid=content.cid)
+            result.upload_seconds = time.perf_counter() - start
+        except Exception as e:  # pylint: disable=broad-except
+            result.error = str(e) or type(e).__name__
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        async with AsyncIPFSPublisher(nodes, concurrency=concurrency) as publisher:
+            await asyncio.gather(*(_publish(result, executor) for result in results))
+
+    if index_path is not None:
+        _save_pushed(index_path, nodes_key, {**pushed, **{result.package_id: result.cid for result in results if result.ok}})
+    return results
+
+
+def publish_packages(
+    packages_dir: Path,
+    ipfs_node: Union[str, Sequence[str]],
+    cache_dir: Optional[Path] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    jobs: int = DEFAULT_JOBS,
+    force: bool = False,
+) -> List[PackagePublishResult]:
+    """Publish the development packages of packages.json and return one result per package."""
+    return asyncio.run(
+        publish_packages_async(
+            packages_dir, ipfs_node, cache_dir=cache_dir, concurrency=concurrency, jobs=jobs, force=force
+        )
+    )
@@ -34,8 +34,9 @@ from operate.quickstart.run_service import ask_password_if_needed, run_service
 
 from mtd.context import MtdContext
 from mtd.resources import read_text_resource
-from mtd.services.metadata.generate import generate_metadata
-from mtd.services.metadata.publish import publish_metadata_to_ipfs
+from mtd.services.metadata.generate import build_metadata
+from mtd.services.metadata.ledger import PublishLedger
+from mtd.services.metadata.publish import publish_metadata
 from mtd.services.metadata.update_onchain import update_metadata_onchain
 
 
@@ -333,8 +334,22 @@ def _setup_private_keys(context: MtdContext) -> None:
             _create_private_key_files(data=data, context=context)
 
 
-def run_setup(chain_config: str, context: MtdContext) -> None:
-    """Run the full setup flow for the given chain and workspace context."""
+def run_setup(  # pylint: disable=too-many-arguments
+    chain_config: str,
+    context: MtdContext,
+    jobs: int = 1,
+    force_upload: bool = False,
+    wait: bool = True,
+    force_update: bool = False,
+) -> None:
+    """Run the full setup flow for the given chain and workspace context.
+
+    Metadata is only uploaded to IPFS when its hash differs from the
+    METADATA_HASH already in the workspace .env, unless `force_upload` is set.
+    Without `wait`, the on-chain update is only submitted and recorded as
+    pending in the workspace ledger. With `force_update`, it is submitted
+    even while an earlier one is still pending.
+    """
     config_path = context.config_dir / f"config_mech_{chain_config}.json"
     if not config_path.exists():
         raise click.ClickException(f"Missing template config: {config_path}")
@@ -375,17 +390,35 @@ def run_setup(chain_config: str, context: MtdContext) -> None:
         _setup_private_keys(context=context)
 
         click.echo("Generating metadata...")
-        generate_metadata(packages_dir=context.packages_dir, metadata_path=context.metadata_path)
+        metadata = build_metadata(packages_dir=context.packages_dir, jobs=jobs)
 
         click.echo("Publishing metadata to IPFS...")
-        metadata_hash = publish_metadata_to_ipfs(metadata_path=context.metadata_path)
+        ledger = PublishLedger(context.ledger_path)
+        current_hash = None if force_upload else dotenv_values(context.env_path).get("METADATA_HASH")
+        metadata_hash = publish_metadata(
+            metadata=metadata,
+            metadata_path=context.metadata_path,
+            current_hash=current_hash,
+            ledger=ledger,
+        )
+        if metadata_hash == current_hash:
+            click.echo("Metadata unchanged, skipped upload.")
         set_key(str(context.env_path), "METADATA_HASH", metadata_hash)
 
         click.echo("Updating metadata hash on-chain...")
         success, tx_hash = update_metadata_onchain(
             env_path=context.env_path,
             private_key_path=context.keys_dir / AGENT_KEY,
+            ledger=ledger,
+            wait=wait,
+            rpc_scores_path=context.rpc_scores_path,
+            force=force_update,
         )
-        click.echo(f"Metadata update status: success={success}, tx_hash={tx_hash}")
+        if tx_hash is None:
+            click.echo("On-chain metadata hash unchanged, skipped transaction.")
+        elif not wait:
+            click.echo(f"Metadata update submitted: tx_hash={tx_hash}. Collect the receipt with: mech tx wait")
+        else:
+            click.echo(f"Metadata update status: success={success}, tx_hash={tx_hash}")
 
         click.echo("Setup complete.")
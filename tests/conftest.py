@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+"""Shared test fixtures."""
+
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import pytest
+
+from mtd.services.ipfs import LocalIPFSServer
+
+
+SAFE_VERSION_SELECTOR = "0xffa1ad74"
+SAFE_NONCE_SELECTOR = "0xaffed0e0"
+SAFE_OWNERS_SELECTOR = "0xa0e67e2b"
+SAFE_THRESHOLD_SELECTOR = "0xe75235b8"
+SAFE_OWNER = "0x19E7E376E7C213B7E7e7e46cc70A5dD086DAff2A"
+TX_HASH = "0x" + "ab" * 32
+
+
+def _word(value: int) -> str:
+    """Encode an integer as a 32-byte ABI word."""
+    return "0x" + format(value, "064x")
+
+
+class FakeRPCNode:
+    """JSON-RPC node answering the calls of a Safe metadata update with canned results.
+
+    The Safe is owned by SAFE_OWNER alone. Counts the HTTP connections, the
+    HTTP requests and the calls per method. Batch requests are rejected
+    unless `batching` is set, or answered with the HTTP status and body of
+    `batch_reply` if given.
+    """
+
+    def __init__(self, batching: bool = True, batch_reply: Optional[Tuple[int, Any]] = None) -> None:
+        """Initialize the node."""
+        self.batching = batching
+        self.batch_reply = batch_reply
+        self.connections = 0
+        self.requests = 0
+        self.methods: Counter = Counter()
+        node = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                node.connections += 1
+                super().setup()
+
+            def log_message(self, *_: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:  # pylint: disable=invalid-name
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                node.requests += 1
+                status = 200
+                result: Any = None
+                if isinstance(body, list) and node.batch_reply:
+                    status, result = node.batch_reply
+                elif isinstance(body, list):
+                    result = [node.answer(call) for call in body] if node.batching else node.reject_batch()
+                else:
+                    result = node.answer(body)
+                data = json.dumps(result).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def answer(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one JSON-RPC call."""
+        method = call["method"]
+        self.methods[method] += 1
+        results: Dict[str, Any] = {
+            "eth_chainId": "0x64",
+            "eth_estimateGas": hex(50000),
+            "eth_gasPrice": hex(10**9),
+            "eth_getTransactionCount": "0x3",
+            "eth_sendRawTransaction": TX_HASH,
+            "eth_feeHistory": {
+                "oldestBlock": "0x1",
+                "baseFeePerGas": [hex(10**9)] * 11,
+                "gasUsedRatio": [0.5] * 10,
+                "reward": [[hex(10**9)]] * 10,
+            },
+            "eth_getTransactionReceipt": {
+                "status": "0x1",
+                "transactionHash": TX_HASH,
+                "gasUsed": hex(45000),
+                "blockNumber": "0x10",
+                "effectiveGasPrice": hex(10**9),
+                "logs": [],
+            },
+        }
+        if method == "eth_call":
+            selector = call["params"][0]["data"][:10]
+            if selector == SAFE_VERSION_SELECTOR:
+                version = b"1.3.0"
+                result = _word(32) + _word(len(version))[2:] + version.hex().ljust(64, "0")
+            elif selector == SAFE_OWNERS_SELECTOR:
+                result = _word(32) + _word(1)[2:] + _word(int(SAFE_OWNER, 16))[2:]
+            elif selector == SAFE_THRESHOLD_SELECTOR:
+                result = _word(1)
+            else:
+                result = _word(7 if selector == SAFE_NONCE_SELECTOR else 0)
+        else:
+            result = results[method]
+        return {"jsonrpc": "2.0", "id": call["id"], "result": result}
+
+    @staticmethod
+    def reject_batch() -> Dict[str, Any]:
+        """Answer a batch request as nodes without batch support do."""
+        return {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "batch requests are not supported"}}
+
+    def __enter__(self) -> "FakeRPCNode":
+        """Start serving."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def ipfs_node() -> Iterator[LocalIPFSServer]:
+    """Local IPFS HTTP API node backed by an in-memory blockstore."""
+    with LocalIPFSServer() as node:
+        yield node
+
+
+@pytest.fixture
+def rpc_node() -> Iterator[FakeRPCNode]:
+    """Local JSON-RPC node answering the calls of a Safe metadata update."""
+    with FakeRPCNode() as node:
+        yield node
@@ -38,6 +38,9 @@ class TestCli:
         assert "stop" in result.output
         assert "push-metadata" in result.output
         assert "update-metadata" in result.output
+        assert "metadata" in result.output
+        assert "ipfs" in result.output
+        assert "tx" in result.output
 
     def test_no_workspace_option(self) -> None:
         """CLI help should not expose workspace override option."""
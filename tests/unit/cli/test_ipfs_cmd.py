@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+"""Tests for ipfs command group."""
+
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from click.testing import CliRunner
+
+from mtd.commands.ipfs_cmd import ipfs
+
+
+MOCK_PATH = "mtd.commands.ipfs_cmd"
+
+
+class TestIPFSServeCommand:
+    """Tests for ipfs serve command."""
+
+    @patch(f"{MOCK_PATH}.serve_ipfs")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_serve_uses_workspace_cache(
+        self, mock_get_context: MagicMock, mock_serve: MagicMock, tmp_path: Path
+    ) -> None:
+        """Serve should store blocks in the workspace cache by default."""
+        mock_get_context.return_value.cache_dir = tmp_path / ".mech_cache"
+
+        result = CliRunner().invoke(ipfs, ["serve", "--port", "5002", "--latency", "0.1"], obj={})
+
+        assert result.exit_code == 0, result.output
+        blockstore = mock_serve.call_args.args[0]
+        assert blockstore.path == tmp_path / ".mech_cache" / "ipfs"
+        assert mock_serve.call_args.kwargs == {"host": "127.0.0.1", "port": 5002, "latency": 0.1, "jitter": 0.0}
+        assert "/ip4/127.0.0.1/tcp/5002/http" in result.output
+
+    @patch(f"{MOCK_PATH}.serve_ipfs")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_serve_in_memory(self, mock_get_context: MagicMock, mock_serve: MagicMock) -> None:
+        """Serve should not touch the workspace when blocks are kept in memory."""
+        result = CliRunner().invoke(ipfs, ["serve", "--in-memory"], obj={})
+
+        assert result.exit_code == 0, result.output
+        assert mock_serve.call_args.args[0].path is None
+        mock_get_context.assert_not_called()
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+"""Tests for metadata command group."""
+
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from click.testing import CliRunner
+
+from mtd.commands.metadata_cmd import metadata
+from mtd.services.metadata.fetch import CACHE_SOURCE, FetchedMetadata
+from mtd.services.metadata.ledger import OBSERVED_TX_HASH, PublishLedger
+from mtd.services.metadata.watch import MetadataUpdate
+
+
+MOCK_PATH = "mtd.commands.metadata_cmd"
+
+
+class TestMetadataWatchCommand:
+    """Tests for metadata watch command."""
+
+    @patch(f"{MOCK_PATH}.PublishLedger")
+    @patch(f"{MOCK_PATH}.set_key")
+    @patch(f"{MOCK_PATH}.publish_metadata", return_value="f01701220abc")
+    @patch(f"{MOCK_PATH}.MetadataWatcher")
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_watch_reports_updates(
+        self,
+        mock_get_context: MagicMock,
+        mock_require_initialized: MagicMock,
+        mock_watcher_cls: MagicMock,
+        mock_publish: MagicMock,
+        mock_set_key: MagicMock,
+        mock_ledger_cls: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """Watch should report rescans and validation errors, publishing only valid documents."""
+        context = MagicMock()
+        context.packages_dir = tmp_path / "packages"
+        context.metadata_path = tmp_path / "metadata.json"
+        context.env_path = tmp_path / ".env"
+        mock_get_context.return_value = context
+
+        def _watch(on_update: Any, **_: Any) -> None:
+            on_update(
+                MetadataUpdate(
+                    rescanned=["alice/customs/bad"],
+                    metadata={},
+                    error="Missing key in metadata json: 'name'",
+                    import_errors={"alice/customs/bad": "timed out"},
+                )
+            )
+            on_update(MetadataUpdate(rescanned=["alice/customs/echo"], metadata={"tools": ["echo"]}))
+            raise KeyboardInterrupt
+
+        mock_watcher_cls.return_value.watch.side_effect = _watch
+
+        runner = CliRunner(mix_stderr=False)
+        result = runner.invoke(metadata, ["watch", "--publish", "--poll"])
+
+        assert result.exit_code == 0
+        mock_require_initialized.assert_called_once_with(context)
+        assert "Skipped alice/customs/bad: timed out" in result.stderr
+        assert "Invalid metadata: Missing key in metadata json: 'name'" in result.stderr
+        assert "(1 tools)" in result.output
+        assert "Stopped watching." in result.output
+        mock_publish.assert_called_once_with(
+            metadata={"tools": ["echo"]},
+            ipfs_node=("/dns/registry.autonolas.tech/tcp/443/https",),
+            ledger=mock_ledger_cls.return_value,
+        )
+        mock_set_key.assert_called_once_with(str(context.env_path), "METADATA_HASH", "f01701220abc")
+        assert mock_watcher_cls.return_value.watch.call_args.kwargs["poll"] is True
+
+    def test_watch_help(self) -> None:
+        """Test metadata watch help output."""
+        runner = CliRunner()
+        result = runner.invoke(metadata, ["watch", "--help"])
+
+        assert result.exit_code == 0
+        assert "Regenerate and validate metadata" in result.output
+
+
+class TestMetadataShowCommand:
+    """Tests for metadata show command."""
+
+    @patch(f"{MOCK_PATH}.fetch_metadata")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_show_defaults_to_workspace_hash(
+        self, mock_get_context: MagicMock, mock_fetch: MagicMock, tmp_path: Path
+    ) -> None:
+        """Show should fetch the METADATA_HASH of the workspace and print the document."""
+        context = MagicMock()
+        context.env_path = tmp_path / ".env"
+        context.env_path.write_text("METADATA_HASH=f01701220abc\n", encoding="utf-8")
+        context.cache_dir = tmp_path / ".mech_cache"
+        mock_get_context.return_value = context
+        mock_fetch.return_value = ({"name": "mech"}, FetchedMetadata(cid="Qmabc", content=b"", source=CACHE_SOURCE))
+
+        runner = CliRunner(mix_stderr=False)
+        result = runner.invoke(metadata, ["show", "--source", "https://gateway.example"])
+
+        assert result.exit_code == 0, result.output
+        assert '"name": "mech"' in result.output
+        assert "Loaded Qmabc from the local cache." in result.stderr
+        mock_fetch.assert_called_once_with(
+            "f01701220abc", cache_dir=context.cache_dir, sources=("https://gateway.example",)
+        )
+
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_show_requires_hash(self, mock_get_context: MagicMock, tmp_path: Path) -> None:
+        """Show should fail when no hash is given or recorded."""
+        mock_get_context.return_value.env_path = tmp_path / ".env"
+
+        result = CliRunner().invoke(metadata, ["show"])
+
+        assert result.exit_code != 0
+        assert "Pass --hash" in result.output
+
+
+class TestMetadataDiffCommand:
+    """Tests for metadata diff command."""
+
+    @patch(f"{MOCK_PATH}.ToolsCache")
+    @patch(f"{MOCK_PATH}.build_metadata")
+    @patch(f"{MOCK_PATH}.fetch_metadata")
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_diff_exit_status(  # pylint: disable=too-many-arguments
+        self,
+        mock_get_context: MagicMock,
+        mock_require_initialized: MagicMock,
+        mock_fetch: MagicMock,
+        mock_build: MagicMock,
+        mock_cache_cls: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """Diff should exit with 1 when the generated metadata differs and 2 on errors."""
+        context = MagicMock()
+        context.env_path = tmp_path / ".env"
+        mock_get_context.return_value = context
+        published = {"name": "mech", "tools": ["echo"], "toolMetadata": {"echo": {"name": "Echo"}}}
+        mock_fetch.return_value = (published, FetchedMetadata(cid="Qmabc", content=b"", source="https://gw"))
+        runner = CliRunner(mix_stderr=False)
+
+        mock_build.return_value = published
+        result = runner.invoke(metadata, ["diff", "--hash", "f01701220abc"])
+        assert result.exit_code == 0, result.output
+        assert result.output == "No changes.\n"
+        assert "Fetched Qmabc from https://gw and verified it." in result.stderr
+        mock_require_initialized.assert_called_once_with(context)
+        assert mock_build.call_args.kwargs["cache"] is mock_cache_cls.return_value
+
+        mock_build.return_value = {"name": "mech", "tools": ["echo"], "toolMetadata": {"echo": {"name": "Echo 2"}}}
+        result = runner.invoke(metadata, ["diff", "--hash", "f01701220abc"])
+        assert result.exit_code == 1
+        assert '~ $.toolMetadata.echo.name: "Echo" -> "Echo 2"' in result.output
+
+        mock_fetch.side_effect = RuntimeError("No source returned f01701220abc")
+        result = runner.invoke(metadata, ["diff", "--hash", "f01701220abc"])
+        assert result.exit_code == 2
+        assert "No source returned f01701220abc" in result.stderr
+
+        mock_fetch.side_effect = None
+        mock_build.side_effect = FileNotFoundError("No packages directory")
+        result = runner.invoke(metadata, ["diff", "--hash", "f01701220abc"])
+        assert result.exit_code == 2
+        assert "No packages directory" in result.stderr
+
+
+class TestMetadataLedgerCommands:
+    """Tests for metadata history and rollback commands."""
+
+    @staticmethod
+    def _context(tmp_path: Path) -> MagicMock:
+        """Build a context with a ledger holding two updates on gnosis."""
+        context = MagicMock()
+        context.env_path = tmp_path / ".env"
+        context.env_path.write_text("DEFAULT_CHAIN_ID=gnosis\nMETADATA_HASH=f01701220new\n", encoding="utf-8")
+        context.keys_dir = tmp_path / "keys"
+        context.ledger_path = tmp_path / "ledger.db"
+        ledger = PublishLedger(context.ledger_path)
+        ledger.record_generation("f01701220old", tool_count=3, size=1024)
+        ledger.record_update("gnosis", "f01701220old", "0xold", True, gas_used=45000, block_number=10)
+        ledger.record_update("gnosis", "f01701220new", "0xnew", True, gas_used=46000, block_number=20)
+        return context
+
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_history(self, mock_get_context: MagicMock, tmp_path: Path) -> None:
+        """History should list the live hash and the updates of each chain, newest first."""
+        context = self._context(tmp_path)
+        PublishLedger(context.ledger_path).record_update("base", "f01701220new", OBSERVED_TX_HASH, True)
+        mock_get_context.return_value = context
+
+        result = CliRunner().invoke(metadata, ["history", "--chain", "Gnosis"])
+
+        assert result.exit_code == 0, result.output
+        lines = result.output.splitlines()
+        assert lines[0] == "gnosis: live f01701220new"
+        assert "f01701220new  ok  tx 0xnew, block 20, gas 46000" in lines[1]
+        assert "f01701220old  ok  tx 0xold, block 10, gas 45000" in lines[2]
+        assert lines[3].strip() == "3 tool(s), 1024 bytes"
+
+        result = CliRunner().invoke(metadata, ["history", "--chain", "base"])
+        assert "f01701220new  ok  observed on chain" in result.output
+
+    @patch(f"{MOCK_PATH}.update_metadata_onchain", return_value=(True, "0xrollback"))
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_rollback(
+        self,
+        mock_get_context: MagicMock,
+        _mock_require_initialized: MagicMock,
+        mock_update: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """Rollback should set the previous hash in .env and update it on-chain once confirmed."""
+        context = self._context(tmp_path)
+        mock_get_context.return_value = context
+        runner = CliRunner()
+
+        result = runner.invoke(metadata, ["rollback"], input="n\n")
+        assert result.exit_code == 1
+        mock_update.assert_not_called()
+
+        result = runner.invoke(metadata, ["rollback", "--yes"])
+        assert result.exit_code == 0, result.output
+        assert "Rolling back to: f01701220old" in result.output
+        assert "METADATA_HASH='f01701220old'" in context.env_path.read_text(encoding="utf-8")
+        assert mock_update.call_args.kwargs["env_path"] == context.env_path
+        assert mock_update.call_args.kwargs["ledger"].path == context.ledger_path
+
+    @patch(f"{MOCK_PATH}.update_metadata_onchain", side_effect=RuntimeError("send failed"))
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_rollback_restores_hash_on_error(
+        self,
+        mock_get_context: MagicMock,
+        _mock_require_initialized: MagicMock,
+        _mock_update: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """Rollback should restore the live hash in .env when the update raises."""
+        context = self._context(tmp_path)
+        mock_get_context.return_value = context
+
+        result = CliRunner().invoke(metadata, ["rollback", "--yes"])
+
+        assert result.exit_code == 1
+        assert isinstance(result.exception, RuntimeError)
+        assert "METADATA_HASH='f01701220new'" in context.env_path.read_text(encoding="utf-8")
+
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_rollback_requires_history(
+        self, mock_get_context: MagicMock, _mock_require_initialized: MagicMock, tmp_path: Path
+    ) -> None:
+        """Rollback should fail when no earlier hash was set on the chain."""
+        context = self._context(tmp_path)
+        context.env_path.write_text("DEFAULT_CHAIN_ID=base\n", encoding="utf-8")
+        mock_get_context.return_value = context
+
+        result = CliRunner().invoke(metadata, ["rollback", "--yes"])
+
+        assert result.exit_code != 0
+        assert "No earlier metadata hash recorded on base." in result.output
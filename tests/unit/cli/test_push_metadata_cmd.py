@@ -32,18 +32,22 @@ MOCK_PATH = "mtd.commands.push_metadata_cmd"
 class TestPushMetadataCommand:
     """Tests for push-metadata command."""
 
+    @patch(f"{MOCK_PATH}.PublishLedger")
     @patch(f"{MOCK_PATH}.set_key")
-    @patch(f"{MOCK_PATH}.publish_metadata_to_ipfs", return_value="f0170abc")
-    @patch(f"{MOCK_PATH}.generate_metadata")
+    @patch(f"{MOCK_PATH}.publish_metadata", return_value="f0170abc")
+    @patch(f"{MOCK_PATH}.build_metadata")
+    @patch(f"{MOCK_PATH}.ToolsCache")
     @patch(f"{MOCK_PATH}.require_initialized")
     @patch(f"{MOCK_PATH}.get_mtd_context")
     def test_push_metadata_success(
         self,
         mock_get_context: MagicMock,
         mock_require_initialized: MagicMock,
-        mock_generate: MagicMock,
+        mock_cache_cls: MagicMock,
+        mock_build: MagicMock,
         mock_publish: MagicMock,
         mock_set_key: MagicMock,
+        mock_ledger_cls: MagicMock,
         tmp_path: Path,
     ) -> None:
         """Test successful push-metadata."""
@@ -52,15 +56,124 @@ class TestPushMetadataCommand:
         context.metadata_path = tmp_path / "metadata.json"
         context.env_path = tmp_path / ".env"
         mock_get_context.return_value = context
+        mock_cache_cls.return_value.hits = ["valory/customs/echo"]
+        mock_cache_cls.return_value.misses = []
 
         runner = CliRunner()
         result = runner.invoke(push_metadata, [])
 
         assert result.exit_code == 0
+        assert "Metadata cache: 1 hit(s), 0 miss(es)." in result.output
         mock_require_initialized.assert_called_once_with(context)
-        mock_generate.assert_called_once_with(
+        mock_cache_cls.assert_called_once_with(context.cache_dir)
+        mock_ledger_cls.assert_called_once_with(context.ledger_path)
+        mock_build.assert_called_once_with(
             packages_dir=context.packages_dir,
+            cache=mock_cache_cls.return_value,
+            jobs=1,
+            import_timeout=60.0,
+            import_memory_limit=4096,
+            compact=False,
+        )
+        mock_publish.assert_called_once_with(
+            metadata=mock_build.return_value,
+            ipfs_node=("/dns/registry.autonolas.tech/tcp/443/https",),
             metadata_path=context.metadata_path,
+            current_hash=None,
+            ledger=mock_ledger_cls.return_value,
         )
-        mock_publish.assert_called_once()
         mock_set_key.assert_called_once_with(str(context.env_path), "METADATA_HASH", "f0170abc")
+
+    @patch(f"{MOCK_PATH}.PublishLedger")
+    @patch(f"{MOCK_PATH}.set_key")
+    @patch(f"{MOCK_PATH}.publish_metadata", return_value="f0170abc")
+    @patch(f"{MOCK_PATH}.build_metadata")
+    @patch(f"{MOCK_PATH}.ToolsCache")
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_push_metadata_options(
+        self,
+        mock_get_context: MagicMock,
+        _mock_require_initialized: MagicMock,
+        mock_cache_cls: MagicMock,
+        mock_build: MagicMock,
+        _mock_publish: MagicMock,
+        _mock_set_key: MagicMock,
+        _mock_ledger_cls: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """Test push-metadata with the cache disabled and custom scan options."""
+        context = MagicMock()
+        context.packages_dir = tmp_path / "packages"
+        context.metadata_path = tmp_path / "metadata.json"
+        mock_get_context.return_value = context
+
+        runner = CliRunner()
+        result = runner.invoke(
+            push_metadata,
+            [
+                "--no-cache",
+                "--jobs",
+                "4",
+                "--import-timeout",
+                "5",
+                "--import-memory-limit",
+                "0",
+                "--compact",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert "Metadata cache" not in result.output
+        mock_cache_cls.assert_not_called()
+        mock_build.assert_called_once_with(
+            packages_dir=context.packages_dir,
+            cache=None,
+            jobs=4,
+            import_timeout=5.0,
+            import_memory_limit=0,
+            compact=True,
+        )
+
+    @patch(f"{MOCK_PATH}.PublishLedger")
+    @patch(f"{MOCK_PATH}.set_key")
+    @patch(f"{MOCK_PATH}.publish_metadata", return_value="f01701220same")
+    @patch(f"{MOCK_PATH}.build_metadata")
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_push_metadata_skips_unchanged_upload(
+        self,
+        mock_get_context: MagicMock,
+        _mock_require_initialized: MagicMock,
+        mock_build: MagicMock,
+        mock_publish: MagicMock,
+        _mock_set_key: MagicMock,
+        mock_ledger_cls: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """Test push-metadata passes the current hash unless --force-upload is given."""
+        context = MagicMock()
+        context.metadata_path = tmp_path / "metadata.json"
+        context.env_path = tmp_path / ".env"
+        context.env_path.write_text("METADATA_HASH=f01701220same\n", encoding="utf-8")
+        mock_get_context.return_value = context
+
+        runner = CliRunner()
+        result = runner.invoke(push_metadata, ["--no-cache"])
+
+        assert result.exit_code == 0
+        assert "Metadata unchanged, skipped upload." in result.output
+        assert mock_publish.call_args.kwargs["current_hash"] == "f01701220same"
+
+        mock_publish.reset_mock()
+        result = runner.invoke(push_metadata, ["--no-cache", "--force-upload"])
+
+        assert result.exit_code == 0
+        assert "Metadata unchanged" not in result.output
+        mock_publish.assert_called_once_with(
+            metadata=mock_build.return_value,
+            ipfs_node=("/dns/registry.autonolas.tech/tcp/443/https",),
+            metadata_path=context.metadata_path,
+            current_hash=None,
+            ledger=mock_ledger_cls.return_value,
+        )
@@ -18,12 +18,16 @@
 # ------------------------------------------------------------------------------
 """Tests for run command."""
 
+import json
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import click
+import pytest
 from click.testing import CliRunner
 
-from mtd.commands.run_cmd import run
+from mtd.commands.run_cmd import _push_all_packages, run
+from mtd.services.ipfs import LocalIPFSServer
 
 
 MOCK_PATH = "mtd.commands.run_cmd"
@@ -91,3 +95,42 @@ class TestRunCommand:
         assert result.exit_code == 0
         mock_require_initialized.assert_called_once_with(context)
         mock_dev_mode.assert_called_once()
+        assert mock_dev_mode.call_args.kwargs["force_push"] is False
+
+        result = runner.invoke(run, ["-c", "gnosis", "--dev", "--force-push"])
+        assert result.exit_code == 0
+        assert mock_dev_mode.call_args.kwargs["force_push"] is True
+
+
+def test_push_all_packages_reports_results(
+    tmp_path: Path, ipfs_node: LocalIPFSServer, capsys: pytest.CaptureFixture
+) -> None:
+    """Pushing packages should report each package and skip unchanged ones on the next run."""
+    packages_dir = tmp_path / "packages"
+    tool_dir = packages_dir / "alice" / "customs" / "echo"
+    tool_dir.mkdir(parents=True)
+    (tool_dir / "component.yaml").write_text("name: echo\n", encoding="utf-8")
+    (packages_dir / "packages.json").write_text(
+        json.dumps({"dev": {"custom/alice/echo/0.1.0": "bafybeistale"}, "third_party": {}}), encoding="utf-8"
+    )
+    context = MagicMock()
+    context.packages_dir = packages_dir
+    context.cache_dir = tmp_path / ".mech_cache"
+
+    _push_all_packages(context=context, ipfs_node=(ipfs_node.addr,))
+    output = capsys.readouterr()
+    assert "pushed    custom/alice/echo/0.1.0" in output.out
+    assert "does not match its hash in packages.json" in output.err
+    assert len(ipfs_node.blockstore.pins) == 1
+
+    _push_all_packages(context=context, ipfs_node=(ipfs_node.addr,))
+    assert "unchanged custom/alice/echo/0.1.0" in capsys.readouterr().out
+
+    _push_all_packages(context=context, ipfs_node=(ipfs_node.addr,), force=True)
+    assert "pushed    custom/alice/echo/0.1.0" in capsys.readouterr().out
+
+    (tool_dir / "component.yaml").write_text("name: echo\nversion: 2\n", encoding="utf-8")
+    with patch("mtd.services.metadata.ipfs.AsyncIPFSPublisher._delay", return_value=0), pytest.raises(
+        click.ClickException, match="custom/alice/echo/0.1.0"
+    ):
+        _push_all_packages(context=context, ipfs_node=("/ip4/127.0.0.1/tcp/1/http",))
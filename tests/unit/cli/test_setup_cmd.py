@@ -50,7 +50,9 @@ class TestSetupCommand:
 
         assert result.exit_code == 0
         mock_initialize_workspace.assert_not_called()
-        mock_run_setup.assert_called_once_with(chain_config="gnosis", context=context)
+        mock_run_setup.assert_called_once_with(
+            chain_config="gnosis", context=context, jobs=1, force_upload=False, wait=True, force_update=False
+        )
 
     @patch(f"{MOD}.run_setup")
     @patch(f"{MOD}.initialize_workspace")
@@ -72,7 +74,33 @@ class TestSetupCommand:
         assert result.exit_code == 0
         assert "Workspace not initialized" in result.output
         mock_initialize_workspace.assert_called_once_with(context=context, force=False)
-        mock_run_setup.assert_called_once_with(chain_config="gnosis", context=context)
+        mock_run_setup.assert_called_once_with(
+            chain_config="gnosis", context=context, jobs=1, force_upload=False, wait=True, force_update=False
+        )
+
+    @patch(f"{MOD}.run_setup")
+    @patch(f"{MOD}.initialize_workspace")
+    @patch(f"{MOD}.get_mtd_context")
+    def test_setup_passes_jobs(
+        self,
+        mock_get_context: MagicMock,
+        _mock_initialize_workspace: MagicMock,
+        mock_run_setup: MagicMock,
+    ) -> None:
+        """Setup should forward the metadata scan job count, upload flag, wait mode and update flag."""
+        context = MagicMock()
+        context.is_initialized.return_value = True
+        mock_get_context.return_value = context
+
+        runner = CliRunner()
+        result = runner.invoke(
+            setup_command, ["-c", "gnosis", "--jobs", "4", "--force-upload", "--no-wait", "--force-update"]
+        )
+
+        assert result.exit_code == 0
+        mock_run_setup.assert_called_once_with(
+            chain_config="gnosis", context=context, jobs=4, force_upload=True, wait=False, force_update=True
+        )
 
     def test_setup_missing_chain_config(self) -> None:
         """Test setup without required chain-config option."""
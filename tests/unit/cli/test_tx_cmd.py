@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+"""Tests for tx command group."""
+
+from pathlib import Path
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+from click.testing import CliRunner
+
+from mtd.commands.tx_cmd import tx
+from mtd.services.metadata.ledger import PublishLedger
+
+
+MOCK_PATH = "mtd.commands.tx_cmd"
+RECEIPT = {"status": 1, "gasUsed": 45000, "blockNumber": 123, "effectiveGasPrice": 2_000_000_000}
+
+
+def _receipt(_web3_client: MagicMock, tx_hash: str) -> Optional[dict]:
+    """Get a receipt for 0xmined only."""
+    return RECEIPT if tx_hash == "0xmined" else None
+
+
+class TestTxCommands:
+    """Tests for tx status, wait and clear commands."""
+
+    @staticmethod
+    def _context(tmp_path: Path) -> MagicMock:
+        """Build a context with a ledger holding two pending updates on gnosis."""
+        context = MagicMock()
+        context.env_path = tmp_path / ".env"
+        context.env_path.write_text("GNOSIS_LEDGER_RPC_0=http://localhost:8545\n", encoding="utf-8")
+        context.ledger_path = tmp_path / "ledger.db"
+        ledger = PublishLedger(context.ledger_path)
+        ledger.record_pending("gnosis", "f01701220new", "0xmined", gas_estimate=50000)
+        ledger.record_pending("gnosis", "f01701220new", "0xpending", gas_estimate=50000)
+        return context
+
+    @patch("mtd.services.chain.receipts.get_receipt", side_effect=_receipt)
+    @patch(f"{MOCK_PATH}.get_receipt", side_effect=_receipt)
+    @patch(f"{MOCK_PATH}.get_ethereum_client")
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_status(
+        self,
+        mock_get_context: MagicMock,
+        _mock_require_initialized: MagicMock,
+        mock_get_client: MagicMock,
+        _mock_get_receipt: MagicMock,
+        _mock_wait_receipt: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """Status should move mined updates to the ledger and list the rest as pending."""
+        context = self._context(tmp_path)
+        mock_get_context.return_value = context
+
+        result = CliRunner().invoke(tx, ["status"])
+
+        assert result.exit_code == 0, result.output
+        assert "mined    gnosis  0xmined  block 123, gas 45000" in result.output
+        assert "pending  gnosis  0xpending" in result.output
+        mock_get_client.assert_called_once_with(["http://localhost:8545"], context.rpc_scores_path)
+        ledger = PublishLedger(context.ledger_path)
+        live = ledger.live("gnosis")
+        assert live is not None
+        assert (live.tx_hash, live.gas_used, live.gas_estimate) == ("0xmined", 45000, 50000)
+        assert [pending.tx_hash for pending in ledger.pending()] == ["0xpending"]
+
+    @patch("mtd.services.chain.receipts.get_receipt", side_effect=_receipt)
+    @patch(f"{MOCK_PATH}.get_ethereum_client")
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_wait_times_out(
+        self,
+        mock_get_context: MagicMock,
+        _mock_require_initialized: MagicMock,
+        _mock_get_client: MagicMock,
+        _mock_get_receipt: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """Wait should record the receipts that arrive and fail while transactions are still pending."""
+        mock_get_context.return_value = self._context(tmp_path)
+
+        result = CliRunner().invoke(tx, ["wait", "--timeout", "0"])
+
+        assert result.exit_code == 1
+        assert "Waiting for 2 transaction(s) on gnosis..." in result.output
+        assert "1 mined, 0 failed, 1 still pending." in result.output
+
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_clear(self, mock_get_context: MagicMock, _mock_require_initialized: MagicMock, tmp_path: Path) -> None:
+        """Clear should drop the given pending updates, or all of them, without querying the chain."""
+        context = self._context(tmp_path)
+        mock_get_context.return_value = context
+        runner = CliRunner()
+
+        result = runner.invoke(tx, ["clear", "0xunknown"])
+        assert result.exit_code == 1
+        assert "Not pending: 0xunknown" in result.output
+
+        result = runner.invoke(tx, ["clear", "0xpending"])
+        assert result.exit_code == 0, result.output
+        assert "cleared  gnosis  0xpending" in result.output
+        assert [pending.tx_hash for pending in PublishLedger(context.ledger_path).pending()] == ["0xmined"]
+
+        result = runner.invoke(tx, ["clear", "--chain", "gnosis"])
+        assert "cleared  gnosis  0xmined" in result.output
+        assert PublishLedger(context.ledger_path).pending() == []
+        assert runner.invoke(tx, ["clear"]).output == "No pending transactions.\n"
+
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_no_pending(
+        self, mock_get_context: MagicMock, _mock_require_initialized: MagicMock, tmp_path: Path
+    ) -> None:
+        """Status and wait should report when nothing is pending."""
+        context = MagicMock()
+        context.ledger_path = tmp_path / "ledger.db"
+        mock_get_context.return_value = context
+
+        for command in ("status", "wait"):
+            result = CliRunner().invoke(tx, [command])
+            assert result.exit_code == 0
+            assert "No pending transactions." in result.output
@@ -32,6 +32,7 @@ MOCK_PATH = "mtd.commands.update_metadata_cmd"
 class TestUpdateMetadataCommand:
     """Tests for update-metadata command."""
 
+    @patch(f"{MOCK_PATH}.PublishLedger")
     @patch(f"{MOCK_PATH}.update_metadata_onchain", return_value=(True, "0xtx"))
     @patch(f"{MOCK_PATH}.require_initialized")
     @patch(f"{MOCK_PATH}.get_mtd_context")
@@ -40,6 +41,7 @@ class TestUpdateMetadataCommand:
         mock_get_context: MagicMock,
         mock_require_initialized: MagicMock,
         mock_update: MagicMock,
+        mock_ledger_cls: MagicMock,
         tmp_path: Path,
     ) -> None:
         """Test successful update-metadata."""
@@ -56,7 +58,52 @@ class TestUpdateMetadataCommand:
         mock_update.assert_called_once_with(
             env_path=context.env_path,
             private_key_path=context.keys_dir / "ethereum_private_key.txt",
+            ledger=mock_ledger_cls.return_value,
+            wait=True,
+            timeout=120.0,
+            rpc_scores_path=context.rpc_scores_path,
+            force=False,
         )
+        mock_ledger_cls.assert_called_once_with(context.ledger_path)
+
+    @patch(f"{MOCK_PATH}.PublishLedger")
+    @patch(f"{MOCK_PATH}.update_metadata_onchain", return_value=(True, None))
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_update_metadata_unchanged(
+        self,
+        _mock_get_context: MagicMock,
+        _mock_require_initialized: MagicMock,
+        _mock_update: MagicMock,
+        _mock_ledger_cls: MagicMock,
+    ) -> None:
+        """Test update-metadata reports when the on-chain hash already matches."""
+        runner = CliRunner()
+        result = runner.invoke(update_metadata, [])
+
+        assert result.exit_code == 0
+        assert "On-chain metadata hash unchanged, skipped transaction." in result.output
+        assert "Tx Hash" not in result.output
+
+    @patch(f"{MOCK_PATH}.PublishLedger")
+    @patch(f"{MOCK_PATH}.update_metadata_onchain", return_value=(True, "0xtx"))
+    @patch(f"{MOCK_PATH}.require_initialized")
+    @patch(f"{MOCK_PATH}.get_mtd_context")
+    def test_update_metadata_no_wait(
+        self,
+        _mock_get_context: MagicMock,
+        _mock_require_initialized: MagicMock,
+        mock_update: MagicMock,
+        _mock_ledger_cls: MagicMock,
+    ) -> None:
+        """Test update-metadata returns once the transaction is submitted with --no-wait."""
+        runner = CliRunner()
+        result = runner.invoke(update_metadata, ["--no-wait"])
+
+        assert result.exit_code == 0
+        assert mock_update.call_args.kwargs["wait"] is False
+        assert "Submitted: 0xtx" in result.output
+        assert "mech tx wait" in result.output
 
     def test_update_metadata_help(self) -> None:
         """Test update-metadata help output."""
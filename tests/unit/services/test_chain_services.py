@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+"""Tests for chain transaction services."""
+
+import json
+import socket
+from pathlib import Path
+from typing import Any, Tuple
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from eth_account import Account
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from mtd.services.chain import (
+    FeeCaps,
+    PooledHTTPProvider,
+    Preflight,
+    RPCPool,
+    batch_read,
+    check_owner,
+    gas_limit,
+    preflight,
+    rpc_urls,
+    suggest_fees,
+    wait_for_receipts,
+)
+from mtd.services.chain.pool import ERROR_HALF_LIFE, EndpointStats
+from mtd.services.chain.rpc import get_ethereum_client
+from mtd.services.metadata.update_onchain import _send_safe_tx, update_metadata_onchain
+from tests.conftest import SAFE_OWNER, FakeRPCNode
+
+
+GWEI = 10**9
+
+
+def _web3(base_fees: list, rewards: list) -> MagicMock:
+    """Build a web3 client returning the given fee history."""
+    web3_client = MagicMock()
+    web3_client.eth.fee_history.return_value = {"baseFeePerGas": base_fees, "reward": rewards}
+    web3_client.eth.gas_price = 5 * GWEI
+    web3_client.eth.max_priority_fee = 7 * GWEI
+    return web3_client
+
+
+def test_suggest_fees_uses_fee_history() -> None:
+    """Fees should cover a doubling base fee plus the median reward, within the caps."""
+    web3_client = _web3([9 * GWEI, 10 * GWEI], [[1 * GWEI], [3 * GWEI], [0], [2 * GWEI]])
+
+    assert suggest_fees(web3_client) == {"maxFeePerGas": 22 * GWEI, "maxPriorityFeePerGas": 2 * GWEI}
+    web3_client.eth.fee_history.assert_called_once_with(10, "latest", [50])
+
+    caps = FeeCaps.from_gwei("15", "1")
+    assert suggest_fees(web3_client, caps) == {"maxFeePerGas": 15 * GWEI, "maxPriorityFeePerGas": 1 * GWEI}
+
+    with pytest.raises(ValueError, match="below the current base fee of 10 gwei"):
+        suggest_fees(web3_client, FeeCaps.from_gwei("8", None))
+
+    empty_blocks = _web3([10 * GWEI], [[0]])
+    assert suggest_fees(empty_blocks)["maxPriorityFeePerGas"] == 7 * GWEI
+
+
+def test_suggest_fees_legacy_chain() -> None:
+    """Chains without a base fee should get a capped legacy gas price."""
+    web3_client = _web3([0, 0], [])
+
+    assert suggest_fees(web3_client) == {"gasPrice": 5 * GWEI}
+    assert suggest_fees(web3_client, FeeCaps.from_gwei("3", None)) == {"gasPrice": 3 * GWEI}
+
+
+@patch("mtd.services.chain.receipts.time.sleep")
+def test_wait_for_receipts_backs_off(mock_sleep: MagicMock) -> None:
+    """Receipts should be re-polled with a doubling interval until every transaction is mined."""
+    web3_client = MagicMock()
+    receipts = {"0xa": [None, None, {"status": 1}], "0xb": [{"status": 1}]}
+
+    def _receipt(tx_hash: str) -> dict:
+        receipt = receipts[tx_hash].pop(0)
+        if receipt is None:
+            raise TransactionNotFound(tx_hash)
+        return receipt
+
+    web3_client.eth.get_transaction_receipt.side_effect = _receipt
+    collected = []
+
+    result = wait_for_receipts(
+        web3_client, ["0xa", "0xb"], poll_interval=1, on_receipt=lambda tx_hash, _: collected.append(tx_hash)
+    )
+
+    assert result == {"0xa": {"status": 1}, "0xb": {"status": 1}}
+    assert collected == ["0xb", "0xa"]
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 2]
+
+    mock_sleep.reset_mock()
+    web3_client.eth.get_transaction_receipt.side_effect = TransactionNotFound("0xc")
+    assert not wait_for_receipts(web3_client, ["0xc"], timeout=0)
+    mock_sleep.assert_not_called()
+
+
+@patch("mtd.services.metadata.update_onchain.suggest_fees", return_value={"maxFeePerGas": 2, "maxPriorityFeePerGas": 1})
+@patch("mtd.services.metadata.update_onchain.get_safe")
+def test_send_safe_tx_estimates_gas(mock_get_safe: MagicMock, _mock_suggest_fees: MagicMock) -> None:
+    """The Safe transaction should be sent with the estimated gas and suggested fees."""
+    safe_tx = mock_get_safe.return_value.build_multisig_tx.return_value
+    safe_tx.w3_tx.estimate_gas.return_value = 50000
+    safe_tx.w3_tx.build_transaction.return_value = {"gas": 60000}
+    web3_client, ethereum_client = MagicMock(), MagicMock()
+    ethereum_client.send_unsigned_transaction.return_value = bytes.fromhex("ab" * 32)
+    signer_pkey = "0x" + "11" * 32
+    sender = Account.from_key(signer_pkey).address
+    history = {"baseFeePerGas": [GWEI], "reward": [[GWEI]]}
+    state = Preflight(100, 3, GWEI, history, "1.3.0", 7, (sender,), 1)  # type: ignore[arg-type]
+
+    tx_hash, gas_estimate = _send_safe_tx(
+        web3_client=web3_client,
+        ethereum_client=ethereum_client,
+        tx_data="0x1234",
+        to_address="0x0000000000000000000000000000000000000001",
+        safe_address="0x0000000000000000000000000000000000000002",
+        signer_pkey=signer_pkey,
+        chain_id=100,
+        state=state,
+    )
+
+    assert tx_hash == "0x" + "ab" * 32
+    assert gas_estimate == 50000
+    assert mock_get_safe.call_args.kwargs["version"] == "1.3.0"
+    build_kwargs = mock_get_safe.return_value.build_multisig_tx.call_args.kwargs
+    assert (build_kwargs["safe_tx_gas"], build_kwargs["safe_nonce"]) == (0, 7)
+    safe_tx.w3_tx.estimate_gas.assert_called_once_with({"from": sender})
+    safe_tx.w3_tx.build_transaction.assert_called_once_with(
+        {
+            "from": sender,
+            "chainId": 100,
+            "nonce": 3,
+            "gas": gas_limit(50000),
+            "maxFeePerGas": 2,
+            "maxPriorityFeePerGas": 1,
+        }
+    )
+    assert _mock_suggest_fees.call_args.kwargs == {"history": history, "gas_price": GWEI}
+
+    with pytest.raises(ValueError, match="expected 1"):
+        _send_safe_tx(web3_client, ethereum_client, "0x1234", sender, sender, signer_pkey, chain_id=1, state=state)
+    assert ethereum_client.send_unsigned_transaction.call_args.args[0] == {"gas": 60000}
+
+
+@pytest.mark.parametrize("batching", [True, False])
+def test_preflight_reads_in_one_batch(batching: bool) -> None:
+    """Preflight reads should take one request, or one per read on nodes without batch support."""
+    with FakeRPCNode(batching=batching) as rpc_node:
+        web3_client = get_ethereum_client(rpc_node.url).w3
+        state = preflight(
+            web3_client,
+            "0x0000000000000000000000000000000000000002",
+            SAFE_OWNER,
+            reads=[lambda: web3_client.eth.gas_price],
+        )
+
+    assert (state.chain_id, state.sender_nonce, state.safe_version, state.safe_nonce) == (100, 3, "1.3.0", 7)
+    assert (state.owners, state.threshold, state.reads) == ((SAFE_OWNER,), 1, (GWEI,))
+    assert state.fee_history["baseFeePerGas"][-1] == GWEI
+    # Without batch support, the rejected batch is followed by one request per read.
+    assert rpc_node.requests == 1 if batching else rpc_node.requests > 9
+    state.check(100, SAFE_OWNER.lower())
+    with pytest.raises(ValueError, match="not an owner"):
+        state.check(100, "0x0000000000000000000000000000000000000003")
+
+
+@pytest.mark.parametrize(
+    "batch_reply",
+    [
+        (400, {"error": "batch requests are not supported"}),
+        (502, "Bad Gateway"),
+        (200, {"jsonrpc": "2.0", "result": "0x64"}),
+        (200, [{"jsonrpc": "2.0", "id": 0, "result": "0x64"}]),
+        (200, "not a batch"),
+    ],
+)
+def test_batch_read_falls_back_on_failed_batch(batch_reply: Tuple[int, Any]) -> None:
+    """HTTP errors and malformed batch responses should fall back to one request per read."""
+    with FakeRPCNode(batch_reply=batch_reply) as rpc_node:
+        web3_client = get_ethereum_client(rpc_node.url).w3
+        results = batch_read(web3_client, [lambda: web3_client.eth.chain_id, lambda: web3_client.eth.gas_price])
+
+    assert results == [100, GWEI]
+    # The failed batch is followed by one request per read.
+    assert rpc_node.requests > 2 and rpc_node.methods["eth_gasPrice"] == 1
+
+
+def test_check_owner_reads_in_one_batch() -> None:
+    """Owner checks should read the chain id, the owners and the extra reads in one request."""
+    with FakeRPCNode() as rpc_node:
+        web3_client = get_ethereum_client(rpc_node.url).w3
+        safe = "0x0000000000000000000000000000000000000002"
+        reads = check_owner(web3_client, safe, SAFE_OWNER.lower(), 100, reads=[lambda: web3_client.eth.gas_price])
+        with pytest.raises(ValueError, match="expected 1"):
+            check_owner(web3_client, safe, SAFE_OWNER, 1)
+        with pytest.raises(ValueError, match="not an owner"):
+            check_owner(web3_client, safe, "0x0000000000000000000000000000000000000003", 100)
+
+    assert reads == (GWEI,)
+    assert rpc_node.requests == 3
+    assert "eth_feeHistory" not in rpc_node.methods
+
+
+def test_update_metadata_onchain_reuses_rpc_connection(tmp_path: Path, rpc_node: FakeRPCNode) -> None:
+    """Repeated updates in one process should share one connection and batch the preflight reads."""
+    env_path = tmp_path / ".env"
+    env_path.write_text(
+        "DEFAULT_CHAIN_ID=gnosis\n"
+        f"GNOSIS_LEDGER_RPC_0={rpc_node.url}\n"
+        "GNOSIS_LEDGER_CHAIN_ID=100\n"
+        "COMPLEMENTARY_SERVICE_METADATA_ADDRESS=0x0000000000000000000000000000000000000001\n"
+        f"METADATA_HASH=f01701220{'ab' * 32}\n"
+        "ON_CHAIN_SERVICE_ID=1\n"
+        "SAFE_CONTRACT_ADDRESS=0x0000000000000000000000000000000000000002\n",
+        encoding="utf-8",
+    )
+    key_path = tmp_path / "ethereum_private_key.txt"
+    key_path.write_text("0x" + "11" * 32, encoding="utf-8")
+
+    assert update_metadata_onchain(env_path=env_path, private_key_path=key_path) == (True, "0x" + "ab" * 32)
+    first = rpc_node.requests
+    assert update_metadata_onchain(env_path=env_path, private_key_path=key_path) == (True, "0x" + "ab" * 32)
+
+    assert rpc_node.connections == 1
+    # The preflight batch, eth_estimateGas, eth_sendRawTransaction and eth_getTransactionReceipt.
+    assert rpc_node.requests - first == 4
+
+
+def test_rpc_urls_reads_every_configured_endpoint() -> None:
+    """Endpoints should be read from _RPC_0 to _RPC_3 in order, skipping blanks and duplicates."""
+    env = {
+        "GNOSIS_LEDGER_RPC_0": "http://a",
+        "GNOSIS_LEDGER_RPC_1": " ",
+        "GNOSIS_LEDGER_RPC_2": "http://b",
+        "GNOSIS_LEDGER_RPC_3": "http://a",
+        "BASE_LEDGER_RPC_0": "http://c",
+    }
+
+    assert rpc_urls(env, "gnosis") == ["http://a", "http://b"]
+    assert not rpc_urls(env, "polygon")
+
+
+@patch("mtd.services.chain.pool.time.time", return_value=1000.0)
+def test_rpc_pool_ranks_and_saves_endpoint_stats(mock_time: MagicMock, tmp_path: Path) -> None:
+    """Failing and slow endpoints should be ranked last, and their stats reloaded by the next pool."""
+    scores_path = tmp_path / "rpc_scores.json"
+    pool = RPCPool(["http://a", "http://b", "http://c"], scores_path)
+    assert pool.ranked() == ["http://a", "http://b", "http://c"]
+
+    pool.record("http://a", None)
+    pool.record("http://b", 2.0)
+    pool.record("http://c", 0.1)
+    assert pool.ranked() == ["http://c", "http://b", "http://a"]
+    assert not scores_path.exists()
+    pool.save()
+
+    reloaded = RPCPool(["http://b", "http://a", "http://d"], scores_path)
+    assert reloaded.ranked() == ["http://d", "http://b", "http://a"]
+    reloaded.save()
+    assert "http://c" in scores_path.read_text(encoding="utf-8")
+
+    mock_time.return_value = 1000.0 + 10 * ERROR_HALF_LIFE
+    assert reloaded.ranked() == ["http://d", "http://a", "http://b"]
+
+    saved = json.loads(scores_path.read_text(encoding="utf-8"))
+    saved["endpoints"]["http://a"]["retired"] = True
+    saved["endpoints"]["http://b"]["latency"] = "slow"
+    scores_path.write_text(json.dumps(saved), encoding="utf-8")
+    malformed = RPCPool(["http://a", "http://b", "http://c"], scores_path)
+    assert malformed.stats["http://a"].error_rate > 0
+    assert malformed.stats["http://b"] == EndpointStats()
+
+
+def _closed_port_url() -> str:
+    """Get the URL of a local port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def test_update_metadata_onchain_fails_over_to_next_rpc(tmp_path: Path, rpc_node: FakeRPCNode) -> None:
+    """An update should go through when the first endpoint is down, which is then ranked last and saved."""
+    dead_url = _closed_port_url()
+    env_path = tmp_path / ".env"
+    env_path.write_text(
+        "DEFAULT_CHAIN_ID=gnosis\n"
+        f"GNOSIS_LEDGER_RPC_0={dead_url}\n"
+        f"GNOSIS_LEDGER_RPC_1={rpc_node.url}\n"
+        "GNOSIS_LEDGER_CHAIN_ID=100\n"
+        "COMPLEMENTARY_SERVICE_METADATA_ADDRESS=0x0000000000000000000000000000000000000001\n"
+        f"METADATA_HASH=f01701220{'ab' * 32}\n"
+        "ON_CHAIN_SERVICE_ID=1\n"
+        "SAFE_CONTRACT_ADDRESS=0x0000000000000000000000000000000000000002\n",
+        encoding="utf-8",
+    )
+    key_path = tmp_path / "ethereum_private_key.txt"
+    key_path.write_text("0x" + "11" * 32, encoding="utf-8")
+    scores_path = tmp_path / "rpc_scores.json"
+
+    assert update_metadata_onchain(env_path=env_path, private_key_path=key_path, rpc_scores_path=scores_path) == (
+        True,
+        "0x" + "ab" * 32,
+    )
+
+    assert rpc_node.methods["eth_sendRawTransaction"] == 1
+    assert not scores_path.exists()
+    get_ethereum_client([dead_url, rpc_node.url], scores_path).w3.provider.pool.save()  # type: ignore[attr-defined]
+    assert RPCPool([dead_url, rpc_node.url], scores_path).ranked() == [rpc_node.url, dead_url]
+
+
+def test_pooled_provider_does_not_resend_transactions() -> None:
+    """A transaction whose endpoint fails should not be sent to another endpoint."""
+    with FakeRPCNode() as rpc_node:
+        dead_url = _closed_port_url()
+        web3_client = Web3(PooledHTTPProvider(RPCPool([dead_url, rpc_node.url])))
+
+        assert web3_client.eth.chain_id == 100
+        web3_client.provider.pool.stats[rpc_node.url].error_rate = 1.0  # type: ignore[attr-defined]
+        with pytest.raises(requests.ConnectionError):
+            web3_client.eth.send_raw_transaction(b"\x01")
+
+    assert rpc_node.methods["eth_sendRawTransaction"] == 0
+
+
+def test_pooled_provider_orders_batch_responses() -> None:
+    """Batch responses should be returned in request order whatever order the node answers in."""
+    answers = [{"jsonrpc": "2.0", "id": 1, "result": "0x2"}, {"jsonrpc": "2.0", "id": 0, "result": "0x1"}]
+    provider = PooledHTTPProvider(RPCPool(["http://a"]))
+    with patch.object(PooledHTTPProvider, "_post", return_value=json.dumps(answers).encode()):
+        responses = provider.make_batch_request([("eth_chainId", []), ("eth_blockNumber", [])])
+
+    assert [response["id"] for response in responses] == [0, 1]  # type: ignore[index]
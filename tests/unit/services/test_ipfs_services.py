@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+"""Tests for the local IPFS node."""
+
+import os
+import time
+from pathlib import Path
+
+import ipfshttpclient
+import pytest
+import requests
+from aea.helpers.cid import to_v1
+from aea.helpers.ipfs.base import IPFSHashOnly
+
+from mtd.services.ipfs import Blockstore, LocalIPFSServer, file_cid
+from mtd.services.ipfs.dag import CHUNK_SIZE, MAX_LINKS, read_file
+
+
+@pytest.mark.parametrize(
+    "payload, cid",
+    [
+        (b"", "QmbFMke1KXqnYyBBWxB74N4c5SBnJMVAiMNRcGu6x1AwQH"),
+        (b"hello\n", "QmZULkCELmmk5XNfCgTnCyFgAVxBRBXyDHGGMVoLFLiXEN"),
+    ],
+)
+def test_file_cid_matches_ipfs_add(payload: bytes, cid: str) -> None:
+    """File CIDs should be the ones `ipfs add` gives with the default chunker."""
+    assert file_cid(payload) == cid
+
+
+@pytest.mark.parametrize("size", [1, CHUNK_SIZE, CHUNK_SIZE + 1, CHUNK_SIZE * MAX_LINKS])
+def test_file_cid_matches_hash_only(size: int) -> None:
+    """File CIDs should match the aea hasher wherever it supports the payload size."""
+    payload = os.urandom(size)
+    assert file_cid(payload) == IPFSHashOnly.hash_bytes(payload, wrap=False, cid_v1=False)
+
+
+def test_add_cat_and_pin(ipfs_node: LocalIPFSServer) -> None:
+    """Content added through the HTTP client should be pinned and readable, even across several DAG levels."""
+    client = ipfshttpclient.Client(ipfs_node.addr)
+    payload = os.urandom(CHUNK_SIZE * (MAX_LINKS + 2))
+
+    cid = client.add_bytes(payload)
+
+    assert cid == file_cid(payload)
+    assert client.cat(cid) == payload
+    assert cid in client.pin.ls()["Keys"]
+    client.pin.rm(cid)
+    assert cid not in client.pin.ls()["Keys"]
+    with pytest.raises(ipfshttpclient.exceptions.ErrorResponse, match="not found"):
+        client.cat(file_cid(b"missing"))
+
+
+def test_add_directory_matches_package_hash(ipfs_node: LocalIPFSServer, tmp_path: Path) -> None:
+    """Wrapped directories should get the hashes aea computes for packages, and be served by path."""
+    package = tmp_path / "package"
+    (package / "sub").mkdir(parents=True)
+    (package / "a.txt").write_text("a", encoding="utf-8")
+    (package / "sub" / "b.txt").write_text("b", encoding="utf-8")
+    client = ipfshttpclient.Client(ipfs_node.addr)
+
+    response = client.add(str(package), pin=True, recursive=True, wrap_with_directory=True)
+
+    assert response[-2]["Name"] == "package"
+    assert to_v1(response[-2]["Hash"]) == IPFSHashOnly.get(str(package), wrap=False)
+    assert to_v1(response[-1]["Hash"]) == IPFSHashOnly.get(str(package))
+    content = requests.get(f"{ipfs_node.url}/ipfs/{response[-1]['Hash']}/package/sub/b.txt", timeout=10)
+    assert content.content == b"b"
+
+
+def test_blockstore_persists_blocks_and_pins(tmp_path: Path) -> None:
+    """An on-disk blockstore should keep blocks and pins across servers."""
+    with LocalIPFSServer(Blockstore(tmp_path)) as node:
+        cid = ipfshttpclient.Client(node.addr).add_bytes(b"persisted")
+
+    blockstore = Blockstore(tmp_path)
+    assert cid in blockstore.pins
+    assert read_file(cid, blockstore.get) == b"persisted"
+
+
+def test_latency_is_injected() -> None:
+    """Every request should be delayed by the configured latency."""
+    with LocalIPFSServer(latency=0.2) as node:
+        start = time.monotonic()
+        ipfshttpclient.Client(node.addr).add_bytes(b"slow")
+        assert time.monotonic() - start >= 0.2
@@ -18,13 +18,52 @@
 # ------------------------------------------------------------------------------
 """Tests for metadata service modules."""
 
+import asyncio
 import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import replace
 from pathlib import Path
+from typing import Any, List, Optional, Union
 from unittest.mock import MagicMock, patch
 
-from mtd.services.metadata.generate import generate_metadata
-from mtd.services.metadata.publish import publish_metadata_to_ipfs
-from mtd.services.metadata.update_onchain import update_metadata_onchain
+import pytest
+from aiohttp import web
+
+from mtd.services.chain import Preflight
+from mtd.services.ipfs import LocalIPFSServer
+from mtd.services.ipfs.dag import add_file, read_file
+from mtd.services.metadata.cache import ToolsCache
+from mtd.services.metadata.diff import MISSING, FieldChange, diff_metadata, format_diff
+from mtd.services.metadata.fetch import CACHE_SOURCE, fetch_metadata
+from mtd.services.metadata.generate import (
+    assemble_metadata,
+    build_metadata,
+    generate_metadata,
+    write_metadata,
+)
+from mtd.services.metadata.ipfs import IPFSPublisher, compute_cid
+from mtd.services.metadata.ledger import PublishLedger
+from mtd.services.metadata.publish import (
+    _hash_payload,
+    _to_onchain_hash,
+    _validate_metadata_file,
+    compute_metadata_hash,
+    publish_many_async,
+    publish_metadata,
+    publish_metadata_to_ipfs,
+    publish_sharded_metadata,
+)
+from mtd.services.metadata.update_onchain import (
+    PENDING_EXPIRY_BLOCKS,
+    reconcile_pending,
+    update_metadata_onchain,
+)
+from mtd.services.metadata.validate import MetadataValidationError, validate_metadata
+from mtd.services.metadata.watch import MetadataUpdate, MetadataWatcher
+from tests.conftest import SAFE_OWNER
 
 
 def test_generate_metadata_creates_file(tmp_path: Path) -> None:
@@ -50,17 +89,397 @@ def test_generate_metadata_creates_file(tmp_path: Path) -> None:
     assert "echo" in metadata["tools"]
 
 
-@patch("mtd.services.metadata.publish.multicodec.remove_prefix", return_value=bytes.fromhex("1220" + "ab" * 32))
-@patch("mtd.services.metadata.publish.multibase.decode", return_value=b"dummy")
-@patch("mtd.services.metadata.publish.to_v1", return_value="cidv1")
-@patch("mtd.services.metadata.publish.IPFSTool")
-def test_publish_metadata_returns_hash(
-    mock_ipfs_tool: MagicMock,
-    _mock_to_v1: MagicMock,
-    _mock_decode: MagicMock,
-    _mock_remove_prefix: MagicMock,
-    tmp_path: Path,
-) -> None:
+def _write_tool(
+    packages_dir: Path,
+    author: str,
+    name: str,
+    source: str,
+    entry_point: str = "",
+) -> Path:
+    """Write a minimal tool package and return its folder."""
+    tool_dir = packages_dir / author / "customs" / name
+    tool_dir.mkdir(parents=True)
+    component = f"author: {author}\nname: {name}\ndescription: {name} tool\n"
+    if entry_point:
+        component += f"entry_point: {entry_point}\n"
+    (tool_dir / "component.yaml").write_text(component, encoding="utf-8")
+    (tool_dir / f"{name}.py").write_text(source, encoding="utf-8")
+    return tool_dir
+
+
+def test_generate_metadata_reads_literal_tools_without_import(tmp_path: Path) -> None:
+    """Literal tools lists should be read without executing the tool module."""
+    packages_dir = tmp_path / "packages"
+    _write_tool(
+        packages_dir,
+        "alice",
+        "heavy",
+        "import not_installed_sdk\nALLOWED_TOOLS: list = ['heavy-a', 'heavy-b']\n",
+        entry_point="heavy.py",
+    )
+
+    metadata_path = tmp_path / "metadata.json"
+    with patch("mtd.services.metadata.generate._import_module_from_path") as mock_import:
+        generate_metadata(packages_dir=packages_dir, metadata_path=metadata_path)
+
+    mock_import.assert_not_called()
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    assert metadata["tools"] == ["heavy-a", "heavy-b"]
+
+
+def test_generate_metadata_imports_dynamic_tools(tmp_path: Path) -> None:
+    """Dynamically computed tools lists should fall back to importing the entry point."""
+    packages_dir = tmp_path / "packages"
+    tool_dir = _write_tool(
+        packages_dir,
+        "alice",
+        "dynamic",
+        "AVAILABLE_TOOLS = [f'dynamic-{i}' for i in range(2)]\n",
+        entry_point="dynamic.py",
+    )
+    (tool_dir / "helpers.py").write_text("raise RuntimeError('not an entry point')\n", encoding="utf-8")
+
+    metadata_path = tmp_path / "metadata.json"
+    generate_metadata(packages_dir=packages_dir, metadata_path=metadata_path)
+
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    assert metadata["tools"] == ["dynamic-0", "dynamic-1"]
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "ALLOWED_TOOLS = ['base']\nALLOWED_TOOLS += ['extra']\n",
+        "ALLOWED_TOOLS = ['base']\nif True:\n    ALLOWED_TOOLS = ['base', 'extra']\n",
+        "ALLOWED_TOOLS = ['base']\ntry:\n    ALLOWED_TOOLS.append('extra')\nexcept ImportError:\n    pass\n",
+    ],
+    ids=["augmented", "conditional", "mutated"],
+)
+def test_generate_metadata_imports_changed_tools(tmp_path: Path, source: str) -> None:
+    """A tools list changed after its literal assignment should be read by importing the module."""
+    packages_dir = tmp_path / "packages"
+    _write_tool(packages_dir, "alice", "changed", source)
+
+    metadata_path = tmp_path / "metadata.json"
+    generate_metadata(packages_dir=packages_dir, metadata_path=metadata_path)
+
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    assert metadata["tools"] == ["base", "extra"]
+
+
+def test_generate_metadata_cache_rescans_only_changed_tools(tmp_path: Path) -> None:
+    """Cached entries should be reused until the component fingerprint changes."""
+    packages_dir = tmp_path / "packages"
+    for name in ("one", "two"):
+        tool_dir = _write_tool(packages_dir, "alice", name, f"ALLOWED_TOOLS = ['{name}']\n")
+        with open(tool_dir / "component.yaml", "a", encoding="utf-8") as file:
+            file.write(f"fingerprint:\n  {name}.py: bafy{name}\n")
+
+    metadata_path = tmp_path / "metadata.json"
+    cache_dir = tmp_path / "cache"
+    first = ToolsCache(cache_dir)
+    generate_metadata(packages_dir=packages_dir, metadata_path=metadata_path, cache=first)
+    assert not first.hits
+    assert len(first.misses) == 2
+
+    changed_dir = packages_dir / "alice" / "customs" / "two"
+    (changed_dir / "two.py").write_text("ALLOWED_TOOLS = ['two-v2']\n", encoding="utf-8")
+    component = (changed_dir / "component.yaml").read_text(encoding="utf-8")
+    (changed_dir / "component.yaml").write_text(
+        component.replace("bafytwo", "bafytwo2"), encoding="utf-8"
+    )
+
+    second = ToolsCache(cache_dir)
+    generate_metadata(packages_dir=packages_dir, metadata_path=metadata_path, cache=second)
+    assert second.hits == ["alice/customs/one"]
+    assert second.misses == ["alice/customs/two"]
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    assert sorted(metadata["tools"]) == ["one", "two-v2"]
+
+
+def test_generate_metadata_parallel_matches_serial(tmp_path: Path) -> None:
+    """Scanning in worker processes should produce the same document as a serial scan."""
+    packages_dir = tmp_path / "packages"
+    for author in ("bob", "alice"):
+        for name in ("zeta", "alpha", "mid"):
+            _write_tool(packages_dir, author, name, f"ALLOWED_TOOLS = ['{author}-{name}']\n")
+
+    serial_path = tmp_path / "serial.json"
+    parallel_path = tmp_path / "parallel.json"
+    generate_metadata(packages_dir=packages_dir, metadata_path=serial_path)
+    generate_metadata(packages_dir=packages_dir, metadata_path=parallel_path, jobs=3)
+
+    assert parallel_path.read_text(encoding="utf-8") == serial_path.read_text(encoding="utf-8")
+    metadata = json.loads(parallel_path.read_text(encoding="utf-8"))
+    assert metadata["tools"][:3] == ["alice-alpha", "alice-mid", "alice-zeta"]
+
+
+def test_generate_metadata_uses_packages_index(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """Custom components listed in packages.json should drive the tool lookup, warning about the others."""
+    packages_dir = tmp_path / "packages"
+    _write_tool(packages_dir, "alice", "listed", "ALLOWED_TOOLS = ['listed']\n")
+    _write_tool(packages_dir, "alice", "unlisted", "ALLOWED_TOOLS = ['unlisted']\n")
+    (packages_dir / "packages.json").write_text(
+        json.dumps(
+            {
+                "dev": {
+                    "custom/alice/listed/0.1.0": "bafylisted",
+                    "custom/alice/missing/0.1.0": "bafymissing",
+                    "agent/alice/mech/0.1.0": "bafyagent",
+                },
+                "third_party": {},
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    metadata_path = tmp_path / "metadata.json"
+    generate_metadata(packages_dir=packages_dir, metadata_path=metadata_path)
+
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    assert metadata["tools"] == ["listed"]
+    assert "Skipping tool alice/customs/unlisted: not listed in packages.json" in caplog.text
+
+
+def test_generate_metadata_isolates_failing_imports(tmp_path: Path) -> None:
+    """Tools that fail or time out on import should be skipped without stopping the run."""
+    packages_dir = tmp_path / "packages"
+    _write_tool(packages_dir, "alice", "good", "ALLOWED_TOOLS = ['good']\n")
+    _write_tool(
+        packages_dir,
+        "alice",
+        "broken",
+        "import not_installed_sdk\nALLOWED_TOOLS = list(not_installed_sdk.TOOLS)\n",
+    )
+    _write_tool(
+        packages_dir,
+        "alice",
+        "slow",
+        "import time\ntime.sleep(30)\nALLOWED_TOOLS = list(['slow'])\n",
+    )
+
+    metadata_path = tmp_path / "metadata.json"
+    with patch("mtd.services.metadata.generate._logger") as mock_logger:
+        generate_metadata(
+            packages_dir=packages_dir, metadata_path=metadata_path, import_timeout=1.0
+        )
+
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    assert metadata["tools"] == ["good"]
+    errors = {call.args[1]: call.args[2] for call in mock_logger.warning.call_args_list}
+    assert "ModuleNotFoundError" in errors["alice/customs/broken"]
+    assert "timed out" in errors["alice/customs/slow"]
+
+
+def test_build_metadata_deduplicates_tools(tmp_path: Path) -> None:
+    """Duplicated tools keep their first position and take the last metadata."""
+    metadata = assemble_metadata(
+        [
+            {"tool_name": "first", "description": "one", "allowed_tools": ["a", "b"]},
+            {"tool_name": "second", "description": "two", "allowed_tools": ["c", "a"]},
+        ]
+    )
+
+    assert metadata["tools"] == ["a", "b", "c"]
+    assert metadata["toolMetadata"]["a"]["name"] == "second"
+
+    metadata_path = tmp_path / "metadata.json"
+    write_metadata(metadata, metadata_path)
+    assert metadata_path.read_text(encoding="utf-8") == json.dumps(metadata, indent=4)
+
+
+def test_compact_metadata_is_smaller_and_valid(tmp_path: Path) -> None:
+    """Compact metadata should reference shared schemas and pass validation."""
+    packages_dir = tmp_path / "packages"
+    for name in ("one", "two", "three"):
+        _write_tool(packages_dir, "alice", name, f"ALLOWED_TOOLS = ['{name}']\n")
+
+    full_path = tmp_path / "full.json"
+    compact_path = tmp_path / "compact.json"
+    generate_metadata(packages_dir=packages_dir, metadata_path=full_path)
+    generate_metadata(packages_dir=packages_dir, metadata_path=compact_path, compact=True)
+
+    compact = json.loads(compact_path.read_text(encoding="utf-8"))
+    assert compact["toolMetadata"]["one"]["output"] == {"$ref": "#/definitions/output"}
+    assert compact_path.stat().st_size < full_path.stat().st_size
+    assert _validate_metadata_file(full_path) == (True, "")
+    assert _validate_metadata_file(compact_path) == (True, "")
+
+    compact["toolMetadata"]["two"]["input"] = {"$ref": "#/definitions/missing"}
+    compact_path.write_text(json.dumps(compact), encoding="utf-8")
+    status, error = _validate_metadata_file(compact_path)
+    assert status is False
+    assert '$.toolMetadata.two.input["$ref"]: unresolved reference' in error
+
+
+def test_validate_metadata_reports_every_error_with_its_path(tmp_path: Path) -> None:
+    """Validation should collect every violation in one pass instead of stopping at the first."""
+    metadata = json.loads(
+        json.dumps(
+            assemble_metadata(
+                [{"tool_name": "pkg", "description": "d", "allowed_tools": ["echo", "claude-prediction", "x"]}]
+            )
+        )
+    )
+    del metadata["image"]
+    metadata["toolMetadata"]["echo"]["input"]["type"] = 1
+    del metadata["toolMetadata"]["claude-prediction"]["output"]["schema"]["properties"]["prompt"]
+    metadata["toolMetadata"]["stray"] = metadata["toolMetadata"].pop("x")
+
+    issues = [str(issue) for issue in validate_metadata(metadata)]
+
+    assert issues == [
+        "$: missing required key 'image'",
+        "$.toolMetadata.echo.input.type: expected 'str', got 'int'",
+        '$.toolMetadata["claude-prediction"].output.schema.properties: missing required key \'prompt\'',
+        '$.toolMetadata["claude-prediction"].output.schema.required: '
+        "expected 2 entries to match 'properties', got 3",
+        "$.toolMetadata: missing entry for tool 'x'",
+        "$.toolMetadata.stray: tool is not listed in 'tools'",
+    ]
+
+    metadata_path = tmp_path / "metadata.json"
+    packages_dir = tmp_path / "packages"
+    _write_tool(packages_dir, "alice", "echo", "ALLOWED_TOOLS = ['echo']\n")
+    with patch("mtd.services.metadata.generate.assemble_metadata", return_value=metadata):
+        with pytest.raises(MetadataValidationError) as error:
+            generate_metadata(packages_dir=packages_dir, metadata_path=metadata_path)
+    assert len(error.value.issues) == len(issues)
+    assert not metadata_path.exists()
+
+
+def test_metadata_watcher_rescans_only_changed_tools(tmp_path: Path) -> None:
+    """The watcher should rescan the tools touched by a change and drop removed ones."""
+    packages_dir = tmp_path / "packages"
+    for name in ("one", "two", "three"):
+        _write_tool(packages_dir, "alice", name, f"ALLOWED_TOOLS = ['{name}']\n")
+    metadata_path = tmp_path / "metadata.json"
+    watcher = MetadataWatcher(packages_dir=packages_dir, metadata_path=metadata_path)
+
+    initial = watcher.refresh()
+    assert initial.rescanned == ["alice/customs/one", "alice/customs/three", "alice/customs/two"]
+
+    tool_dir = packages_dir.resolve() / "alice" / "customs" / "two"
+    (tool_dir / "two.py").write_text("ALLOWED_TOOLS = ['two', 'two-b']\n", encoding="utf-8")
+    for file_path in (packages_dir / "alice" / "customs" / "three").iterdir():
+        file_path.unlink()
+    (packages_dir / "alice" / "customs" / "three").rmdir()
+
+    update = watcher.refresh([str(tool_dir / "two.py"), str(tool_dir / "__pycache__")])
+    assert update.rescanned == ["alice/customs/two"]
+    assert update.error == ""
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    assert metadata["tools"] == ["one", "two", "two-b"]
+
+
+def test_metadata_watcher_follows_packages_index(tmp_path: Path) -> None:
+    """The watcher should build the same tools as a push, picking up a tool once it is locked."""
+    packages_dir = tmp_path / "packages"
+    _write_tool(packages_dir, "alice", "listed", "ALLOWED_TOOLS = ['listed']\n")
+    _write_tool(packages_dir, "alice", "draft", "ALLOWED_TOOLS = ['draft']\n")
+    (packages_dir / "packages.json").write_text(
+        json.dumps({"dev": {"custom/alice/listed/0.1.0": "bafylisted"}, "third_party": {}}),
+        encoding="utf-8",
+    )
+    watcher = MetadataWatcher(packages_dir=packages_dir, metadata_path=tmp_path / "metadata.json")
+
+    update = watcher.refresh()
+    assert update.rescanned == ["alice/customs/listed"]
+    assert update.metadata["tools"] == ["listed"]
+
+    index = {"dev": {"custom/alice/listed/0.1.0": "bafylisted", "custom/alice/draft/0.1.0": "bafydraft"}}
+    (packages_dir / "packages.json").write_text(json.dumps(index), encoding="utf-8")
+    update = watcher.refresh([str(packages_dir.resolve() / "packages.json")])
+    assert update.rescanned == ["alice/customs/draft"]
+    assert update.metadata["tools"] == ["draft", "listed"]
+
+
+def test_metadata_watcher_reports_changes(tmp_path: Path) -> None:
+    """The watch loop should regenerate metadata after a burst of edits."""
+    packages_dir = tmp_path / "packages"
+    tool_dir = _write_tool(packages_dir, "alice", "echo", "ALLOWED_TOOLS = ['echo']\n")
+    watcher = MetadataWatcher(packages_dir=packages_dir, metadata_path=tmp_path / "metadata.json")
+    stop = threading.Event()
+    updates: List[MetadataUpdate] = []
+
+    def _on_update(update: MetadataUpdate) -> None:
+        updates.append(update)
+        if len(updates) == 1:
+            (tool_dir / "echo.py").write_text("ALLOWED_TOOLS = 'echo'\n", encoding="utf-8")
+            (tool_dir / "echo.py").write_text("ALLOWED_TOOLS = ['echo', 'echo-2']\n", encoding="utf-8")
+        else:
+            stop.set()
+
+    thread = threading.Thread(
+        target=watcher.watch,
+        kwargs={"on_update": _on_update, "debounce": 0.3, "poll": True, "stop": stop},
+    )
+    thread.start()
+    thread.join(timeout=15)
+    stop.set()
+
+    assert len(updates) == 2
+    assert updates[1].rescanned == ["alice/customs/echo"]
+    assert updates[1].metadata["tools"] == ["echo", "echo-2"]
+
+
+def _confirm_expected(payload: bytes, expected_cid: str) -> str:
+    """Stand in for an IPFS node that confirms the CID computed locally."""
+    assert expected_cid == compute_cid(payload)
+    return expected_cid
+
+
+class _FakeIPFSNode:
+    """IPFS HTTP API `add` endpoint served from a background thread."""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0, cid: Optional[str] = None) -> None:
+        """Initialize the node."""
+        self.delay = delay
+        self.failures = failures
+        self.cid = cid
+        self.added: List[bytes] = []
+        self.active = 0
+        self.max_active = 0
+        self.addr = ""
+        self._loop = asyncio.new_event_loop()
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _add(self, request: web.Request) -> web.Response:
+        if self.failures:
+            self.failures -= 1
+            return web.Response(status=500)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            part = await (await request.multipart()).next()
+            content = await part.read()  # type: ignore[union-attr]
+        finally:
+            self.active -= 1
+        self.added.append(bytes(content))
+        return web.json_response({"Name": "file", "Hash": self.cid or compute_cid(bytes(content))})
+
+    async def _start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/api/v0/add", self._add)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.addr = f"/ip4/127.0.0.1/tcp/{port}/http"
+
+    def __enter__(self) -> "_FakeIPFSNode":
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()  # type: ignore[union-attr]
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def test_publish_metadata_returns_hash(tmp_path: Path, ipfs_node: LocalIPFSServer) -> None:
     """Publish metadata should return on-chain hash string."""
     metadata_path = tmp_path / "metadata.json"
     metadata_path.write_text(
@@ -78,23 +497,281 @@ def test_publish_metadata_returns_hash(
         encoding="utf-8",
     )
 
-    mock_ipfs_tool.return_value.client.add.return_value = {"Hash": "cid"}
+    metadata_hash = publish_metadata_to_ipfs(metadata_path=metadata_path, ipfs_node=ipfs_node.addr)
+
+    cid = compute_cid(metadata_path.read_bytes())
+    assert metadata_hash == _hash_payload(metadata_path.read_bytes())
+    assert cid in ipfs_node.blockstore.pins
+    assert read_file(cid, ipfs_node.blockstore.get) == metadata_path.read_bytes()
+
+
+@patch("mtd.services.metadata.publish.get_publisher")
+def test_publish_sharded_metadata_uploads_only_changed_shards(
+    mock_get_publisher: MagicMock, tmp_path: Path
+) -> None:
+    """Sharded publish should reuse shards already uploaded with the same content."""
+    packages_dir = tmp_path / "packages"
+    for name in ("one", "two"):
+        _write_tool(packages_dir, "alice", name, f"ALLOWED_TOOLS = ['{name}']\n")
+    metadata = build_metadata(packages_dir=packages_dir, compact=True)
+
+    added = []
+
+    def _add_bytes(payload: bytes, expected_cid: str) -> str:
+        added.append(json.loads(payload))
+        return _confirm_expected(payload, expected_cid)
+
+    mock_get_publisher.return_value.add_bytes.side_effect = _add_bytes
+    cache_dir = tmp_path / "cache"
+    nodes = ("/dns/a/tcp/5001/http", "/dns/b/tcp/5001/http")
+
+    first = publish_sharded_metadata(metadata=metadata, cache_dir=cache_dir, ipfs_node=nodes)
+    assert first.uploaded == ["one", "two"]
+    assert first.metadata_hash == _to_onchain_hash(first.root_cid)
+    root = added[-1]
+    assert "definitions" not in root
+    assert root["toolMetadata"]["one"] == {"/": compute_cid(json.dumps(added[0], indent=4).encode())}
+    assert added[0]["output"]["type"] == "object"
+    assert mock_get_publisher.call_args.args == (nodes,)
+
+    (packages_dir / "alice" / "customs" / "two" / "component.yaml").write_text(
+        "author: alice\nname: two\ndescription: changed\n", encoding="utf-8"
+    )
+    metadata = build_metadata(packages_dir=packages_dir)
+    added.clear()
+
+    second = publish_sharded_metadata(metadata=metadata, cache_dir=cache_dir, ipfs_node=nodes)
+    assert second.reused == ["one"]
+    assert second.uploaded == ["two"]
+    assert len(added) == 2
+
+
+def test_fetch_metadata_verifies_and_caches(tmp_path: Path, ipfs_node: LocalIPFSServer) -> None:
+    """Fetch should inline shards, verify content and serve later lookups from the cache."""
+    packages_dir = tmp_path / "packages"
+    for name in ("one", "two"):
+        _write_tool(packages_dir, "alice", name, f"ALLOWED_TOOLS = ['{name}']\n")
+    metadata = build_metadata(packages_dir=packages_dir)
+    published = publish_sharded_metadata(metadata=metadata, cache_dir=tmp_path / "shards", ipfs_node=ipfs_node.addr)
+    cache_dir = tmp_path / "cache"
+
+    document, fetched = fetch_metadata(
+        published.metadata_hash, cache_dir=cache_dir, sources=("/ip4/127.0.0.1/tcp/1/http", ipfs_node.url)
+    )
+    assert document == metadata
+    assert fetched.cid == published.root_cid
+    assert fetched.source == ipfs_node.url
+
+    document, fetched = fetch_metadata(published.metadata_hash, cache_dir=cache_dir, sources=())
+    assert document == metadata
+    assert fetched.source == CACHE_SOURCE
+
+
+def test_fetch_metadata_rejects_tampered_content(tmp_path: Path, ipfs_node: LocalIPFSServer) -> None:
+    """Fetch should refuse content that does not hash to the requested CID."""
+    cid = compute_cid(b'{"name": "genuine"}')
+    tampered = add_file(b'{"name": "tampered"}', ipfs_node.blockstore.put)
+    ipfs_node.blockstore.put(cid, ipfs_node.blockstore.get(tampered.cid))  # type: ignore[arg-type]
+
+    with pytest.raises(RuntimeError, match=f"content hashes to {tampered.cid}"):
+        fetch_metadata(_to_onchain_hash(cid), cache_dir=tmp_path, sources=(ipfs_node.addr,))
+    assert not any((tmp_path / "ipfs" / "blocks").iterdir())
+
+
+def test_diff_metadata_reports_tool_and_field_changes(tmp_path: Path) -> None:
+    """Diff should match tools by name and ignore how schemas are stored."""
+    packages_dir = tmp_path / "packages"
+    for name in ("one", "two"):
+        _write_tool(packages_dir, "alice", name, f"ALLOWED_TOOLS = ['{name}']\n")
+    published = build_metadata(packages_dir=packages_dir, compact=True)
+    assert not diff_metadata(published, build_metadata(packages_dir=packages_dir)).has_changes
+
+    generated = json.loads(json.dumps(build_metadata(packages_dir=packages_dir)))
+    generated["tools"] = ["two", "three"]
+    generated["toolMetadata"]["three"] = generated["toolMetadata"].pop("one")
+    generated["toolMetadata"]["two"]["input"]["type"] = "binary"
+    del generated["toolMetadata"]["two"]["output"]["description"]
+    generated["description"] = "new"
+
+    result = diff_metadata(published, generated)
+
+    assert result.added == ["three"]
+    assert result.removed == ["one"]
+    assert result.changed == {
+        "two": [
+            FieldChange("$.toolMetadata.two.input.type", "text", "binary"),
+            FieldChange("$.toolMetadata.two.output.description", published["definitions"]["output"]["description"], MISSING),
+        ]
+    }
+    assert result.fields == [FieldChange("$.description", published["description"], "new")]
+    assert format_diff(result)[-1] == "1 tool(s) added, 1 removed, 1 changed, 1 other field(s) changed."
+
+
+@patch("mtd.services.metadata.publish.get_publisher")
+def test_publish_metadata_uploads_from_memory(mock_get_publisher: MagicMock, tmp_path: Path) -> None:
+    """In-memory publish should upload the encoded document and write the same bytes."""
+    packages_dir = tmp_path / "packages"
+    _write_tool(packages_dir, "alice", "echo", "ALLOWED_TOOLS = ['echo']\n")
+    metadata = build_metadata(packages_dir=packages_dir)
+    mock_get_publisher.return_value.add_bytes.side_effect = _confirm_expected
+
+    metadata_path = tmp_path / "metadata.json"
+    metadata_hash = publish_metadata(metadata=metadata, metadata_path=metadata_path)
+
+    payload = mock_get_publisher.return_value.add_bytes.call_args.args[0]
+    assert metadata_hash == compute_metadata_hash(metadata)
+    assert metadata_path.read_bytes() == payload
+
+    generated_path = tmp_path / "generated.json"
+    generate_metadata(packages_dir=packages_dir, metadata_path=generated_path)
+    assert generated_path.read_bytes() == payload
+
+
+@patch("mtd.services.metadata.publish.get_publisher")
+def test_publish_metadata_skips_unchanged_upload(mock_get_publisher: MagicMock, tmp_path: Path) -> None:
+    """Publishing should be skipped when the locally computed hash is already published."""
+    assert _hash_payload(b"hello\n") == _to_onchain_hash("QmZULkCELmmk5XNfCgTnCyFgAVxBRBXyDHGGMVoLFLiXEN")
+
+    packages_dir = tmp_path / "packages"
+    _write_tool(packages_dir, "alice", "echo", "ALLOWED_TOOLS = ['echo']\n")
+    metadata = build_metadata(packages_dir=packages_dir)
+    metadata_hash = compute_metadata_hash(metadata)
+
+    metadata_path = tmp_path / "metadata.json"
+    assert publish_metadata(metadata=metadata, metadata_path=metadata_path, current_hash=metadata_hash) == metadata_hash
+    assert metadata_path.exists()
+    mock_get_publisher.assert_not_called()
+
+    mock_get_publisher.return_value.add_bytes.side_effect = _confirm_expected
+    publish_metadata(metadata=metadata, current_hash="f01701220old")
+    mock_get_publisher.return_value.add_bytes.assert_called_once()
+
+
+def test_publish_ledger_records_history(tmp_path: Path, ipfs_node: LocalIPFSServer) -> None:
+    """The ledger should record generations and uploads, and resolve live and previous hashes per chain."""
+    packages_dir = tmp_path / "packages"
+    _write_tool(packages_dir, "alice", "echo", "ALLOWED_TOOLS = ['echo']\n")
+    metadata = build_metadata(packages_dir=packages_dir)
+    ledger = PublishLedger(tmp_path / "ledger.db")
+
+    metadata_hash = publish_metadata(metadata=metadata, ipfs_node=ipfs_node.addr, ledger=ledger)
+    publish_metadata(metadata=metadata, ipfs_node=ipfs_node.addr, current_hash=metadata_hash, ledger=ledger)
+
+    generation = ledger.generation(metadata_hash)
+    assert generation is not None
+    assert (generation.tool_count, generation.size) == (1, len(json.dumps(metadata, indent=4).encode()))
+    (upload,) = ledger.publishes(metadata_hash)
+    assert upload.cid == compute_cid(json.dumps(metadata, indent=4).encode())
+    assert upload.nodes == (ipfs_node.addr,)
+
+    assert ledger.live("gnosis") is None
+    ledger.record_update("Gnosis", "f01701220a", "0x1", True, gas_used=40000, block_number=1)
+    ledger.record_update("gnosis", "f01701220b", "0x2", True)
+    ledger.record_update("gnosis", "f01701220b", "0x3", True)
+    ledger.record_update("gnosis", "f01701220c", "0x4", False)
+    ledger.record_update("base", "f01701220d", "0x5", True)
+
+    reopened = PublishLedger(tmp_path / "ledger.db")
+    live, previous = reopened.live("gnosis"), reopened.previous("gnosis")
+    assert live is not None and (live.metadata_hash, live.tx_hash) == ("f01701220b", "0x3")
+    assert previous is not None and (previous.metadata_hash, previous.gas_used, previous.block_number) == (
+        "f01701220a",
+        40000,
+        1,
+    )
+    assert reopened.chains() == ["base", "gnosis"]
+    assert [update.tx_hash for update in reopened.updates("gnosis", limit=2)] == ["0x4", "0x3"]
+    assert reopened.previous("base") is None
+
+
+def test_publish_ledger_adds_new_columns(tmp_path: Path) -> None:
+    """Opening a ledger created before gas estimates were recorded should add the new columns."""
+    path = tmp_path / "ledger.db"
+    with closing(sqlite3.connect(path)) as connection, connection:
+        connection.execute(
+            "CREATE TABLE updates (id INTEGER PRIMARY KEY, created_at REAL NOT NULL, chain TEXT NOT NULL, "
+            "metadata_hash TEXT NOT NULL, tx_hash TEXT NOT NULL, success INTEGER NOT NULL, gas_used INTEGER, "
+            "block_number INTEGER)"
+        )
+        connection.execute("INSERT INTO updates VALUES (NULL, 0, 'gnosis', 'f01701220a', '0x1', 1, 40000, 1)")
 
-    metadata_hash = publish_metadata_to_ipfs(metadata_path=metadata_path)
+    ledger = PublishLedger(path)
+    ledger.record_update("gnosis", "f01701220b", "0x2", True, gas_used=40000, gas_estimate=50000)
 
-    assert metadata_hash.startswith("f01701220")
+    assert [(update.tx_hash, update.gas_accuracy) for update in ledger.updates()] == [("0x2", 0.8), ("0x1", None)]
 
 
+def test_ipfs_publisher_returns_first_confirmation() -> None:
+    """The publisher should return the first confirmed CID and keep uploading to slower nodes."""
+    payload = b"hello\n"
+    expected_cid = compute_cid(payload)
+
+    with _FakeIPFSNode(delay=1.0) as slow, _FakeIPFSNode(failures=1) as flaky, _FakeIPFSNode(cid="QmWrong") as bad:
+        publisher = IPFSPublisher([slow.addr, flaky.addr, bad.addr], backoff=0.01)
+        start = time.perf_counter()
+        assert publisher.add_bytes(payload, expected_cid=expected_cid) == expected_cid
+        assert time.perf_counter() - start < 0.5
+        assert flaky.added == [payload]
+        assert slow.added == []
+
+        publisher.wait()
+        assert slow.added == [payload]
+        publisher.close()
+
+        failing = IPFSPublisher([bad.addr], retries=0)
+        with pytest.raises(RuntimeError, match="unexpected CID QmWrong"):
+            failing.add_bytes(payload, expected_cid=expected_cid)
+        failing.close()
+
+
+def test_ipfs_publisher_cancels_slow_uploads_on_close(caplog: pytest.LogCaptureFixture) -> None:
+    """Closing with a timeout should cancel slow background uploads and retrieve failed ones."""
+    payload = b"hello\n"
+    expected_cid = compute_cid(payload)
+
+    with _FakeIPFSNode() as fast, _FakeIPFSNode(delay=1.5) as slow, _FakeIPFSNode(cid="QmWrong") as bad:
+        publisher = IPFSPublisher([fast.addr, slow.addr, bad.addr], retries=0)
+        assert publisher.add_bytes(payload, expected_cid=expected_cid) == expected_cid
+        start = time.perf_counter()
+        publisher.close(timeout=0.2)
+        assert time.perf_counter() - start < 1
+
+    assert slow.added == []
+    assert "Cancelling 1 background uploads" in caplog.text
+    assert "never retrieved" not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_publish_many_async_bounds_concurrency(tmp_path: Path) -> None:
+    """Bulk publishing should keep at most `concurrency` uploads in flight and keep the item order."""
+    files = []
+    for index in range(3):
+        path = tmp_path / f"fixture_{index}.json"
+        path.write_bytes(json.dumps({"index": index}).encode())
+        files.append(path)
+    items: List[Union[bytes, Path]] = [f"payload {index}".encode() for index in range(12)] + files
+
+    with _FakeIPFSNode(delay=0.05) as node:
+        cids = await publish_many_async(items, ipfs_node=node.addr, concurrency=4)
+
+    expected = [compute_cid(item if isinstance(item, bytes) else item.read_bytes()) for item in items]
+    assert cids == expected
+    assert len(node.added) == len(items)
+    assert node.max_active == 4
+
+
+@patch("mtd.services.metadata.update_onchain.preflight")
+@patch("mtd.services.metadata.update_onchain.wait_for_receipts")
 @patch("mtd.services.metadata.update_onchain._send_safe_tx")
 @patch("mtd.services.metadata.update_onchain._load_contract")
-@patch("mtd.services.metadata.update_onchain.Safe")
-@patch("mtd.services.metadata.update_onchain.EthereumClient")
-@patch("mtd.services.metadata.update_onchain.Web3")
+@patch("mtd.services.metadata.update_onchain.get_ethereum_client")
 @patch("mtd.services.metadata.update_onchain._fetch_metadata_hash", return_value=b"hash")
 @patch(
     "mtd.services.metadata.update_onchain._load_env",
     return_value={
+        "CHAIN": "gnosis",
         "CHAIN_RPC": "http://localhost:8545",
+        "CHAIN_RPCS": ["http://localhost:8545", "http://localhost:8546"],
         "CHAIN_ID": "1",
         "COMPLEMENTARY_SERVICE_METADATA_ADDRESS": "0x0000000000000000000000000000000000000001",
         "METADATA_HASH": "f0170",
@@ -105,40 +782,125 @@ def test_publish_metadata_returns_hash(
 def test_update_metadata_onchain_returns_tx(
     _mock_load_env: MagicMock,
     _mock_fetch_hash: MagicMock,
-    mock_web3_cls: MagicMock,
-    _mock_eth_client_cls: MagicMock,
-    mock_safe_cls: MagicMock,
+    mock_get_client: MagicMock,
     mock_load_contract: MagicMock,
     mock_send_safe_tx: MagicMock,
+    mock_wait_for_receipts: MagicMock,
+    mock_preflight: MagicMock,
     tmp_path: Path,
 ) -> None:
-    """Onchain update should return success and tx hash."""
+    """Onchain update should return success and tx hash, recording the transaction once mined."""
     env_path = tmp_path / ".env"
     env_path.write_text("", encoding="utf-8")
     key_path = tmp_path / "ethereum_private_key.txt"
-    key_path.write_text("0xabc", encoding="utf-8")
-
-    mock_web3 = MagicMock()
-    mock_web3.to_checksum_address.return_value = "0x0000000000000000000000000000000000000002"
-    mock_web3.to_wei.return_value = 1
-    mock_web3_cls.return_value = mock_web3
+    key_path.write_text("0x" + "11" * 32, encoding="utf-8")
+    state = Preflight(
+        chain_id=1,
+        sender_nonce=3,
+        gas_price=10**9,
+        fee_history=MagicMock(),
+        safe_version="1.3.0",
+        safe_nonce=7,
+        owners=(SAFE_OWNER,),
+        threshold=1,
+        reads=(b"other",),
+    )
+    mock_preflight.return_value = state
 
-    mock_safe = MagicMock()
-    mock_safe.retrieve_nonce.return_value = 7
-    mock_safe_cls.return_value = mock_safe
+    mock_get_client.return_value.w3.to_checksum_address.return_value = "0x0000000000000000000000000000000000000002"
 
     mock_contract = MagicMock()
-    mock_fn = MagicMock()
-    mock_fn.build_transaction.return_value = {"data": "0x1234"}
-    mock_contract.functions.changeHash.return_value = mock_fn
+    mock_contract.encode_abi.return_value = "0x1234"
     mock_load_contract.return_value = mock_contract
 
-    tx_receipt = MagicMock()
-    tx_receipt.status = 1
-    tx_receipt.transactionHash.hex.return_value = "0xtx"
-    mock_send_safe_tx.return_value = tx_receipt
+    tx_receipt = {
+        "status": 1,
+        "gasUsed": 45000,
+        "blockNumber": 123,
+        "effectiveGasPrice": 2_000_000_000,
+    }
+    mock_send_safe_tx.return_value = ("0xtx", 50000)
+    mock_wait_for_receipts.return_value = {"0xtx": tx_receipt}
+    ledger = PublishLedger(tmp_path / "ledger.db")
 
-    success, tx_hash = update_metadata_onchain(env_path=env_path, private_key_path=key_path)
+    success, tx_hash = update_metadata_onchain(env_path=env_path, private_key_path=key_path, ledger=ledger)
 
     assert success is True
     assert tx_hash == "0xtx"
+    live = ledger.live("gnosis")
+    assert live is not None
+    assert (live.metadata_hash, live.tx_hash, live.gas_used, live.block_number) == ("f0170", "0xtx", 45000, 123)
+    assert (live.gas_estimate, live.effective_gas_price, live.gas_accuracy) == (50000, 2_000_000_000, 0.9)
+    mock_contract.encode_abi.assert_called_once_with("changeHash", args=[1, b"hash"])
+    assert mock_send_safe_tx.call_args.kwargs["tx_data"] == "0x1234"
+    assert mock_send_safe_tx.call_args.kwargs["chain_id"] == 1
+    mock_get_client.assert_called_with(["http://localhost:8545", "http://localhost:8546"], None)
+    assert mock_send_safe_tx.call_args.kwargs["web3_client"] is mock_get_client.return_value.w3
+    assert mock_send_safe_tx.call_args.kwargs["state"] is state
+    assert mock_preflight.call_args.args[2] == SAFE_OWNER
+    (read_hash,) = mock_preflight.call_args.kwargs["reads"]
+    assert read_hash() is mock_contract.functions.mapServiceHashes.return_value
+    mock_contract.functions.mapServiceHashes.assert_called_with(1)
+    assert ledger.pending() == []
+
+    mock_wait_for_receipts.reset_mock()
+    mock_send_safe_tx.return_value = ("0xsubmitted", 50000)
+    assert update_metadata_onchain(env_path=env_path, private_key_path=key_path, ledger=ledger, wait=False) == (
+        True,
+        "0xsubmitted",
+    )
+    mock_wait_for_receipts.assert_not_called()
+    (submitted,) = ledger.pending("gnosis")
+    assert (submitted.tx_hash, submitted.nonce) == ("0xsubmitted", 3)
+    assert len(ledger.updates("gnosis")) == 1
+
+    mock_send_safe_tx.reset_mock()
+    mock_preflight.return_value = replace(state, reads=(b"other", 3))
+    with patch("mtd.services.metadata.update_onchain.get_receipt", return_value=None), pytest.raises(
+        RuntimeError, match="0xsubmitted is still pending"
+    ):
+        update_metadata_onchain(env_path=env_path, private_key_path=key_path, ledger=ledger)
+    mock_send_safe_tx.assert_not_called()
+    assert len(mock_preflight.call_args.kwargs["reads"]) == 2
+    mock_wait_for_receipts.return_value = {"0xforced": tx_receipt}
+    mock_send_safe_tx.return_value = ("0xforced", 50000)
+    with patch("mtd.services.metadata.update_onchain.get_receipt", return_value=None):
+        assert update_metadata_onchain(env_path=env_path, private_key_path=key_path, ledger=ledger, force=True) == (
+            True,
+            "0xforced",
+        )
+    assert [pending.tx_hash for pending in ledger.pending("gnosis")] == ["0xsubmitted"]
+
+    mock_send_safe_tx.reset_mock()
+    mock_preflight.return_value = replace(state, reads=(b"hash", 4))
+    with patch("mtd.services.metadata.update_onchain.get_receipt", return_value=None):
+        assert update_metadata_onchain(env_path=env_path, private_key_path=key_path, ledger=ledger) == (True, None)
+    mock_send_safe_tx.assert_not_called()
+    assert ledger.pending() == []
+    assert len(ledger.updates("gnosis")) == 2
+
+    reconciled = PublishLedger(tmp_path / "reconciled.db")
+    assert update_metadata_onchain(env_path=env_path, private_key_path=key_path, ledger=reconciled) == (True, None)
+    assert update_metadata_onchain(env_path=env_path, private_key_path=key_path, ledger=reconciled) == (True, None)
+    (observed,) = reconciled.updates("gnosis")
+    assert (observed.metadata_hash, observed.success, observed.observed) == ("f0170", True, True)
+    mock_send_safe_tx.assert_not_called()
+
+
+def test_reconcile_pending_settles_and_expires_updates(tmp_path: Path) -> None:
+    """Pending updates should be confirmed when mined and discarded once they can no longer be."""
+    ledger = PublishLedger(tmp_path / "ledger.db")
+    ledger.record_pending("gnosis", "f01", "0xmined", nonce=1, block_number=100)
+    ledger.record_pending("gnosis", "f02", "0xreplaced", nonce=2, block_number=100)
+    ledger.record_pending("gnosis", "f03", "0xstale", nonce=5, block_number=100)
+    ledger.record_pending("gnosis", "f04", "0xfresh", nonce=6, block_number=120)
+    receipts = {"0xmined": {"status": 1, "gasUsed": 45000, "blockNumber": 101, "effectiveGasPrice": 1}}
+
+    with patch("mtd.services.metadata.update_onchain.get_receipt", side_effect=lambda _, tx_hash: receipts.get(tx_hash)):
+        still_pending = reconcile_pending(
+            ledger, MagicMock(), ledger.pending("gnosis"), mined_nonce=3, block_number=100 + PENDING_EXPIRY_BLOCKS
+        )
+
+    assert [update.tx_hash for update in still_pending] == ["0xfresh"]
+    assert [update.tx_hash for update in ledger.pending()] == ["0xfresh"]
+    assert [update.tx_hash for update in ledger.updates("gnosis")] == ["0xmined"]
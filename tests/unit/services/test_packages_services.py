@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+"""Tests for package services."""
+
+from pathlib import Path
+
+import pytest
+
+from mtd.services.packages.publish import load_dev_packages, package_path, read_package
+
+
+PACKAGES_DIR = Path(__file__).parents[3] / "packages"
+
+
+@pytest.mark.parametrize("package_id, cid", sorted(load_dev_packages(PACKAGES_DIR).items()))
+def test_read_package_matches_packages_json(package_id: str, cid: str) -> None:
+    """Package CIDs should be the hashes locked in packages.json."""
+    assert read_package(package_path(PACKAGES_DIR, package_id)).cid == cid
+
+
+def test_read_package_skips_python_caches(tmp_path: Path) -> None:
+    """Python caches should be neither hashed nor uploaded."""
+    package = tmp_path / "echo"
+    (package / "__pycache__").mkdir(parents=True)
+    (package / "__pycache__" / "tool.cpython-311.pyc").write_bytes(b"cache")
+    (package / "tool.pyc").write_bytes(b"cache")
+    (package / "tool.py").write_text("ALLOWED_TOOLS = []\n", encoding="utf-8")
+
+    content = read_package(package)
+
+    assert content.entries == [("echo", None), ("echo/tool.py", b"ALLOWED_TOOLS = []\n")]
@@ -20,8 +20,10 @@
 """Tests for mtd.deploy_mech module."""
 
 import json
+from typing import Iterator
 from unittest.mock import MagicMock, patch
 
+import pytest
 from operate.operate_types import Chain
 
 from mtd.deploy_mech import (
@@ -35,6 +37,13 @@ from mtd.deploy_mech import (
 MOD = "mtd.deploy_mech"
 
 
+@pytest.fixture(autouse=True)
+def mock_check_owner() -> Iterator[MagicMock]:
+    """Pass the preflight checks of every deployment, with code at the marketplace and factory."""
+    with patch(f"{MOD}.check_owner", return_value=(b"\x60", b"\x60")) as mock:
+        yield mock
+
+
 def _make_mock_sftxb(mech_address: str = "0xMechAddress", agent_id: str = "42") -> MagicMock:
     """Create a mock EthSafeTxBuilder with standard return values."""
     mock_sftxb = MagicMock()
@@ -89,6 +98,36 @@ class TestDeployMech:
         assert agent_id == "42"
         mock_sftxb.new_tx.assert_called_once()
 
+    @patch(f"{MOD}.requests")
+    def test_deploy_mech_preflight_checks(self, mock_requests: MagicMock, mock_check_owner: MagicMock) -> None:
+        """Test that the chain, Safe owner and contracts are checked in one batch before settling."""
+        mock_requests.get.return_value.json.return_value = {"abi": []}
+        mock_sftxb = _make_mock_sftxb()
+
+        deploy_mech(sftxb=mock_sftxb, service=_make_mock_service())
+
+        web3_client, safe, signer, chain_id = mock_check_owner.call_args.args
+        assert (web3_client, safe, signer) == (mock_sftxb.ledger_api.api, mock_sftxb.safe, mock_sftxb.crypto.address)
+        assert chain_id == Chain.GNOSIS.id
+        read_marketplace, read_factory = mock_check_owner.call_args.kwargs["reads"]
+        read_factory()
+        web3_client.eth.get_code.assert_called_once_with(
+            MECH_FACTORY_ADDRESS[Chain.GNOSIS]["0x735FAAb1c4Ec41128c367AFb5c3baC73509f70bB"]["Native"]
+        )
+        read_marketplace()
+
+    @patch(f"{MOD}.requests")
+    def test_deploy_mech_missing_contract(self, mock_requests: MagicMock, mock_check_owner: MagicMock) -> None:
+        """Test that nothing is settled when the mech factory has no code on the chain."""
+        mock_check_owner.return_value = (b"\x60", b"")
+        mock_sftxb = _make_mock_sftxb()
+
+        with pytest.raises(ValueError, match="No contract deployed at"):
+            deploy_mech(sftxb=mock_sftxb, service=_make_mock_service())
+
+        mock_sftxb.new_tx.assert_not_called()
+        mock_requests.get.assert_not_called()
+
     @patch(f"{MOD}.requests")
     def test_deploy_mech_default_marketplace_fallback(
         self, mock_requests: MagicMock
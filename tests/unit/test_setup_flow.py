@@ -33,9 +33,10 @@ from mtd.setup_flow import (
 MOD = "mtd.setup_flow"
 
 
+@patch(f"{MOD}.PublishLedger")
 @patch(f"{MOD}.update_metadata_onchain", return_value=(True, "0xabc"))
-@patch(f"{MOD}.publish_metadata_to_ipfs", return_value="bafyhash")
-@patch(f"{MOD}.generate_metadata")
+@patch(f"{MOD}.publish_metadata", return_value="bafyhash")
+@patch(f"{MOD}.build_metadata")
 @patch(f"{MOD}._setup_private_keys")
 @patch(f"{MOD}._setup_env")
 @patch(f"{MOD}._deploy_mech")
@@ -57,9 +58,10 @@ def test_run_setup_passes_explicit_operate_home(
     mock_deploy_mech: MagicMock,
     mock_setup_env: MagicMock,
     mock_setup_private_keys: MagicMock,
-    mock_generate_metadata: MagicMock,
+    mock_build_metadata: MagicMock,
     mock_publish_metadata: MagicMock,
     mock_update_metadata: MagicMock,
+    mock_ledger_cls: MagicMock,
     tmp_path: Path,
     monkeypatch: MagicMock,
 ) -> None:
@@ -81,6 +83,8 @@ def test_run_setup_passes_explicit_operate_home(
     mock_service_manager.get_all_services.return_value = ([], None)
     mock_operate.service_manager.return_value = mock_service_manager
     mock_operate_app.return_value = mock_operate
+    context.env_path.parent.mkdir(parents=True, exist_ok=True)
+    context.env_path.write_text("METADATA_HASH=f01701220old\n", encoding="utf-8")
 
     run_setup(chain_config="polygon", context=context)
 
@@ -98,14 +102,22 @@ def test_run_setup_passes_explicit_operate_home(
     mock_deploy_mech.assert_called_once_with(mock_operate)
     mock_setup_env.assert_called_once_with(context=context)
     mock_setup_private_keys.assert_called_once_with(context=context)
-    mock_generate_metadata.assert_called_once_with(
-        packages_dir=context.packages_dir, metadata_path=context.metadata_path
+    mock_build_metadata.assert_called_once_with(packages_dir=context.packages_dir, jobs=1)
+    mock_publish_metadata.assert_called_once_with(
+        metadata=mock_build_metadata.return_value,
+        metadata_path=context.metadata_path,
+        current_hash="f01701220old",
+        ledger=mock_ledger_cls.return_value,
     )
-    mock_publish_metadata.assert_called_once_with(metadata_path=context.metadata_path)
     mock_update_metadata.assert_called_once_with(
         env_path=context.env_path,
         private_key_path=context.keys_dir / "ethereum_private_key.txt",
+        ledger=mock_ledger_cls.return_value,
+        wait=True,
+        rpc_scores_path=context.rpc_scores_path,
+        force=False,
     )
+    mock_ledger_cls.assert_called_once_with(context.ledger_path)
 
 
 def test_normalize_template_nullable_env_vars(tmp_path: Path) -> None:
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Benchmarks for metadata generation on synthetic tool catalogs."""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import click
+
+from mtd.services.metadata.diff import diff_metadata
+from mtd.services.metadata.generate import assemble_metadata, write_metadata
+from mtd.services.metadata.publish import (
+    _validate_metadata,
+    _validate_metadata_file,
+    encode_metadata,
+)
+from mtd.services.metadata.validate import validate_metadata
+
+
+DEFAULT_SIZES = (1000, 5000, 10000, 50000)
+
+
+def make_tools_data(size: int, tools_per_package: int = 5) -> List[Dict[str, Any]]:
+    """Make tool entries for a synthetic catalog of `size` tools."""
+    return [
+        {
+            "author": f"author_{index % 50}",
+            "tool_name": f"package_{index}",
+            "description": f"Synthetic tool package {index}.",
+            "allowed_tools": [
+                f"tool-{index}-{offset}"
+                for offset in range(min(tools_per_package, size - index))
+            ],
+        }
+        for index in range(0, size, tools_per_package)
+    ]
+
+
+def report(label: str, size: int, run: Callable[[], None]) -> None:
+    """Time a run and print its total and per-tool cost."""
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    click.echo(
+        f"{label:<10} {size:>7} tools  {elapsed * 1000:>9.1f} ms  "
+        f"{elapsed / size * 1e6:>7.2f} us/tool"
+    )
+
+
+@click.group()
+def cli() -> None:
+    """Benchmark metadata generation."""
+
+
+@cli.command()
+@click.option("--size", "sizes", type=int, multiple=True, default=DEFAULT_SIZES)
+def build(sizes: List[int]) -> None:
+    """Benchmark building and writing metadata documents."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        metadata_path = Path(temp_dir) / "metadata.json"
+        for size in sizes:
+            tools_data = make_tools_data(size)
+            report(
+                "build",
+                size,
+                lambda: write_metadata(assemble_metadata(tools_data), metadata_path),
+            )
+
+
+@cli.command()
+@click.option("--size", "sizes", type=int, multiple=True, default=DEFAULT_SIZES)
+def pipeline(sizes: List[int]) -> None:
+    """Benchmark the local part of generate, validate and publish.
+
+    `file` writes metadata.json, validates it by re-reading it and reads it
+    again for upload; `memory` validates the document and encodes it once,
+    writing the same bytes as an artifact. Network time is not included.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        metadata_path = Path(temp_dir) / "metadata.json"
+        for size in sizes:
+            metadata = assemble_metadata(make_tools_data(size))
+
+            def _file_round_trip() -> None:
+                write_metadata(metadata, metadata_path)
+                _validate_metadata_file(metadata_path)
+                metadata_path.read_bytes()
+
+            def _in_memory() -> None:
+                _validate_metadata(metadata)
+                metadata_path.write_bytes(encode_metadata(metadata))
+
+            report("file", size, _file_round_trip)
+            report("memory", size, _in_memory)
+
+
+@cli.command()
+@click.option("--size", "sizes", type=int, multiple=True, default=(10000,))
+@click.option("--repeat", type=int, default=5, show_default=True)
+def validate(sizes: List[int], repeat: int) -> None:
+    """Benchmark validating full, compact and broken metadata documents.
+
+    The broken document has an error in every tool, so all of them are
+    collected. The best of `repeat` runs is reported.
+    """
+    for size in sizes:
+        documents = {
+            "full": assemble_metadata(make_tools_data(size)),
+            "compact": assemble_metadata(make_tools_data(size), compact=True),
+        }
+        broken = json.loads(json.dumps(documents["full"]))
+        for tool_metadata in broken["toolMetadata"].values():
+            del tool_metadata["input"]["description"]
+        documents["broken"] = broken
+
+        for label, metadata in documents.items():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                issues = validate_metadata(metadata)
+                timings.append(time.perf_counter() - start)
+            elapsed = min(timings)
+            click.echo(
+                f"{label:<10} {size:>7} tools  {elapsed * 1000:>9.1f} ms  "
+                f"{elapsed / size * 1e6:>7.2f} us/tool  {len(issues):>7} issue(s)"
+            )
+
+
+@cli.command()
+@click.option("--size", "sizes", type=int, multiple=True, default=(10000,))
+@click.option("--repeat", type=int, default=5, show_default=True)
+def diff(sizes: List[int], repeat: int) -> None:
+    """Benchmark diffing a generated document against a published one.
+
+    The published side is decoded from JSON, as if fetched, and has one
+    changed tool. It is compared with a full and with a compact document.
+    The best of `repeat` runs is reported.
+    """
+    for size in sizes:
+        published = json.loads(encode_metadata(assemble_metadata(make_tools_data(size))))
+        first_tool = next(iter(published["toolMetadata"].values()))
+        first_tool["description"] = "changed"
+        documents = {
+            "full": assemble_metadata(make_tools_data(size)),
+            "compact": assemble_metadata(make_tools_data(size), compact=True),
+        }
+
+        for label, metadata in documents.items():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                changes = diff_metadata(published, metadata)
+                timings.append(time.perf_counter() - start)
+            elapsed = min(timings)
+            click.echo(
+                f"{label:<10} {size:>7} tools  {elapsed * 1000:>9.1f} ms  "
+                f"{elapsed / size * 1e6:>7.2f} us/tool  {len(changes.changed):>7} changed"
+            )
+
+
+if __name__ == "__main__":
+    cli()  # pylint: disable=no-value-for-parameter
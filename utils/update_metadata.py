@@ -30,6 +30,9 @@ def main() -> None:
         env_path=Path(".env"),
         private_key_path=Path("ethereum_private_key.txt"),
     )
+    if tx_hash is None:
+        print("On-chain metadata hash unchanged, skipped transaction.")
+        return
     print(f"Success: {success}")
     print(f"Tx Hash: {tx_hash}")
 